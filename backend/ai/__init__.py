@@ -1,4 +1,4 @@
-from .claude_client import ClaudeClient
+from .claude_client import ClaudeClient, get_claude_client
 from .prompts import build_daily_prompt, build_monthly_prompt, build_qa_prompt
 
-__all__ = ['ClaudeClient', 'build_daily_prompt', 'build_monthly_prompt', 'build_qa_prompt']
+__all__ = ['ClaudeClient', 'get_claude_client', 'build_daily_prompt', 'build_monthly_prompt', 'build_qa_prompt']
@@ -12,6 +12,8 @@ import hashlib
 import json
 import os
 
+import orjson
+
 # Default TTL: 4 hours for AI responses
 DEFAULT_TTL = int(os.getenv('AI_CACHE_TTL', 14400))
 
@@ -62,7 +64,7 @@ def get_cached(key, cache_type='general'):
             redis_key = f"cache:{cache_type}:{key}"
             cached = redis_client.get(redis_key)
             if cached:
-                return json.loads(cached)
+                return orjson.loads(cached)
         except Exception as e:
             print(f"Redis read failed: {e}")
 
@@ -73,7 +75,7 @@ def get_cached(key, cache_type='general'):
 
         entry = AICache.query.filter_by(cache_key=key).first()
         if entry and not entry.is_expired():
-            value = json.loads(entry.value)
+            value = entry.get_value()
             # Populate Redis for next time if available
             if redis_client:
                 try:
@@ -108,7 +110,8 @@ def set_cached(key, value, ttl=DEFAULT_TTL, cache_type='general'):
     Writes to Redis (if available), Postgres, and in-memory.
     """
     expires_at = datetime.utcnow() + timedelta(seconds=ttl)
-    value_json = json.dumps(value, default=str)
+    from database.models import AICache
+    value_json = AICache.encode_value(value)
 
     # Write to Redis first (fastest)
     redis_client = _get_redis()
@@ -121,7 +124,6 @@ def set_cached(key, value, ttl=DEFAULT_TTL, cache_type='general'):
 
     # Write to Postgres for persistence
     try:
-        from database.models import AICache
         from database.db import db
 
         # Upsert: update if exists, insert if not
@@ -237,19 +239,21 @@ def get_cache_stats():
 
     # Postgres stats
     try:
+        from sqlalchemy import case, func
         from database.models import AICache
+        from database.db import db
 
-        all_entries = AICache.query.all()
-        stats['postgres_total'] = len(all_entries)
-        stats['postgres_valid'] = sum(1 for e in all_entries if not e.is_expired())
-
-        # Group by type
-        for entry in all_entries:
-            if entry.cache_type not in stats['postgres_by_type']:
-                stats['postgres_by_type'][entry.cache_type] = {'total': 0, 'valid': 0}
-            stats['postgres_by_type'][entry.cache_type]['total'] += 1
-            if not entry.is_expired():
-                stats['postgres_by_type'][entry.cache_type]['valid'] += 1
+        # Count per type in SQL rather than loading every cached response
+        rows = db.session.query(
+            AICache.cache_type,
+            func.count(AICache.id),
+            func.sum(case((AICache.is_expired(), 0), else_=1)),
+        ).group_by(AICache.cache_type).all()
+
+        for cache_type, total, valid in rows:
+            stats['postgres_by_type'][cache_type] = {'total': total, 'valid': int(valid or 0)}
+            stats['postgres_total'] += total
+            stats['postgres_valid'] += int(valid or 0)
 
     except Exception as e:
         stats['postgres_error'] = str(e)
@@ -2,6 +2,7 @@
 
 import os
 import json
+import threading
 from anthropic import Anthropic
 
 from .prompts import (
@@ -17,6 +18,11 @@ from .prompts import (
     build_anomaly_prompt,
 )
 
+# Shared client, reused across requests so the Anthropic HTTP connection
+# pool stays warm
+_shared_client = None
+_shared_client_lock = threading.Lock()
+
 
 class ClaudeClient:
     """Client for interacting with Claude API."""
@@ -29,6 +35,7 @@ class ClaudeClient:
         if not api_key:
             raise ValueError("ANTHROPIC_API_KEY environment variable not set")
 
+        self.api_key = api_key
         self.client = Anthropic(api_key=api_key)
         self.model = self.DEFAULT_MODEL
 
@@ -170,3 +177,26 @@ class ClaudeClient:
         """
         user_prompt = build_anomaly_prompt(financial_data, context)
         return self.analyse_json(ANOMALY_DETECTION_SYSTEM, user_prompt, max_tokens=2500)
+
+
+def get_claude_client():
+    """
+    Get the shared ClaudeClient, creating it on first use.
+
+    The client is rebuilt if ANTHROPIC_API_KEY changes.
+
+    Returns:
+        ClaudeClient: Shared client instance
+
+    Raises:
+        ValueError: If ANTHROPIC_API_KEY is not set
+    """
+    global _shared_client
+    api_key = os.getenv('ANTHROPIC_API_KEY')
+    client = _shared_client
+    if client is None or client.api_key != api_key:
+        with _shared_client_lock:
+            client = _shared_client
+            if client is None or client.api_key != api_key:
+                client = _shared_client = ClaudeClient()
+    return client
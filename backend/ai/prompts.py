@@ -260,14 +260,14 @@ def format_critical_risks(risks):
 
     lines = []
     for risk in risks:
-        severity = risk.get('severity', 'Unknown')
-        name = risk.get('name', 'Unknown Risk')
-        category = risk.get('category', '')
+        severity = risk.severity or 'Unknown'
+        name = risk.name or 'Unknown Risk'
+        category = risk.category or ''
 
         lines.append(f"- **[{severity.upper()}] {name}** ({category})")
 
         # Add specific details based on risk type
-        current_state = risk.get('current_state', {})
+        current_state = risk.current_state
         if current_state:
             for key, value in current_state.items():
                 if isinstance(value, (int, float)) and value > 1000:
@@ -276,12 +276,12 @@ def format_critical_risks(risks):
                     lines.append(f"  - {key.replace('_', ' ').title()}: {value}%")
 
         # Add specific threats
-        threats = risk.get('specific_threats', [])
+        threats = risk.specific_threats
         for threat in threats[:2]:  # Limit to 2 threats per risk
             lines.append(f"  - {threat.get('client', '')}: {threat.get('threat', '')}")
 
         # Add exposures (for platform risk)
-        exposures = risk.get('exposures', [])
+        exposures = risk.exposures
         for exp in exposures[:2]:
             if 'cost' in exp:
                 cost = exp.get('cost', 0)
@@ -290,7 +290,7 @@ def format_critical_risks(risks):
                 lines.append(f"  - {exp.get('platform', '')}: {currency} {cost:,}/{freq}")
 
         # Add mitigation actions
-        mitigation = risk.get('mitigation', [])
+        mitigation = risk.mitigation
         if mitigation:
             lines.append(f"  - Mitigation: {mitigation[0]}")
 
@@ -424,9 +424,9 @@ def build_strategic_context_summary(context):
     ])
 
     for risk in critical_risks[:3]:
-        severity = risk.get('severity', 'Unknown')
-        name = risk.get('name', 'Unknown')
-        mitigation = risk.get('mitigation', [])
+        severity = risk.severity or 'Unknown'
+        name = risk.name or 'Unknown'
+        mitigation = risk.mitigation
         mitigation_text = mitigation[0] if mitigation else "No mitigation defined"
         lines.append(f"- **[{severity}] {name}**: {mitigation_text}")
 
@@ -437,9 +437,9 @@ def build_strategic_context_summary(context):
     ])
 
     for milestone in milestones[:5]:
-        priority = milestone.get('priority', 'Medium')
-        goal = milestone.get('goal', '')
-        value = milestone.get('value')
+        priority = milestone.priority or 'Medium'
+        goal = milestone.goal or ''
+        value = milestone.value
         value_str = f" ({format_currency(value)})" if value else ""
         lines.append(f"- [{priority}] {goal}{value_str}")
 
@@ -642,7 +642,7 @@ def build_daily_prompt(financial_data, context):
     critical_risks = get_critical_risks()
     q1_goals = get_q1_goals()
     transition = get_transition_status()
-    deals_closing_soon = get_deals_closing_next_n_days(30)
+    deals_closing_soon = get_deals_closing_next_n_days(30, pipeline=pipeline_data)
 
     # Get at-risk clients (updated for new schema)
     at_risk_clients = []
@@ -8,16 +8,28 @@ from flask import Flask
 from flask_cors import CORS
 
 from config import Config
+from json_provider import OrjsonProvider
 from database import init_db
 from routes import auth_bp, data_bp, ai_bp, projection_bp, notion_bp, history_bp, drill_bp, upload_bp, metrics_bp
 
 
-def create_app():
-    """Application factory for Flask app."""
+def create_app(engine_options=None):
+    """
+    Application factory for Flask app.
+
+    Args:
+        engine_options: Replace SQLALCHEMY_ENGINE_OPTIONS, e.g.
+            Config.SCRIPT_ENGINE_OPTIONS for one-shot jobs
+    """
     app = Flask(__name__)
 
     # Load configuration
     app.config.from_object(Config)
+    if engine_options is not None:
+        app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options
+
+    # Serialize API responses with orjson
+    app.json = OrjsonProvider(app)
 
     # Enable CORS for React frontend
     CORS(app, origins=[
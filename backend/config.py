@@ -1,5 +1,6 @@
 import os
 from dotenv import load_dotenv
+from sqlalchemy.pool import NullPool
 
 load_dotenv()
 
@@ -30,9 +31,19 @@ class Config:
             'max_overflow': 5,      # Allow 5 additional connections per worker for burst traffic
             'pool_timeout': 30,     # Wait 30s for connection before raising error
             'echo_pool': False,     # Set True to debug connection pool issues
+            'query_cache_size': 1200,  # Compiled SQL cache entries (default 500)
         }
     else:
-        SQLALCHEMY_ENGINE_OPTIONS = {}
+        SQLALCHEMY_ENGINE_OPTIONS = {
+            'query_cache_size': 1200,
+        }
+
+    # One-shot jobs and scripts (capture_snapshot, backfill, CSV import) open
+    # a single connection and exit, so skip pool setup entirely.
+    # Pass to create_app(engine_options=Config.SCRIPT_ENGINE_OPTIONS).
+    SCRIPT_ENGINE_OPTIONS = {
+        'poolclass': NullPool,
+    }
 
     # Redis cache URL (optional, for AI and dashboard caching)
     REDIS_URL = os.getenv('REDIS_URL')
@@ -1,8 +1,81 @@
 """Context loader for business information YAML files."""
 
+import heapq
 import os
+import threading
+import time
 import yaml
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+from functools import lru_cache, wraps
 from pathlib import Path
+from typing import Any, Optional
+
+from flask import g, has_request_context
+
+# libyaml's C loader is much faster than the pure-Python one when available
+_YamlLoader = getattr(yaml, 'CSafeLoader', yaml.SafeLoader)
+
+# Metric lists in metrics.yaml that are looked up by their 'metric' name
+METRIC_SECTIONS = ('financial_metrics', 'services_metrics', 'cost_metrics')
+
+# Pipeline stages counted as medium confidence by calculate_weighted_pipeline
+_PROPOSAL_STAGES = frozenset({'Proposal Being Reviewed', 'Build Proposal'})
+
+# Context files loaded by load_all_context (pipeline.yaml is the Notion fallback)
+CONTEXT_FILES = {
+    'business': 'business_context.yaml',
+    'clients': 'clients.yaml',
+    'goals': 'goals.yaml',
+    'rules': 'rules.yaml',
+    'pipeline': 'pipeline.yaml',
+    'risks': 'risks.yaml',
+    'metrics': 'metrics.yaml',
+}
+
+# When enabled, a background thread polls the context directory and loads
+# skip the per-call stat. Set CONTEXT_WATCH=0 to stat on every load instead.
+CONTEXT_WATCH = os.getenv('CONTEXT_WATCH', '1') != '0'
+CONTEXT_WATCH_INTERVAL = float(os.getenv('CONTEXT_WATCH_INTERVAL', '1.0'))
+
+_watched_mtimes = {}  # filename -> mtime, maintained by the watcher thread
+_watcher_pid = None
+_watcher_lock = threading.Lock()
+
+
+@dataclass(slots=True, frozen=True)
+class RiskSummary:
+    """A critical or high severity risk from risks.yaml."""
+    id: Optional[str]
+    name: Optional[str]
+    severity: Optional[str]
+    category: Optional[str]
+    current_state: dict = field(default_factory=dict)
+    specific_threats: list = field(default_factory=list)
+    exposures: list = field(default_factory=list)
+    mitigation: list = field(default_factory=list)
+    ai_cfo_action: Optional[str] = None
+
+
+@dataclass(slots=True, frozen=True)
+class MilestoneSummary:
+    """An upcoming goal from goals.yaml."""
+    quarter: str
+    goal: Optional[str]
+    priority: Optional[str]
+    value: Any = None
+    deadline: Optional[str] = None
+
+
+@dataclass(slots=True)
+class DealSummary:
+    """Pipeline totals and deal lists gathered by classify_deals in one pass."""
+    deal_count: int = 0
+    total_value: float = 0
+    won_value: float = 0
+    high_confidence_value: float = 0
+    overdue: list = field(default_factory=list)
+    closing_this_month: list = field(default_factory=list)
 
 
 def get_context_dir():
@@ -10,14 +83,131 @@ def get_context_dir():
     return Path(__file__).parent
 
 
-def load_yaml_file(filename):
-    """Load a single YAML file from the context directory."""
+@lru_cache(maxsize=32)
+def _load_yaml_cached(filepath, mtime):
+    """Parse a YAML file. Keyed on mtime so edits on disk invalidate the entry."""
+    with open(filepath, 'r') as f:
+        return yaml.load(f, Loader=_YamlLoader) or {}
+
+
+def _scan_context_mtimes():
+    """Stat every YAML file in the context directory."""
+    mtimes = {}
+    with os.scandir(get_context_dir()) as entries:
+        for entry in entries:
+            if entry.name.endswith('.yaml'):
+                mtimes[entry.name] = entry.stat().st_mtime
+    return mtimes
+
+
+def _watch_context_dir():
+    """Poll the context directory and drop memoized YAML when anything changes."""
+    global _watched_mtimes
+    while True:
+        time.sleep(CONTEXT_WATCH_INTERVAL)
+        try:
+            mtimes = _scan_context_mtimes()
+        except OSError as e:
+            print(f"[Context] Watcher scan failed: {e}")
+            continue
+        if mtimes != _watched_mtimes:
+            _watched_mtimes = mtimes
+            _load_yaml_cached.cache_clear()
+            _build_metric_index.cache_clear()
+            _build_critical_risks.cache_clear()
+            _build_milestones.cache_clear()
+            print("[Context] YAML files changed, cache cleared")
+
+
+def _ensure_watcher():
+    """Start the watcher thread once per process (threads don't survive fork)."""
+    global _watcher_pid, _watched_mtimes
+    pid = os.getpid()
+    if _watcher_pid == pid:
+        return
+    with _watcher_lock:
+        if _watcher_pid == pid:
+            return
+        _watched_mtimes = _scan_context_mtimes()
+        threading.Thread(
+            target=_watch_context_dir, name='context-watcher', daemon=True
+        ).start()
+        _watcher_pid = pid
+
+
+def _get_mtime(filename):
+    """Return (path, mtime) for a context file, or (path, None) if missing."""
     filepath = get_context_dir() / filename
-    if not filepath.exists():
+    if CONTEXT_WATCH:
+        _ensure_watcher()
+        return str(filepath), _watched_mtimes.get(filename)
+    try:
+        return str(filepath), filepath.stat().st_mtime
+    except FileNotFoundError:
+        return str(filepath), None
+
+
+def get_context_mtimes():
+    """
+    Get the mtime of every context YAML file (None if missing).
+
+    Anything derived purely from the context files can be cached on this.
+    """
+    return tuple(_get_mtime(filename)[1] for filename in CONTEXT_FILES.values())
+
+
+def load_yaml_file(filename):
+    """
+    Load a single YAML file from the context directory.
+
+    Parsed files are memoized per mtime, so the returned dict is shared
+    between callers and must be treated as read-only.
+    """
+    filepath, mtime = _get_mtime(filename)
+    if mtime is None:
         return {}
+    return _load_yaml_cached(filepath, mtime)
 
-    with open(filepath, 'r') as f:
-        return yaml.safe_load(f) or {}
+
+@lru_cache(maxsize=4)
+def _build_metric_index(filepath, mtime):
+    """Build {section: {metric_name: metric}} for the metric lists in metrics.yaml."""
+    metrics_data = _load_yaml_cached(filepath, mtime)
+    index = {}
+    for section in METRIC_SECTIONS:
+        by_name = {}
+        for m in metrics_data.get(section) or []:
+            # First entry wins, matching the previous linear scan
+            by_name.setdefault(m.get('metric'), m)
+        index[section] = by_name
+    return index
+
+
+def get_metric_index():
+    """
+    Get metrics.yaml entries indexed by section and metric name.
+
+    Returns:
+        dict: {section: {metric_name: metric}} for each of METRIC_SECTIONS
+    """
+    filepath, mtime = _get_mtime('metrics.yaml')
+    if mtime is None:
+        return {section: {} for section in METRIC_SECTIONS}
+    return _build_metric_index(filepath, mtime)
+
+
+def find_metric(section, metric_name):
+    """
+    Find a metric by name within a metrics.yaml section.
+
+    Args:
+        section: Section name (e.g., "financial_metrics")
+        metric_name: Value of the metric's 'metric' field
+
+    Returns:
+        dict: Metric entry or {} if not found
+    """
+    return get_metric_index().get(section, {}).get(metric_name) or {}
 
 
 def is_notion_configured():
@@ -25,6 +215,28 @@ def is_notion_configured():
     return bool(os.getenv('NOTION_API_KEY') and os.getenv('NOTION_PIPELINE_DB_ID'))
 
 
+def per_request_cache(f):
+    """
+    Memoize a zero-argument loader on flask.g for the rest of the request.
+
+    Outside a request (scripts, background threads) every call loads
+    afresh. flask.g is discarded with the request, so nothing needs
+    clearing; results are shared between callers and must be treated as
+    read-only.
+    """
+    attr = f'_context_{f.__name__}'
+
+    @wraps(f)
+    def wrapper():
+        if not has_request_context():
+            return f()
+        if attr not in g:
+            setattr(g, attr, f())
+        return getattr(g, attr)
+    return wrapper
+
+
+@per_request_cache
 def load_pipeline_from_notion():
     """
     Load pipeline data from Notion.
@@ -50,29 +262,45 @@ def load_pipeline_from_notion():
         return None
 
 
+@per_request_cache
 def load_all_context():
     """
     Load all context YAML files and return combined dictionary.
 
+    On a cold cache the files are parsed in a thread pool (file I/O and the
+    libyaml parser release the GIL); warm loads are plain dict lookups.
+
     Returns:
         dict: Combined context with keys: business, clients, goals, rules, pipeline, risks, metrics
     """
-    # Try Notion for pipeline first, fallback to YAML
-    pipeline = load_pipeline_from_notion()
+    keys = list(CONTEXT_FILES)
+    filenames = [CONTEXT_FILES[key] for key in keys]
+
+    if _load_yaml_cached.cache_info().currsize < len(filenames):
+        with ThreadPoolExecutor(max_workers=len(filenames) + 1) as executor:
+            # Try Notion for pipeline first, fallback to YAML
+            notion_future = executor.submit(load_pipeline_from_notion)
+            context = dict(zip(keys, executor.map(load_yaml_file, filenames)))
+            pipeline = notion_future.result()
+    else:
+        context = {key: load_yaml_file(filename) for key, filename in zip(keys, filenames)}
+        pipeline = load_pipeline_from_notion()
+
     if pipeline is None:
         pipeline = load_yaml_file('pipeline.yaml')
 
     return {
-        'business': load_yaml_file('business_context.yaml'),
-        'clients': load_yaml_file('clients.yaml'),
-        'goals': load_yaml_file('goals.yaml'),
-        'rules': load_yaml_file('rules.yaml'),
+        'business': context['business'],
+        'clients': context['clients'],
+        'goals': context['goals'],
+        'rules': context['rules'],
         'pipeline': pipeline,
-        'risks': load_yaml_file('risks.yaml'),
-        'metrics': load_yaml_file('metrics.yaml'),
+        'risks': context['risks'],
+        'metrics': context['metrics'],
     }
 
 
+@per_request_cache
 def load_pipeline():
     """Load pipeline data from Notion (preferred) or YAML fallback."""
     pipeline = load_pipeline_from_notion()
@@ -81,33 +309,42 @@ def load_pipeline():
     return load_yaml_file('pipeline.yaml')
 
 
-def get_deals_by_stage(stage_name):
+def get_deals_by_stage(stage_name, pipeline=None):
     """
     Get all deals at a specific stage.
 
     Args:
         stage_name: Stage name (e.g., "Won", "Verbal Agreement", "Procurement")
+        pipeline: Already loaded pipeline (default: load_pipeline())
 
     Returns:
         list: Deals at that stage
     """
-    pipeline = load_pipeline()
+    if pipeline is None:
+        pipeline = load_pipeline()
     deals = pipeline.get('deals', [])
     return [d for d in deals if d.get('stage') == stage_name]
 
 
-def get_overdue_deals():
+def get_overdue_deals(limit=None, today=None, pipeline=None):
     """
     Get all deals with expected close dates that have passed.
 
+    Args:
+        limit: Only return the N most overdue deals (default: all)
+        today: Reference date (default: date.today())
+        pipeline: Already loaded pipeline (default: load_pipeline())
+
     Returns:
-        list: Overdue deals with days_overdue added
+        list: Overdue deals with days_overdue added, most overdue first
     """
     from datetime import date
 
-    pipeline = load_pipeline()
+    if pipeline is None:
+        pipeline = load_pipeline()
     deals = pipeline.get('deals', [])
-    today = date.today()
+    if today is None:
+        today = date.today()
 
     overdue = []
     for deal in deals:
@@ -122,19 +359,25 @@ def get_overdue_deals():
             except ValueError:
                 pass
 
-    return sorted(overdue, key=lambda x: x.get('days_overdue', 0), reverse=True)
+    if limit is not None:
+        return heapq.nlargest(limit, overdue, key=lambda x: x['days_overdue'])
+    return sorted(overdue, key=lambda x: x['days_overdue'], reverse=True)
 
 
-def get_deals_closing_this_month():
+def get_deals_closing_this_month(pipeline=None):
     """
     Get all deals expected to close this month.
 
+    Args:
+        pipeline: Already loaded pipeline (default: load_pipeline())
+
     Returns:
         list: Deals closing this month
     """
     from datetime import date
 
-    pipeline = load_pipeline()
+    if pipeline is None:
+        pipeline = load_pipeline()
     deals = pipeline.get('deals', [])
     today = date.today()
 
@@ -152,47 +395,100 @@ def get_deals_closing_this_month():
     return closing
 
 
-def calculate_weighted_pipeline():
+def classify_deals(deals, today=None):
+    """
+    Total and classify pipeline deals in a single pass.
+
+    Matches get_overdue_deals (copies with days_overdue, most overdue first)
+    and get_deals_closing_this_month for the overdue and closing lists.
+
+    Args:
+        deals: Pipeline deal dicts
+        today: Reference date (default: date.today())
+
+    Returns:
+        DealSummary: Totals and deal lists
+    """
+    from datetime import date
+
+    if today is None:
+        today = date.today()
+    fromisoformat = date.fromisoformat
+
+    summary = DealSummary(deal_count=len(deals))
+    total_value = won_value = high_confidence_value = 0
+    overdue = summary.overdue
+    closing = summary.closing_this_month
+
+    for deal in deals:
+        value = deal.get('deal_value', 0)
+        stage = deal.get('stage')
+        total_value += value
+        if stage == 'Won':
+            won_value += value
+        elif deal.get('likelihood', 0) >= 8:
+            high_confidence_value += value
+
+        expected_close = deal.get('expected_close')
+        if not expected_close:
+            continue
+        try:
+            close_date = fromisoformat(expected_close)
+        except ValueError:
+            continue
+        if close_date.year == today.year and close_date.month == today.month:
+            closing.append(deal)
+        if close_date < today and stage != 'Won':
+            deal_copy = deal.copy()
+            deal_copy['days_overdue'] = (today - close_date).days
+            overdue.append(deal_copy)
+
+    overdue.sort(key=lambda x: x['days_overdue'], reverse=True)
+    summary.total_value = total_value
+    summary.won_value = won_value
+    summary.high_confidence_value = high_confidence_value
+    return summary
+
+
+def calculate_weighted_pipeline(pipeline=None):
     """
     Calculate weighted pipeline value based on likelihood scores.
 
+    Args:
+        pipeline: Already loaded pipeline (default: load_pipeline())
+
     Returns:
         dict: Pipeline breakdown by confidence level
     """
-    pipeline = load_pipeline()
+    if pipeline is None:
+        pipeline = load_pipeline()
     deals = pipeline.get('deals', [])
 
     committed = 0  # Won
     high_confidence = 0  # Verbal Agreement + Procurement (likelihood >= 7)
     medium_confidence = 0  # Proposals (likelihood >= 5)
-    weighted_total = 0
+    weighted_sum = 0  # Sum of value * likelihood for non-Won deals, scaled once below
 
     for deal in deals:
         value = deal.get('deal_value', 0)
         likelihood = deal.get('likelihood', 0)
         stage = deal.get('stage', '')
-        weight = likelihood / 10.0
 
         if stage == 'Won':
             committed += value
-            weighted_total += value
-        elif stage == 'Verbal Agreement':
-            high_confidence += value
-            weighted_total += value * weight
-        elif stage == 'Procurement' and likelihood >= 7:
+            continue
+
+        weighted_sum += value * likelihood
+        if stage == 'Verbal Agreement' or (stage == 'Procurement' and likelihood >= 7):
             high_confidence += value
-            weighted_total += value * weight
-        elif stage in ['Proposal Being Reviewed', 'Build Proposal']:
+        elif stage in _PROPOSAL_STAGES:
             medium_confidence += value
-            weighted_total += value * weight
-        else:
-            weighted_total += value * weight
 
     return {
         'committed': committed,
         'high_confidence': high_confidence,
         'medium_confidence': medium_confidence,
-        'weighted_total': int(weighted_total),
+        'weighted_total': int(committed + weighted_sum / 10.0),
         'total_deals': len(deals),
     }
 
@@ -281,33 +577,38 @@ def get_company_info():
     }
 
 
+@lru_cache(maxsize=4)
+def _build_critical_risks(filepath, mtime):
+    """Build RiskSummary objects once per risks.yaml mtime."""
+    all_risks = _load_yaml_cached(filepath, mtime).get('risks', [])
+    return tuple(
+        RiskSummary(
+            id=risk.get('id'),
+            name=risk.get('name'),
+            severity=risk.get('severity'),
+            category=risk.get('category'),
+            current_state=risk.get('current_state', {}),
+            specific_threats=risk.get('specific_threats', []),
+            exposures=risk.get('exposures', []),
+            mitigation=risk.get('mitigation', []),
+            ai_cfo_action=risk.get('ai_cfo_action'),
+        )
+        for risk in all_risks
+        if risk.get('severity', '').lower() in ('critical', 'high')
+    )
+
+
 def get_critical_risks():
     """
     Get all risks with severity="Critical" or "High".
 
     Returns:
-        list: Critical and high severity risks with relevant details
-    """
-    risks_data = load_yaml_file('risks.yaml')
-    all_risks = risks_data.get('risks', [])
-
-    critical_risks = []
-    for risk in all_risks:
-        severity = risk.get('severity', '').lower()
-        if severity in ['critical', 'high']:
-            critical_risks.append({
-                'id': risk.get('id'),
-                'name': risk.get('name'),
-                'severity': risk.get('severity'),
-                'category': risk.get('category'),
-                'current_state': risk.get('current_state', {}),
-                'specific_threats': risk.get('specific_threats', []),
-                'exposures': risk.get('exposures', []),
-                'mitigation': risk.get('mitigation', []),
-                'ai_cfo_action': risk.get('ai_cfo_action'),
-            })
-
-    return critical_risks
+        list[RiskSummary]: Critical and high severity risks with relevant details
+    """
+    filepath, mtime = _get_mtime('risks.yaml')
+    if mtime is None:
+        return []
+    return list(_build_critical_risks(filepath, mtime))
 
 
 def get_current_metrics():
@@ -317,21 +618,9 @@ def get_current_metrics():
     Returns:
         dict: Current metrics including financial health, services, and cost metrics
     """
-    metrics_data = load_yaml_file('metrics.yaml')
     business = load_yaml_file('business_context.yaml')
     financials = business.get('financials', {})
 
-    # Extract current values from metrics
-    financial_metrics = metrics_data.get('financial_metrics', [])
-    services_metrics = metrics_data.get('services_metrics', [])
-    cost_metrics = metrics_data.get('cost_metrics', [])
-
-    def find_metric(metrics_list, metric_name):
-        for m in metrics_list:
-            if m.get('metric') == metric_name:
-                return m
-        return {}
-
     return {
         # Financial health
         'annual_revenue': financials.get('annual_revenue', 1300000),
@@ -341,14 +630,14 @@ def get_current_metrics():
         'yoy_growth': financials.get('yoy_growth', 109),
 
         # Revenue mix (current vs target)
-        'revenue_mix': find_metric(financial_metrics, 'Revenue Mix'),
+        'revenue_mix': find_metric('financial_metrics', 'Revenue Mix'),
 
         # Client concentration
-        'client_concentration': find_metric(services_metrics, 'Client Concentration Ratio'),
+        'client_concentration': find_metric('services_metrics', 'Client Concentration Ratio'),
 
         # Cost metrics
-        'api_efficiency': find_metric(cost_metrics, 'API Efficiency Ratio'),
-        'data_source_dependency': find_metric(cost_metrics, 'Data Source Dependency'),
+        'api_efficiency': find_metric('cost_metrics', 'API Efficiency Ratio'),
+        'data_source_dependency': find_metric('cost_metrics', 'Data Source Dependency'),
     }
 
 
@@ -373,7 +662,6 @@ def get_transition_status():
     """
     business = load_yaml_file('business_context.yaml')
     goals = load_yaml_file('goals.yaml')
-    metrics = load_yaml_file('metrics.yaml')
 
     business_model = business.get('business_model', {})
     financials = business.get('financials', {})
@@ -381,12 +669,7 @@ def get_transition_status():
     financial_goals = goals.get('financial_goals', {})
 
     # Get revenue mix targets
-    financial_metrics = metrics.get('financial_metrics', [])
-    revenue_mix = {}
-    for m in financial_metrics:
-        if m.get('metric') == 'Revenue Mix':
-            revenue_mix = m
-            break
+    revenue_mix = find_metric('financial_metrics', 'Revenue Mix')
 
     return {
         'current_state': business_model.get('current_state', '100% services-led'),
@@ -414,19 +697,21 @@ def get_transition_status():
     }
 
 
-def get_deals_closing_next_n_days(days=30):
+def get_deals_closing_next_n_days(days=30, pipeline=None):
     """
     Get all deals expected to close within the next N days.
 
     Args:
         days: Number of days to look ahead (default 30)
+        pipeline: Already loaded pipeline (default: load_pipeline())
 
     Returns:
         list: Deals closing within the specified timeframe
     """
     from datetime import date, timedelta
 
-    pipeline = load_pipeline()
+    if pipeline is None:
+        pipeline = load_pipeline()
     deals = pipeline.get('deals', [])
     today = date.today()
     end_date = today + timedelta(days=days)
@@ -446,32 +731,32 @@ def get_deals_closing_next_n_days(days=30):
     return sorted(closing, key=lambda x: x.get('expected_close', ''))
 
 
+@lru_cache(maxsize=4)
+def _build_milestones(filepath, mtime):
+    """Build MilestoneSummary objects once per goals.yaml mtime."""
+    operational = _load_yaml_cached(filepath, mtime).get('operational_goals', {})
+
+    # Q1 2026 goals
+    return tuple(
+        MilestoneSummary(
+            quarter='Q1 2026',
+            goal=goal.get('goal'),
+            priority=goal.get('priority'),
+            value=goal.get('value') or goal.get('value_if_success'),
+            deadline=goal.get('deadline'),
+        )
+        for goal in operational.get('q1_2026', [])
+    )
+
+
 def get_milestones_next_90_days():
     """
     Get key milestones for the next 90 days.
 
     Returns:
-        list: Upcoming milestones from goals
+        list[MilestoneSummary]: Upcoming milestones from goals
     """
-    from datetime import date
-
-    goals_data = load_yaml_file('goals.yaml')
-    operational = goals_data.get('operational_goals', {})
-
-    # Determine current quarter
-    today = date.today()
-
-    # Get current and next quarter goals
-    milestones = []
-
-    # Q1 2026 goals
-    for goal in operational.get('q1_2026', []):
-        milestones.append({
-            'quarter': 'Q1 2026',
-            'goal': goal.get('goal'),
-            'priority': goal.get('priority'),
-            'value': goal.get('value') or goal.get('value_if_success'),
-            'deadline': goal.get('deadline'),
-        })
-
-    return milestones
+    filepath, mtime = _get_mtime('goals.yaml')
+    if mtime is None:
+        return []
+    return list(_build_milestones(filepath, mtime))
@@ -1,4 +1,4 @@
-from .db import db, init_db
+from .db import db, init_db, upsert, bulk_insert
 from .models import (
     XeroToken, FinancialSnapshot, InvoiceCache, AICache,
     MonthlySnapshot, AccountBalanceHistory,
@@ -7,7 +7,7 @@ from .models import (
 )
 
 __all__ = [
-    'db', 'init_db', 'XeroToken', 'FinancialSnapshot', 'InvoiceCache',
+    'db', 'init_db', 'upsert', 'bulk_insert', 'XeroToken', 'FinancialSnapshot', 'InvoiceCache',
     'AICache', 'MonthlySnapshot', 'AccountBalanceHistory',
     'HistoricalInvoice', 'HistoricalLineItem',
     'BankTransaction', 'MonthlyCashSnapshot'
@@ -1,10 +1,128 @@
 from flask_sqlalchemy import SQLAlchemy
+from sqlalchemy import text
 
 db = SQLAlchemy()
 
+# Indexes replaced by a wider index on the same model; dropped on startup so
+# existing databases don't maintain both
+RETIRED_INDEXES = [
+    'idx_invoice_type_date',  # Replaced by ix_invoice_type_date_id
+]
+
 
 def init_db(app):
     """Initialize the database with the Flask app."""
     db.init_app(app)
     with app.app_context():
         db.create_all()
+        create_missing_indexes()
+        drop_retired_indexes()
+
+
+def create_missing_indexes():
+    """
+    Create indexes declared on models that don't exist yet.
+
+    create_all() only creates indexes together with new tables, so indexes
+    added to an existing model would otherwise never reach the database.
+    """
+    for table in db.metadata.sorted_tables:
+        for index in table.indexes:
+            try:
+                with db.engine.begin() as conn:
+                    index.create(conn, checkfirst=True)
+            except Exception as e:
+                # Another worker may have created it concurrently
+                print(f"[DB] Could not create index {index.name}: {e}")
+
+
+def drop_retired_indexes():
+    """Drop the indexes listed in RETIRED_INDEXES if they still exist."""
+    for name in RETIRED_INDEXES:
+        try:
+            with db.engine.begin() as conn:
+                conn.execute(text(f'DROP INDEX IF EXISTS {name}'))
+        except Exception as e:
+            print(f"[DB] Could not drop index {name}: {e}")
+
+
+def upsert(model, rows, index_elements, update_columns=None, returning=False):
+    """
+    Insert rows, updating existing ones on a unique-key conflict, in one statement.
+
+    Uses INSERT ... ON CONFLICT DO UPDATE on PostgreSQL and SQLite (3.24+).
+    Runs in the current session; the caller commits.
+
+    Args:
+        model: Model class to insert into
+        rows: List of column dicts (all with the same keys)
+        index_elements: Columns of the unique constraint to conflict on
+        update_columns: Columns to overwrite on conflict (default: all non-key columns)
+        returning: Return the inserted/updated model instances
+
+    Returns:
+        list of model instances if returning, else the statement Result
+        (None if rows is empty)
+    """
+    if not rows:
+        return None
+
+    dialect = db.session.get_bind().dialect.name
+    if dialect == 'postgresql':
+        from sqlalchemy.dialects.postgresql import insert
+    elif dialect == 'sqlite':
+        from sqlalchemy.dialects.sqlite import insert
+    else:
+        raise NotImplementedError(f"upsert not supported for {dialect}")
+
+    if update_columns is None:
+        update_columns = [key for key in rows[0] if key not in index_elements]
+
+    stmt = insert(model).values(rows)
+    stmt = stmt.on_conflict_do_update(
+        index_elements=index_elements,
+        set_={column: stmt.excluded[column] for column in update_columns},
+    )
+    if returning:
+        stmt = stmt.returning(model)
+        return db.session.scalars(stmt, execution_options={'populate_existing': True}).all()
+    return db.session.execute(stmt)
+
+
+def bulk_insert(model, rows, chunk_size=1000, conflict_elements=None):
+    """
+    Insert plain dict rows with Core INSERT statements, skipping the ORM unit of work.
+
+    Each chunk is sent as one executemany, so no per-row instance state,
+    identity-map bookkeeping or primary-key fetch is needed. Runs in the
+    current session; the caller commits.
+
+    Args:
+        model: Model class to insert into
+        rows: List of column dicts (all with the same keys)
+        chunk_size: Rows per executemany batch
+        conflict_elements: Unique columns; rows that conflict are skipped
+            (INSERT ... ON CONFLICT DO NOTHING)
+
+    Returns:
+        int: Number of rows sent to the database
+    """
+    if not rows:
+        return 0
+
+    if conflict_elements:
+        dialect = db.session.get_bind().dialect.name
+        if dialect == 'postgresql':
+            from sqlalchemy.dialects.postgresql import insert
+        elif dialect == 'sqlite':
+            from sqlalchemy.dialects.sqlite import insert
+        else:
+            raise NotImplementedError(f"bulk_insert conflict handling not supported for {dialect}")
+        stmt = insert(model).on_conflict_do_nothing(index_elements=conflict_elements)
+    else:
+        from sqlalchemy import insert
+        stmt = insert(model)
+
+    for start in range(0, len(rows), chunk_size):
+        db.session.execute(stmt, rows[start:start + chunk_size])
+    return len(rows)
@@ -1,19 +1,135 @@
 from datetime import datetime
-from .db import db
-from cryptography.fernet import Fernet
+from functools import lru_cache
+from sqlalchemy import and_, case, func
+from sqlalchemy.ext.hybrid import hybrid_method
+from .db import db, upsert, bulk_insert
 import os
-import base64
+import orjson
 
 
+def _to_float(value):
+    """Convert a nullable Numeric column value to float (None -> 0.0)."""
+    return 0.0 if value is None else float(value)
+
+
+def _to_iso(value):
+    """Convert a nullable date/datetime to an ISO string."""
+    return value.isoformat() if value else None
+
+
+def _iso_column(values):
+    """
+    Convert a column of dates to ISO strings, formatting each distinct value once.
+
+    Date columns (snapshot months, transaction days) repeat heavily across
+    rows, so memoizing per column skips most isoformat() calls.
+    """
+    seen = {}
+    converted = []
+    for value in values:
+        iso = seen.get(value)
+        if iso is None:
+            iso = seen[value] = _to_iso(value)
+        converted.append(iso)
+    return converted
+
+
+def serialize_rows(query, columns, numeric=(), dates=()):
+    """
+    Serialize selected columns of a query without building ORM objects.
+
+    Rows are transposed so each column is converted in one pass, with the
+    conversion chosen once per column rather than per field, then zipped
+    back into dicts.
+
+    Args:
+        query: Filtered/ordered Query; its entities are replaced by columns
+        columns: Mapped columns to select; dict keys are their attribute names
+        numeric: Names of Numeric columns to return as float (None -> 0.0)
+        dates: Names of Date/DateTime columns to return as ISO strings
+
+    Returns:
+        list[dict]: One dict per row
+    """
+    names = [c.key for c in columns]
+    rows = query.with_entities(*columns).all()
+    if not rows:
+        return []
+
+    converted = []
+    for name, values in zip(names, zip(*rows)):
+        if name in numeric:
+            values = map(_to_float, values)
+        elif name in dates:
+            values = _iso_column(values)
+        converted.append(values)
+
+    return [dict(zip(names, row)) for row in zip(*converted)]
+
+
+@lru_cache(maxsize=1)
 def get_encryption_key():
-    """Get or generate encryption key for token storage."""
+    """Get or generate encryption key for token storage (read once per process)."""
     key = os.getenv('ENCRYPTION_KEY')
     if not key:
-        # In production, this should be a persistent key stored securely
-        key = base64.urlsafe_b64encode(os.urandom(32)).decode()
+        # In production, this should be a persistent key stored securely.
+        # Generated once per process (lru_cache), so tokens stay readable until restart.
+        print("[Crypto] WARNING: ENCRYPTION_KEY not set, using a transient dev key; "
+              "stored Xero tokens will be unreadable after a restart")
+        import base64
+        import secrets
+        key = base64.urlsafe_b64encode(secrets.token_bytes(32)).decode()
     return key.encode() if isinstance(key, str) else key
 
 
+@lru_cache(maxsize=1)
+def _get_fernet():
+    """
+    Get the shared Fernet cipher.
+
+    After changing ENCRYPTION_KEY (e.g. in tests), clear both this cache and
+    get_encryption_key's. cryptography is imported (and its backend logged)
+    here rather than at startup, so processes that never touch Xero tokens
+    skip its import cost.
+    """
+    from cryptography.fernet import Fernet
+    log_crypto_backend()
+    return Fernet(get_encryption_key())
+
+
+def _cpu_has_aes():
+    """Check /proc/cpuinfo for the AES-NI flag (None if it can't be determined)."""
+    try:
+        with open('/proc/cpuinfo') as f:
+            for line in f:
+                if line.startswith('flags'):
+                    return 'aes' in line.split()
+    except OSError:
+        pass
+    return None
+
+
+def log_crypto_backend():
+    """
+    Log the OpenSSL build backing Fernet and whether the CPU supports AES-NI.
+
+    Fernet already encrypts through OpenSSL's EVP interface, which uses AES-NI
+    automatically when the CPU has it, so this is a diagnostic only.
+    """
+    try:
+        from cryptography.hazmat.backends.openssl.backend import backend
+        version = backend.openssl_version_text()
+    except Exception as e:
+        print(f"[Crypto] Could not determine OpenSSL backend: {e}")
+        return
+
+    aes = _cpu_has_aes()
+    if aes is False:
+        print(f"[Crypto] {version} - CPU lacks AES-NI, token encryption uses software AES")
+    else:
+        print(f"[Crypto] {version} - AES-NI {'available' if aes else 'unknown'}")
+
+
 class XeroToken(db.Model):
     """Store OAuth tokens for Xero API access."""
 
@@ -32,14 +148,12 @@ class XeroToken(db.Model):
     @staticmethod
     def encrypt_token(token):
         """Encrypt a token for secure storage."""
-        f = Fernet(get_encryption_key())
-        return f.encrypt(token.encode()).decode()
+        return _get_fernet().encrypt(token.encode()).decode()
 
     @staticmethod
     def decrypt_token(encrypted_token):
         """Decrypt a stored token."""
-        f = Fernet(get_encryption_key())
-        return f.decrypt(encrypted_token.encode()).decode()
+        return _get_fernet().decrypt(encrypted_token.encode()).decode()
 
     def set_access_token(self, token):
         """Set and encrypt the access token."""
@@ -57,19 +171,24 @@ class XeroToken(db.Model):
         """Get and decrypt the refresh token."""
         return self.decrypt_token(self.refresh_token)
 
+    @hybrid_method
     def is_expired(self):
         """Check if the access token is expired."""
         return datetime.utcnow() >= self.expires_at
 
+    @is_expired.expression
+    def is_expired(cls):
+        return cls.expires_at <= datetime.utcnow()
+
     def to_dict(self):
         """Convert to dictionary for API responses (excluding sensitive data)."""
         return {
             'id': self.id,
             'tenant_id': self.tenant_id,
             'tenant_name': self.tenant_name,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'expires_at': _to_iso(self.expires_at),
             'is_expired': self.is_expired(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': _to_iso(self.created_at),
         }
 
 
@@ -91,13 +210,13 @@ class FinancialSnapshot(db.Model):
         """Convert to dictionary for API responses."""
         return {
             'id': self.id,
-            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
-            'cash_balance': float(self.cash_balance) if self.cash_balance else 0,
-            'receivables_total': float(self.receivables_total) if self.receivables_total else 0,
-            'receivables_overdue': float(self.receivables_overdue) if self.receivables_overdue else 0,
-            'payables_total': float(self.payables_total) if self.payables_total else 0,
-            'payables_overdue': float(self.payables_overdue) if self.payables_overdue else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'snapshot_date': _to_iso(self.snapshot_date),
+            'cash_balance': _to_float(self.cash_balance),
+            'receivables_total': _to_float(self.receivables_total),
+            'receivables_overdue': _to_float(self.receivables_overdue),
+            'payables_total': _to_float(self.payables_total),
+            'payables_overdue': _to_float(self.payables_overdue),
+            'created_at': _to_iso(self.created_at),
         }
 
 
@@ -127,11 +246,11 @@ class InvoiceCache(db.Model):
             'contact_name': self.contact_name,
             'invoice_type': self.invoice_type,
             'status': self.status,
-            'amount_due': float(self.amount_due) if self.amount_due else 0,
-            'total': float(self.total) if self.total else 0,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'issue_date': self.issue_date.isoformat() if self.issue_date else None,
-            'updated_at': self.updated_at.isoformat() if self.updated_at else None,
+            'amount_due': _to_float(self.amount_due),
+            'total': _to_float(self.total),
+            'due_date': _to_iso(self.due_date),
+            'issue_date': _to_iso(self.issue_date),
+            'updated_at': _to_iso(self.updated_at),
         }
 
     def days_until_due(self):
@@ -159,18 +278,36 @@ class AICache(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
     expires_at = db.Column(db.DateTime, nullable=False, index=True)  # Index for cleanup queries
 
+    @hybrid_method
     def is_expired(self):
         """Check if the cache entry is expired."""
         return datetime.utcnow() >= self.expires_at
 
+    @is_expired.expression
+    def is_expired(cls):
+        return cls.expires_at <= datetime.utcnow()
+
+    @staticmethod
+    def encode_value(obj):
+        """Encode a response as compact JSON for storage."""
+        return orjson.dumps(obj, default=str, option=orjson.OPT_NON_STR_KEYS).decode()
+
+    def set_value(self, obj):
+        """Store a response as compact JSON."""
+        self.value = self.encode_value(obj)
+
+    def get_value(self):
+        """Decode the stored JSON response."""
+        return orjson.loads(self.value)
+
     def to_dict(self):
         """Convert to dictionary."""
         return {
             'id': self.id,
             'cache_key': self.cache_key,
             'cache_type': self.cache_type,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
-            'expires_at': self.expires_at.isoformat() if self.expires_at else None,
+            'created_at': _to_iso(self.created_at),
+            'expires_at': _to_iso(self.expires_at),
             'is_expired': self.is_expired(),
         }
 
@@ -196,26 +333,41 @@ class MonthlySnapshot(db.Model):
         """Convert to dictionary for API responses."""
         return {
             'id': self.id,
-            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
-            'cash_position': float(self.cash_position) if self.cash_position else 0,
-            'receivables_total': float(self.receivables_total) if self.receivables_total else 0,
-            'receivables_overdue': float(self.receivables_overdue) if self.receivables_overdue else 0,
-            'payables_total': float(self.payables_total) if self.payables_total else 0,
-            'payables_overdue': float(self.payables_overdue) if self.payables_overdue else 0,
-            'revenue': float(self.revenue) if self.revenue else 0,
-            'expenses': float(self.expenses) if self.expenses else 0,
-            'net_profit': float(self.net_profit) if self.net_profit else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'snapshot_date': _to_iso(self.snapshot_date),
+            'cash_position': _to_float(self.cash_position),
+            'receivables_total': _to_float(self.receivables_total),
+            'receivables_overdue': _to_float(self.receivables_overdue),
+            'payables_total': _to_float(self.payables_total),
+            'payables_overdue': _to_float(self.payables_overdue),
+            'revenue': _to_float(self.revenue),
+            'expenses': _to_float(self.expenses),
+            'net_profit': _to_float(self.net_profit),
+            'created_at': _to_iso(self.created_at),
         }
 
     @classmethod
-    def get_or_create(cls, snapshot_date):
-        """Get existing snapshot or create new one (upsert logic)."""
-        existing = cls.query.filter_by(snapshot_date=snapshot_date).first()
-        if existing:
-            return existing, False
-        new_snapshot = cls(snapshot_date=snapshot_date)
-        return new_snapshot, True
+    def serialize_query(cls, query):
+        """Bulk equivalent of [s.to_dict() for s in query] for list endpoints."""
+        numeric = ('cash_position', 'receivables_total', 'receivables_overdue',
+                   'payables_total', 'payables_overdue', 'revenue', 'expenses', 'net_profit')
+        return serialize_rows(
+            query,
+            (cls.id, cls.snapshot_date, *(getattr(cls, name) for name in numeric), cls.created_at),
+            numeric=numeric,
+            dates=('snapshot_date', 'created_at'),
+        )
+
+    @classmethod
+    def upsert_snapshot(cls, snapshot_data):
+        """
+        Insert or update the snapshot for snapshot_data['snapshot_date'].
+
+        Single INSERT ... ON CONFLICT DO UPDATE; the caller commits.
+
+        Returns:
+            MonthlySnapshot: The stored snapshot
+        """
+        return upsert(cls, [snapshot_data], index_elements=['snapshot_date'], returning=True)[0]
 
 
 class AccountBalanceHistory(db.Model):
@@ -231,6 +383,9 @@ class AccountBalanceHistory(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Composite unique constraint
+    # The unique constraint's composite (snapshot_date, account_id) index also
+    # serves the upsert conflict target and per-account lookups, so no
+    # separate index is declared for that pair.
     __table_args__ = (
         db.UniqueConstraint('snapshot_date', 'account_id', name='unique_account_snapshot'),
     )
@@ -239,11 +394,11 @@ class AccountBalanceHistory(db.Model):
         """Convert to dictionary for API responses."""
         return {
             'id': self.id,
-            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
+            'snapshot_date': _to_iso(self.snapshot_date),
             'account_id': self.account_id,
             'account_name': self.account_name,
-            'balance': float(self.balance) if self.balance else 0,
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'balance': _to_float(self.balance),
+            'created_at': _to_iso(self.created_at),
         }
 
 
@@ -270,77 +425,136 @@ class HistoricalInvoice(db.Model):
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
     # Relationships
-    line_items = db.relationship('HistoricalLineItem', backref='invoice', lazy='dynamic',
+    # Plain lazy load; callers that need items should use selectinload()
+    line_items = db.relationship('HistoricalLineItem', backref='invoice',
                                  cascade='all, delete-orphan')
 
     # Composite unique constraint and indexes for query optimization
     __table_args__ = (
         db.UniqueConstraint('invoice_number', 'invoice_type', name='unique_invoice_number_type'),
-        db.Index('idx_invoice_type_date', 'invoice_type', 'invoice_date'),  # For drill-down queries
+        # Drill-down pages walk (invoice_date, id) newest first within a type
+        db.Index('ix_invoice_type_date_id', 'invoice_type', 'invoice_date', 'id'),
         db.Index('idx_invoice_status', 'status'),  # For status filtering
+        db.Index('ix_invoice_status_due', 'status', 'due_date'),  # For overdue queries
     )
 
-    # Approximate currency conversion rates to GBP
+    # Approximate currency conversion rates to GBP. The hybrid methods below
+    # work on instances and as SQL expressions for aggregate queries, e.g.
+    # db.session.query(func.sum(HistoricalInvoice.signed_gbp_total()))
     CURRENCY_RATES = {
         'GBP': 1.0,
         'EUR': 0.85,
         'USD': 0.79,
     }
 
+    @hybrid_method
     def calculate_gbp_total(self):
         """Calculate GBP equivalent of total."""
         rate = self.CURRENCY_RATES.get(self.currency, 1.0)
-        return float(self.total or 0) * rate
+        return _to_float(self.total) * rate
+
+    @calculate_gbp_total.expression
+    def calculate_gbp_total(cls):
+        rate = case(
+            *[(cls.currency == code, r) for code, r in cls.CURRENCY_RATES.items() if r != 1.0],
+            else_=1.0,
+        )
+        return func.coalesce(cls.total, 0) * rate
 
+    @hybrid_method
     def signed_total(self):
         """Get total with correct sign (negative for credit notes)."""
-        total = float(self.total or 0)
+        total = _to_float(self.total)
         return -total if self.is_credit_note else total
 
+    @signed_total.expression
+    def signed_total(cls):
+        total = func.coalesce(cls.total, 0)
+        return case((cls.is_credit_note == True, -total), else_=total)
+
+    @hybrid_method
     def signed_gbp_total(self):
         """Get GBP total with correct sign."""
-        total = float(self.gbp_total or 0)
+        total = _to_float(self.gbp_total)
         return -total if self.is_credit_note else total
 
+    @signed_gbp_total.expression
+    def signed_gbp_total(cls):
+        total = func.coalesce(cls.gbp_total, 0)
+        return case((cls.is_credit_note == True, -total), else_=total)
+
+    @hybrid_method
     def net_total(self):
         """Get total excluding tax."""
-        return float(self.total or 0) - float(self.tax_total or 0)
+        return _to_float(self.total) - _to_float(self.tax_total)
+
+    @net_total.expression
+    def net_total(cls):
+        return func.coalesce(cls.total, 0) - func.coalesce(cls.tax_total, 0)
 
     def to_dict(self):
         """Convert to dictionary for API responses."""
+        today = datetime.utcnow().date()
+        overdue = self.is_overdue(today)
         return {
             'id': self.id,
             'invoice_number': self.invoice_number,
             'invoice_type': self.invoice_type,
             'is_credit_note': self.is_credit_note,
             'contact_name': self.contact_name,
-            'invoice_date': self.invoice_date.isoformat() if self.invoice_date else None,
-            'due_date': self.due_date.isoformat() if self.due_date else None,
-            'total': float(self.total) if self.total else 0,
-            'tax_total': float(self.tax_total) if self.tax_total else 0,
-            'amount_paid': float(self.amount_paid) if self.amount_paid else 0,
-            'amount_due': float(self.amount_due) if self.amount_due else 0,
+            'invoice_date': _to_iso(self.invoice_date),
+            'due_date': _to_iso(self.due_date),
+            'total': _to_float(self.total),
+            'tax_total': _to_float(self.tax_total),
+            'amount_paid': _to_float(self.amount_paid),
+            'amount_due': _to_float(self.amount_due),
             'currency': self.currency,
-            'gbp_total': float(self.gbp_total) if self.gbp_total else 0,
+            'gbp_total': _to_float(self.gbp_total),
             'status': self.status,
             'source': self.source,
-            'is_overdue': self.is_overdue(),
-            'days_overdue': self.days_overdue(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'is_overdue': overdue,
+            'days_overdue': self.days_overdue(today, overdue),
+            'created_at': _to_iso(self.created_at),
         }
 
-    def is_overdue(self):
+    @classmethod
+    def bulk_insert(cls, rows):
+        """Insert invoice dicts in bulk, skipping existing invoice_number/type pairs."""
+        return bulk_insert(cls, rows, conflict_elements=['invoice_number', 'invoice_type'])
+
+    # The overdue checks below take an optional `today` so list serializers
+    # can resolve the date once per request. As SQL expressions, e.g.
+    # query.add_columns(HistoricalInvoice.is_overdue().label('is_overdue')),
+    # the database computes the flag for every row.
+    @hybrid_method
+    def is_overdue(self, today=None):
         """Check if invoice is overdue (unpaid and past due date)."""
         if self.status == 'Paid' or not self.due_date:
             return False
-        return self.due_date < datetime.utcnow().date()
-
-    def days_overdue(self):
-        """Calculate days overdue (0 if not overdue)."""
-        if not self.is_overdue():
+        return self.due_date < (today or datetime.utcnow().date())
+
+    @is_overdue.expression
+    def is_overdue(cls, today=None):
+        return case(
+            (and_(func.coalesce(cls.status, '') != 'Paid',
+                  cls.due_date < (today or datetime.utcnow().date())), True),
+            else_=False,
+        )
+
+    def days_overdue(self, today=None, is_overdue=None):
+        """
+        Calculate days overdue (0 if not overdue).
+
+        Args:
+            today: Reference date (default: today, UTC)
+            is_overdue: Precomputed overdue flag, e.g. from the SQL expression
+        """
+        today = today or datetime.utcnow().date()
+        if is_overdue is None:
+            is_overdue = self.is_overdue(today)
+        if not is_overdue:
             return 0
-        delta = datetime.utcnow().date() - self.due_date
-        return delta.days
+        return (today - self.due_date).days
 
 
 class HistoricalLineItem(db.Model):
@@ -364,13 +578,18 @@ class HistoricalLineItem(db.Model):
             'id': self.id,
             'invoice_id': self.invoice_id,
             'description': self.description,
-            'quantity': float(self.quantity) if self.quantity else 0,
-            'unit_amount': float(self.unit_amount) if self.unit_amount else 0,
-            'line_amount': float(self.line_amount) if self.line_amount else 0,
+            'quantity': _to_float(self.quantity),
+            'unit_amount': _to_float(self.unit_amount),
+            'line_amount': _to_float(self.line_amount),
             'account_code': self.account_code,
             'tax_type': self.tax_type,
         }
 
+    @classmethod
+    def bulk_insert(cls, rows):
+        """Insert line item dicts in bulk (rows must carry invoice_id)."""
+        return bulk_insert(cls, rows)
+
 
 class BankTransaction(db.Model):
     """Store historical bank transactions imported from Xero exports."""
@@ -388,26 +607,56 @@ class BankTransaction(db.Model):
     credit_gbp = db.Column(db.Numeric(12, 2), default=0)  # Money OUT
     created_at = db.Column(db.DateTime, default=datetime.utcnow)
 
+    __table_args__ = (
+        # Drill-down filters: date range plus optional account/type
+        db.Index('ix_bank_date_account_source', 'transaction_date', 'bank_account', 'source_type'),
+        # Per-type totals over a date range (cash concentration, vendor and
+        # revenue rollups); on PostgreSQL the included columns make these
+        # index-only scans
+        db.Index('ix_bt_source_date', 'source_type', 'transaction_date',
+                 postgresql_include=['description', 'debit_gbp', 'credit_gbp']),
+    )
+
+    @classmethod
+    def bulk_insert(cls, rows):
+        """Insert transaction dicts in bulk."""
+        return bulk_insert(cls, rows)
+
     def net_amount(self):
         """Get net amount (positive = money in, negative = money out)."""
-        return float(self.debit_gbp or 0) - float(self.credit_gbp or 0)
+        return _to_float(self.debit_gbp) - _to_float(self.credit_gbp)
 
     def to_dict(self):
         """Convert to dictionary for API responses."""
         return {
             'id': self.id,
-            'transaction_date': self.transaction_date.isoformat() if self.transaction_date else None,
+            'transaction_date': _to_iso(self.transaction_date),
             'bank_account': self.bank_account,
             'source_type': self.source_type,
             'description': self.description,
             'reference': self.reference,
             'currency': self.currency,
-            'debit_gbp': float(self.debit_gbp) if self.debit_gbp else 0,
-            'credit_gbp': float(self.credit_gbp) if self.credit_gbp else 0,
+            'debit_gbp': _to_float(self.debit_gbp),
+            'credit_gbp': _to_float(self.credit_gbp),
             'net_amount': self.net_amount(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': _to_iso(self.created_at),
         }
 
+    @classmethod
+    def serialize_query(cls, query):
+        """Bulk equivalent of [t.to_dict() for t in query] for list endpoints."""
+        rows = serialize_rows(
+            query,
+            (cls.id, cls.transaction_date, cls.bank_account, cls.source_type,
+             cls.description, cls.reference, cls.currency, cls.debit_gbp,
+             cls.credit_gbp, cls.created_at),
+            numeric=('debit_gbp', 'credit_gbp'),
+            dates=('transaction_date', 'created_at'),
+        )
+        for row in rows:
+            row['net_amount'] = row['debit_gbp'] - row['credit_gbp']
+        return rows
+
 
 class MonthlyCashSnapshot(db.Model):
     """Store monthly cash flow snapshots calculated from bank transactions."""
@@ -426,25 +675,25 @@ class MonthlyCashSnapshot(db.Model):
 
     def net_change(self):
         """Get net change for the month."""
-        return float(self.total_in or 0) - float(self.total_out or 0)
+        return _to_float(self.total_in) - _to_float(self.total_out)
 
     def total_payroll(self):
         """Get total payroll (wages + HMRC)."""
-        return float(self.wages_paid or 0) + float(self.hmrc_paid or 0)
+        return _to_float(self.wages_paid) + _to_float(self.hmrc_paid)
 
     def to_dict(self):
         """Convert to dictionary for API responses."""
         return {
             'id': self.id,
-            'snapshot_date': self.snapshot_date.isoformat() if self.snapshot_date else None,
+            'snapshot_date': _to_iso(self.snapshot_date),
             'month': self.snapshot_date.strftime('%Y-%m') if self.snapshot_date else None,
-            'opening_balance': float(self.opening_balance) if self.opening_balance else 0,
-            'total_in': float(self.total_in) if self.total_in else 0,
-            'total_out': float(self.total_out) if self.total_out else 0,
-            'closing_balance': float(self.closing_balance) if self.closing_balance else 0,
+            'opening_balance': _to_float(self.opening_balance),
+            'total_in': _to_float(self.total_in),
+            'total_out': _to_float(self.total_out),
+            'closing_balance': _to_float(self.closing_balance),
             'net_change': self.net_change(),
-            'wages_paid': float(self.wages_paid) if self.wages_paid else 0,
-            'hmrc_paid': float(self.hmrc_paid) if self.hmrc_paid else 0,
+            'wages_paid': _to_float(self.wages_paid),
+            'hmrc_paid': _to_float(self.hmrc_paid),
             'total_payroll': self.total_payroll(),
-            'created_at': self.created_at.isoformat() if self.created_at else None,
+            'created_at': _to_iso(self.created_at),
         }
@@ -20,12 +20,28 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from backend.app import create_app
-from backend.database.db import db
-from backend.database.models import MonthlySnapshot, AccountBalanceHistory
+from backend.config import Config
+# create_app() puts backend/ on sys.path and registers the `database` package;
+# importing `backend.database` here would give a second, unbound db instance.
+from database import db, upsert, MonthlySnapshot, AccountBalanceHistory
 from backend.xero.client import XeroClient
 from backend.xero.auth import XeroAuth
 
 
+def _to_dec(value) -> Decimal:
+    """
+    Convert a Xero summary amount to Decimal.
+
+    Decimals and ints convert exactly without a string round-trip; floats go
+    through repr() (shortest round-tripping form) to avoid binary artifacts.
+    """
+    if isinstance(value, Decimal):
+        return value
+    if isinstance(value, float):
+        return Decimal(repr(value))
+    return Decimal(value or 0)
+
+
 def capture_snapshot(dry_run: bool = False) -> dict:
     """
     Capture a snapshot of current financial state.
@@ -39,7 +55,7 @@ def capture_snapshot(dry_run: bool = False) -> dict:
     Returns:
         Dict with snapshot data and status
     """
-    app = create_app()
+    app = create_app(engine_options=Config.SCRIPT_ENGINE_OPTIONS)
 
     with app.app_context():
         # Check Xero connection
@@ -72,14 +88,14 @@ def capture_snapshot(dry_run: bool = False) -> dict:
             # Prepare snapshot data
             snapshot_data = {
                 'snapshot_date': snapshot_date,
-                'cash_position': Decimal(str(bank_summary.get('total_balance', 0))),
-                'receivables_total': Decimal(str(receivables.get('total', 0))),
-                'receivables_overdue': Decimal(str(receivables.get('overdue', 0))),
-                'payables_total': Decimal(str(payables.get('total', 0))),
-                'payables_overdue': Decimal(str(payables.get('overdue', 0))),
-                'revenue': Decimal(str(pnl.get('revenue', 0))),
-                'expenses': Decimal(str(pnl.get('expenses', 0))),
-                'net_profit': Decimal(str(pnl.get('net_profit', 0))),
+                'cash_position': _to_dec(bank_summary.get('total_balance', 0)),
+                'receivables_total': _to_dec(receivables.get('total', 0)),
+                'receivables_overdue': _to_dec(receivables.get('overdue', 0)),
+                'payables_total': _to_dec(payables.get('total', 0)),
+                'payables_overdue': _to_dec(payables.get('overdue', 0)),
+                'revenue': _to_dec(pnl.get('revenue', 0)),
+                'expenses': _to_dec(pnl.get('expenses', 0)),
+                'net_profit': _to_dec(pnl.get('net_profit', 0)),
             }
 
             if dry_run:
@@ -94,47 +110,31 @@ def capture_snapshot(dry_run: bool = False) -> dict:
                 print(f"  Net Profit: {snapshot_data['net_profit']:.2f}")
                 return {'success': True, 'dry_run': True, 'data': snapshot_data}
 
-            # Check if snapshot exists for this month (upsert)
-            existing = MonthlySnapshot.query.filter_by(snapshot_date=snapshot_date).first()
-
-            if existing:
-                print(f"  Updating existing snapshot for {snapshot_date.strftime('%B %Y')}...")
-                for key, value in snapshot_data.items():
-                    if key != 'snapshot_date':
-                        setattr(existing, key, value)
-                snapshot = existing
-            else:
-                print(f"  Creating new snapshot for {snapshot_date.strftime('%B %Y')}...")
-                snapshot = MonthlySnapshot(**snapshot_data)
-                db.session.add(snapshot)
+            # Insert or update this month's snapshot in one statement
+            print(f"  Saving snapshot for {snapshot_date.strftime('%B %Y')}...")
+            snapshot = MonthlySnapshot.upsert_snapshot(snapshot_data)
 
             # Also capture individual account balances for detailed history
             print("  Saving account balances...")
-            accounts = bank_summary.get('accounts', [])
-            for account in accounts:
+            balance_rows = {}
+            for account in bank_summary.get('accounts', []):
                 account_name = account.get('name', 'Unknown')
-                balance = Decimal(str(account.get('balance', 0)))
 
                 # Use account name as ID since Xero bank summary doesn't include IDs
                 account_id = account_name.replace(' ', '_').lower()
-
-                # Check for existing balance record
-                existing_balance = AccountBalanceHistory.query.filter_by(
-                    snapshot_date=snapshot_date,
-                    account_id=account_id
-                ).first()
-
-                if existing_balance:
-                    existing_balance.balance = balance
-                    existing_balance.account_name = account_name
-                else:
-                    new_balance = AccountBalanceHistory(
-                        snapshot_date=snapshot_date,
-                        account_id=account_id,
-                        account_name=account_name,
-                        balance=balance
-                    )
-                    db.session.add(new_balance)
+                balance_rows[account_id] = {
+                    'snapshot_date': snapshot_date,
+                    'account_id': account_id,
+                    'account_name': account_name,
+                    'balance': _to_dec(account.get('balance', 0)),
+                }
+
+            # One bulk upsert on the (snapshot_date, account_id) unique constraint
+            upsert(
+                AccountBalanceHistory,
+                list(balance_rows.values()),
+                index_elements=['snapshot_date', 'account_id'],
+            )
 
             db.session.commit()
 
@@ -0,0 +1,161 @@
+"""
+orjson-backed JSON provider for Flask.
+
+Installed in create_app() so jsonify() and request.get_json() encode and
+decode with orjson instead of the stdlib json module. Output matches
+Flask's default provider for the types this app returns: dates use the
+HTTP date format, Decimals become strings, dataclasses become dicts.
+
+json_response() skips jsonify() entirely for hot routes that always
+return a single dict. etag_response() adds ETag revalidation for cached
+payloads.
+json_endpoint wraps a route returning a plain dict in the usual success
+and error envelopes.
+"""
+import dataclasses
+import decimal
+import hashlib
+import uuid
+from datetime import date
+from functools import wraps
+
+import orjson
+from flask import Response, request
+from flask.json.provider import JSONProvider
+from werkzeug.http import http_date
+
+_OPTIONS = orjson.OPT_NON_STR_KEYS | orjson.OPT_PASSTHROUGH_DATETIME
+
+
+def _default(obj):
+    """Encode types orjson doesn't handle the way Flask's default provider does."""
+    if isinstance(obj, date):
+        return http_date(obj)
+    if isinstance(obj, (decimal.Decimal, uuid.UUID)):
+        return str(obj)
+    if dataclasses.is_dataclass(obj) and not isinstance(obj, type):
+        return dataclasses.asdict(obj)
+    if hasattr(obj, '__html__'):
+        return str(obj.__html__())
+    raise TypeError(f"Object of type {type(obj).__name__} is not JSON serializable")
+
+
+class OrjsonProvider(JSONProvider):
+    """JSON provider that serializes with orjson."""
+
+    mimetype = 'application/json'
+
+    def _encode(self, obj):
+        option = _OPTIONS
+        if self._app.debug:
+            option |= orjson.OPT_INDENT_2
+        return orjson.dumps(obj, default=_default, option=option)
+
+    def dumps(self, obj, **kwargs):
+        return self._encode(obj).decode()
+
+    def loads(self, s, **kwargs):
+        return orjson.loads(s)
+
+    def response(self, *args, **kwargs):
+        """Build a JSON response straight from orjson's bytes output."""
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self._encode(obj) + b'\n', mimetype=self.mimetype)
+
+
+def json_response(payload, status=200, headers=None):
+    """
+    Build a JSON response from orjson's bytes output.
+
+    Unlike jsonify(), the payload is never pretty-printed and no argument
+    normalization is done.
+
+    Args:
+        payload: Response body (dict or list)
+        status: HTTP status code
+        headers: Optional extra headers
+
+    Returns:
+        Response: application/json response
+    """
+    return Response(orjson.dumps(payload, default=_default, option=_OPTIONS),
+                    status=status, headers=headers, mimetype='application/json')
+
+
+def payload_etag(payload):
+    """
+    Hash a JSON payload into an ETag value.
+
+    BLAKE2b is used for speed; the tag only needs to change when the
+    payload does.
+
+    Args:
+        payload: JSON-serializable response body
+
+    Returns:
+        str: 32-character hex digest
+    """
+    body = orjson.dumps(payload, default=_default, option=_OPTIONS)
+    return hashlib.blake2b(body, digest_size=16).hexdigest()
+
+
+def not_modified(etag):
+    """
+    Get a 304 response if the client's If-None-Match already has this tag.
+
+    Args:
+        etag: Tag identifying the current payload
+
+    Returns:
+        Response: 304 Not Modified carrying the tag, or None
+    """
+    if not request.if_none_match.contains_weak(etag):
+        return None
+    return with_etag(Response(status=304), etag)
+
+
+def with_etag(response, etag):
+    """
+    Mark a response with a weak ETag and Cache-Control: no-cache.
+
+    no-cache makes browsers always revalidate; an unchanged payload then
+    costs a bodyless 304.
+    """
+    response.set_etag(etag, weak=True)
+    response.cache_control.no_cache = True
+    return response
+
+
+def etag_response(payload, etag):
+    """
+    Build a JSON response carrying a weak ETag, or a 304 if the client has it.
+
+    Args:
+        payload: Response body (dict or list)
+        etag: Tag identifying the payload, e.g. from payload_etag()
+
+    Returns:
+        Response: 304 Not Modified or 200 application/json response
+    """
+    return not_modified(etag) or with_etag(json_response(payload), etag)
+
+
+def json_endpoint(f):
+    """
+    Decorator for routes that return their payload as a plain dict.
+
+    The dict is sent as {'success': True, **payload}; an exception becomes
+    {'success': False, 'error': str(e)} with status 500. A route can still
+    return a full response (or response tuple) for other statuses.
+    """
+    @wraps(f)
+    def decorated(*args, **kwargs):
+        try:
+            result = f(*args, **kwargs)
+        except Exception as e:
+            print(f"[API] {request.path} failed: {e}")
+            return json_response({'success': False, 'error': str(e)}, 500)
+        if not isinstance(result, dict):
+            return result
+        return json_response({'success': True, **result})
+    return decorated
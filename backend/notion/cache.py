@@ -1,16 +1,79 @@
-"""Simple file-based cache for Notion data."""
+"""
+Simple file-based cache for Notion data.
 
-import json
+A process-local in-memory layer fronts the files so most reads never touch
+disk; files persist the cache across restarts and are written in the
+background.
+"""
+
+import contextlib
 import os
-from datetime import datetime, timedelta
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
 from pathlib import Path
 from typing import Optional, Any
 
+import orjson
+
 
 # Cache directory relative to backend
 CACHE_DIR = Path(__file__).parent.parent / 'cache'
 CACHE_TTL_MINUTES = 60  # Cache expires after 60 minutes
 
+# key -> (expires_at monotonic, cached_at epoch, data)
+_mem_cache: dict[str, tuple[float, float, dict]] = {}
+_mem_lock = threading.Lock()
+
+# Disk writes/deletes run on one background thread so they stay ordered.
+# _disk_generation is bumped on clear so queued writes for a cleared key are dropped.
+_disk_lock = threading.Lock()
+_disk_generation: dict[str, int] = {}
+_disk_executor = None
+_disk_executor_pid = None
+
+
+def _get_disk_executor() -> ThreadPoolExecutor:
+    """Get the disk writer, recreating it after a fork (threads don't survive fork)."""
+    global _disk_executor, _disk_executor_pid
+    pid = os.getpid()
+    if _disk_executor_pid != pid:
+        with _disk_lock:
+            if _disk_executor_pid != pid:
+                _disk_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notion-cache')
+                _disk_executor_pid = pid
+    return _disk_executor
+
+
+def _remember(key: str, data: dict, cached_at: float) -> None:
+    """Store data in the memory layer for the rest of its TTL."""
+    remaining = CACHE_TTL_MINUTES * 60 - (time.time() - cached_at)
+    if remaining > 0:
+        with _mem_lock:
+            _mem_cache[key] = (time.monotonic() + remaining, cached_at, data)
+
+
+def _recall(key: str) -> Optional[tuple[float, dict]]:
+    """Get (cached_at, data) from the memory layer if present and fresh."""
+    with _mem_lock:
+        entry = _mem_cache.get(key)
+        if entry is None:
+            return None
+        expires_at, cached_at, data = entry
+        if time.monotonic() >= expires_at:
+            del _mem_cache[key]
+            return None
+        return cached_at, data
+
+
+def _forget(key: str) -> None:
+    """Drop a key from memory and invalidate any queued disk write for it."""
+    with _mem_lock:
+        _mem_cache.pop(key, None)
+    with _disk_lock:
+        _disk_generation[key] = _disk_generation.get(key, 0) + 1
+
 
 def _ensure_cache_dir():
     """Create cache directory if it doesn't exist."""
@@ -22,6 +85,26 @@ def _cache_path(key: str) -> Path:
     return CACHE_DIR / f"{key}.json"
 
 
+def _read_file(key: str) -> Optional[dict]:
+    """Read a cache file, returning None if missing or unreadable."""
+    try:
+        with open(_cache_path(key), 'rb') as f:
+            return orjson.loads(f.read())
+    except (FileNotFoundError, orjson.JSONDecodeError, IOError):
+        return None
+
+
+def _cached_at_epoch(data: dict) -> Optional[float]:
+    """Get _cached_at as epoch seconds (older files stored a naive UTC ISO string)."""
+    cached_at = data.get('_cached_at')
+    if isinstance(cached_at, str):
+        try:
+            return datetime.fromisoformat(cached_at).replace(tzinfo=timezone.utc).timestamp()
+        except ValueError:
+            return None
+    return cached_at
+
+
 def get_cached(key: str) -> Optional[dict]:
     """
     Get cached data if it exists and is valid.
@@ -32,46 +115,86 @@ def get_cached(key: str) -> Optional[dict]:
     Returns:
         dict or None: Cached data if valid, None otherwise
     """
-    cache_file = _cache_path(key)
+    entry = _recall(key)
+    if entry is not None:
+        return dict(entry[1])
 
-    if not cache_file.exists():
+    data = _read_file(key)
+    if data is None:
         return None
 
+    # Check if cache is still valid
+    cached_at = _cached_at_epoch(data)
+    if cached_at and time.time() - cached_at < CACHE_TTL_MINUTES * 60:
+        _remember(key, data, cached_at)
+        return dict(data)
+
+    return None  # Cache expired
+
+
+def get_stale(key: str) -> Optional[dict]:
+    """
+    Get cached data even if it has expired, for revalidation.
+
+    Args:
+        key: Cache key
+
+    Returns:
+        dict or None: Cached data (including '_cached_at'), None if missing
+    """
+    entry = _recall(key)
+    if entry is not None:
+        return dict(entry[1])
+
+    data = _read_file(key)
+    if data is not None:
+        data['_cached_at'] = _cached_at_epoch(data)
+    return data
+
+
+def _write_file(key: str, cache_data: dict, generation: int) -> None:
+    """
+    Write a cache file unless the key was cleared after the write was queued.
+
+    The payload is serialized before taking the lock and written to a temp
+    file that is renamed into place, so readers never see a partial file.
+    """
     try:
-        with open(cache_file, 'r') as f:
-            data = json.load(f)
-
-        # Check if cache is still valid
-        cached_at = data.get('_cached_at')
-        if cached_at:
-            cached_time = datetime.fromisoformat(cached_at)
-            if datetime.utcnow() - cached_time < timedelta(minutes=CACHE_TTL_MINUTES):
-                return data
-
-        return None  # Cache expired
-    except (json.JSONDecodeError, IOError):
-        return None
+        buf = orjson.dumps(cache_data, default=str)
+        cache_file = _cache_path(key)
+        tmp_file = cache_file.with_name(f"{cache_file.name}.{os.getpid()}.tmp")
+        with _disk_lock:
+            if _disk_generation.get(key, 0) != generation:
+                return
+            _ensure_cache_dir()
+            tmp_file.write_bytes(buf)
+            os.replace(tmp_file, cache_file)
+    except Exception as e:
+        print(f"[Notion Cache] Failed to write {key}: {e}")
 
 
 def set_cached(key: str, data: Any) -> None:
     """
     Save data to cache.
 
+    Memory is updated immediately; the file is written in the background.
+
     Args:
         key: Cache key
-        data: Data to cache (must be JSON serializable)
+        data: Data to cache (JSON serializable; other values are stored via str())
     """
-    _ensure_cache_dir()
-    cache_file = _cache_path(key)
+    now = time.time()
 
-    # Add timestamp
+    # Add timestamp (epoch seconds)
     cache_data = {
         **data,
-        '_cached_at': datetime.utcnow().isoformat(),
+        '_cached_at': now,
     }
 
-    with open(cache_file, 'w') as f:
-        json.dump(cache_data, f, indent=2, default=str)
+    _remember(key, cache_data, now)
+    with _disk_lock:
+        generation = _disk_generation.get(key, 0)
+    _get_disk_executor().submit(_write_file, key, cache_data, generation)
 
 
 def is_cache_valid(key: str) -> bool:
@@ -94,16 +217,25 @@ def clear_cache(key: str) -> None:
     Args:
         key: Cache key to clear
     """
-    cache_file = _cache_path(key)
-    if cache_file.exists():
-        cache_file.unlink()
+    _forget(key)
+    with _disk_lock, contextlib.suppress(FileNotFoundError):
+        os.unlink(_cache_path(key))
 
 
 def clear_all_cache() -> None:
     """Clear all cache files."""
-    if CACHE_DIR.exists():
-        for cache_file in CACHE_DIR.glob('*.json'):
-            cache_file.unlink()
+    with _mem_lock:
+        keys = list(_mem_cache)
+    for key in keys:
+        _forget(key)
+
+    with _disk_lock, contextlib.suppress(FileNotFoundError):
+        with os.scandir(CACHE_DIR) as entries:
+            for entry in entries:
+                if entry.name.endswith('.json'):
+                    key = entry.name[:-len('.json')]
+                    _disk_generation[key] = _disk_generation.get(key, 0) + 1
+                    os.unlink(entry.path)
 
 
 def get_cache_age(key: str) -> Optional[float]:
@@ -116,21 +248,16 @@ def get_cache_age(key: str) -> Optional[float]:
     Returns:
         float or None: Age in minutes, or None if no cache
     """
-    cache_file = _cache_path(key)
+    entry = _recall(key)
+    if entry is not None:
+        return (time.time() - entry[0]) / 60
 
-    if not cache_file.exists():
+    data = _read_file(key)
+    if data is None:
         return None
 
-    try:
-        with open(cache_file, 'r') as f:
-            data = json.load(f)
-
-        cached_at = data.get('_cached_at')
-        if cached_at:
-            cached_time = datetime.fromisoformat(cached_at)
-            age = datetime.utcnow() - cached_time
-            return age.total_seconds() / 60
+    cached_at = _cached_at_epoch(data)
+    if cached_at:
+        return (time.time() - cached_at) / 60
 
-        return None
-    except (json.JSONDecodeError, IOError):
-        return None
+    return None
@@ -1,8 +1,19 @@
 """Notion API client for database queries."""
 
 import os
+from concurrent.futures import ThreadPoolExecutor
+from types import MappingProxyType
+
+import orjson
 import requests
+from requests.adapters import HTTPAdapter
 from typing import Optional
+from urllib3.util.retry import Retry
+
+
+def _json(response) -> dict:
+    """Decode a Notion API response body with orjson (faster than response.json())."""
+    return orjson.loads(response.content)
 
 
 class NotionClient:
@@ -10,6 +21,8 @@ class NotionClient:
 
     BASE_URL = 'https://api.notion.com/v1'
     API_VERSION = '2022-06-28'
+    PAGE_SIZE = 100  # Maximum results per query page allowed by Notion
+    TIMEOUT = 30  # Seconds per request
 
     def __init__(self, api_key: Optional[str] = None):
         """
@@ -22,54 +35,118 @@ class NotionClient:
         if not self.api_key:
             raise ValueError("NOTION_API_KEY environment variable not set")
 
-    def _get_headers(self) -> dict:
-        """Get headers for Notion API requests."""
-        return {
+        # Built once; read-only so it can't drift from the session's copy
+        self.headers = MappingProxyType({
             'Authorization': f'Bearer {self.api_key}',
             'Notion-Version': self.API_VERSION,
             'Content-Type': 'application/json',
-        }
+        })
+
+        # Keep-alive session so paginated queries reuse one TLS connection.
+        # Database queries are reads, so POSTs are safe to retry too.
+        retry = Retry(
+            total=5,
+            backoff_factor=0.3,
+            status_forcelist=[429, 500, 502, 503, 504],
+            allowed_methods=frozenset({'GET', 'POST'}),
+        )
+        self._session = requests.Session()
+        self._session.mount('https://', HTTPAdapter(pool_maxsize=10, max_retries=retry))
+        self._session.headers.update(self.headers)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+    def close(self):
+        """Close the underlying HTTP session."""
+        self._session.close()
+
+    def _post_query(self, url: str, body: dict) -> dict:
+        """POST one database query page and decode the response."""
+        # Streamed so the body is read from the socket into a single buffer
+        # for orjson, rather than collected in chunks and joined by requests
+        with self._session.post(url, data=orjson.dumps(body), timeout=self.TIMEOUT,
+                                stream=True) as response:
+            if response.status_code != 200:
+                raise Exception(f"Notion API error: {response.status_code} - {response.text}")
 
-    def query_database(self, database_id: str, filter_obj: Optional[dict] = None,
-                       sorts: Optional[list] = None) -> list:
+            return orjson.loads(response.raw.read(decode_content=True))
+
+    def iter_database_pages(self, database_id: str, filter_obj: Optional[dict] = None,
+                            sorts: Optional[list] = None):
         """
-        Query a Notion database with automatic pagination.
+        Query a Notion database, yielding one page of results at a time.
+
+        Pages are cursor-chained, so page N+1 can only be requested once page
+        N has arrived; it is then fetched in the background while the caller
+        processes page N.
 
         Args:
             database_id: The ID of the database to query
             filter_obj: Optional filter object
             sorts: Optional list of sort objects
 
-        Returns:
-            list: All pages from the database
+        Yields:
+            list: Results from each API page
         """
         url = f"{self.BASE_URL}/databases/{database_id}/query"
-        headers = self._get_headers()
 
-        all_results = []
-        has_more = True
-        start_cursor = None
+        body = {'page_size': self.PAGE_SIZE}
+        if filter_obj:
+            body['filter'] = filter_obj
+        if sorts:
+            body['sorts'] = sorts
+
+        with ThreadPoolExecutor(max_workers=1) as executor:
+            future = executor.submit(self._post_query, url, body)
+            while future:
+                data = future.result()
+                next_cursor = data.get('next_cursor')
+                if data.get('has_more', False) and next_cursor:
+                    future = executor.submit(
+                        self._post_query, url, {**body, 'start_cursor': next_cursor}
+                    )
+                else:
+                    future = None
+                yield data.get('results', [])
 
-        while has_more:
-            body = {}
-            if filter_obj:
-                body['filter'] = filter_obj
-            if sorts:
-                body['sorts'] = sorts
-            if start_cursor:
-                body['start_cursor'] = start_cursor
+    def get_last_edited_time(self, database_id: str) -> Optional[str]:
+        """
+        Get the most recent last_edited_time across a database's pages.
 
-            response = requests.post(url, headers=headers, json=body)
+        Args:
+            database_id: The ID of the database
 
-            if response.status_code != 200:
-                raise Exception(f"Notion API error: {response.status_code} - {response.text}")
+        Returns:
+            str or None: ISO timestamp of the latest edit, None if the database is empty
+        """
+        url = f"{self.BASE_URL}/databases/{database_id}/query"
+        data = self._post_query(url, {
+            'page_size': 1,
+            'sorts': [{'timestamp': 'last_edited_time', 'direction': 'descending'}],
+        })
+        results = data.get('results', [])
+        return results[0].get('last_edited_time') if results else None
 
-            data = response.json()
-            all_results.extend(data.get('results', []))
+    def query_database(self, database_id: str, filter_obj: Optional[dict] = None,
+                       sorts: Optional[list] = None) -> list:
+        """
+        Query a Notion database with automatic pagination.
 
-            has_more = data.get('has_more', False)
-            start_cursor = data.get('next_cursor')
+        Args:
+            database_id: The ID of the database to query
+            filter_obj: Optional filter object
+            sorts: Optional list of sort objects
 
+        Returns:
+            list: All pages from the database
+        """
+        all_results = []
+        for results in self.iter_database_pages(database_id, filter_obj, sorts):
+            all_results.extend(results)
         return all_results
 
     def get_database(self, database_id: str) -> dict:
@@ -83,14 +160,13 @@ class NotionClient:
             dict: Database metadata including title and properties
         """
         url = f"{self.BASE_URL}/databases/{database_id}"
-        headers = self._get_headers()
 
-        response = requests.get(url, headers=headers)
+        response = self._session.get(url, timeout=self.TIMEOUT)
 
         if response.status_code != 200:
             raise Exception(f"Notion API error: {response.status_code} - {response.text}")
 
-        return response.json()
+        return _json(response)
 
     def test_connection(self, database_id: Optional[str] = None) -> dict:
         """
@@ -116,7 +192,7 @@ class NotionClient:
             else:
                 # Just verify the API key works by making a simple request
                 url = f"{self.BASE_URL}/users/me"
-                response = requests.get(url, headers=self._get_headers())
+                response = self._session.get(url, timeout=self.TIMEOUT)
                 if response.status_code == 200:
                     return {'connected': True}
                 else:
@@ -2,15 +2,36 @@
 
 import os
 import re
-from datetime import datetime
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
 from typing import Optional, Any
 
 from .client import NotionClient
-from .cache import get_cached, set_cached, clear_cache
+from .cache import get_cached, get_stale, set_cached, clear_cache
 
 
 CACHE_KEY = 'notion_pipeline'
 
+# An expired cache entry is reused if no page has been edited since it was
+# built. Deleting a page isn't always visible that way, so entries older
+# than this are always refetched in full.
+REVALIDATE_MAX_AGE_HOURS = 24
+
+# Pages without a name aren't deals (see transform_deal); full syncs ask
+# Notion to leave them out
+NAMED_PAGES_FILTER = {'property': 'Name', 'title': {'is_not_empty': True}}
+
+# Expired-but-recent cache entries are served immediately while one
+# background thread refetches; the lock keeps refreshes from piling up
+_refresh_lock = threading.Lock()
+_refresh_executor = None
+_refresh_executor_pid = None
+
+# Currency symbols, thousands separators and whitespace stripped by parse_currency
+_CURRENCY_TRANS = str.maketrans('', '', '£$€, \t\n\r')
+_CURRENCY_RE = re.compile(r'[£$€,\s]')
+
 
 def parse_currency(value: Any) -> float:
     """
@@ -34,8 +55,16 @@ def parse_currency(value: Any) -> float:
         return float(value)
 
     if isinstance(value, str):
-        # Remove currency symbols, commas, spaces
-        cleaned = re.sub(r'[£$€,\s]', '', value)
+        # Remove currency symbols, commas, spaces; the regex only runs for
+        # less common whitespace the translation table doesn't cover
+        cleaned = value.translate(_CURRENCY_TRANS)
+        if not cleaned:
+            return 0.0
+        try:
+            return float(cleaned)
+        except ValueError:
+            pass
+        cleaned = _CURRENCY_RE.sub('', value)
         try:
             return float(cleaned) if cleaned else 0.0
         except ValueError:
@@ -44,6 +73,76 @@ def parse_currency(value: Any) -> float:
     return 0.0
 
 
+def _plain_text(parts: list) -> Optional[str]:
+    """Join rich text fragments (None if empty)."""
+    return ''.join(t.get('plain_text', '') for t in parts) or None
+
+
+def _date_start(date_obj: Optional[dict]) -> Optional[str]:
+    """Get the ISO start date of a Notion date object."""
+    return date_obj.get('start') if date_obj else None
+
+
+def _extract_people(prop: dict) -> Any:
+    """Single name for one person, list for several, None for nobody."""
+    names = [person['name'] for person in prop.get('people', []) if person.get('name')]
+    return names[0] if len(names) == 1 else names if names else None
+
+
+def _extract_select(prop: dict) -> Optional[str]:
+    """Get the selected option name."""
+    select = prop.get('select')
+    return select.get('name') if select else None
+
+
+# Value extractors for formula results, keyed by formula type
+_FORMULA_EXTRACTORS = {
+    'string': lambda f: f.get('string'),
+    'number': lambda f: f.get('number'),
+    'boolean': lambda f: f.get('boolean'),
+    'date': lambda f: _date_start(f.get('date')),
+}
+
+
+def _extract_formula(prop: dict) -> Any:
+    """Get a formula result by its result type."""
+    formula = prop.get('formula', {})
+    handler = _FORMULA_EXTRACTORS.get(formula.get('type'))
+    return handler(formula) if handler else None
+
+
+def _extract_rollup(prop: dict) -> Any:
+    """Get a numeric rollup or the first value of an array rollup."""
+    rollup = prop.get('rollup', {})
+    rollup_type = rollup.get('type')
+    if rollup_type == 'number':
+        return rollup.get('number')
+    if rollup_type == 'array':
+        # Return first value from array if present
+        array = rollup.get('array', [])
+        if array:
+            return extract_property_value(array[0])
+    return None
+
+
+# Value extractors keyed by Notion property type
+_EXTRACTORS = {
+    'title': lambda p: _plain_text(p.get('title', [])),
+    'rich_text': lambda p: _plain_text(p.get('rich_text', [])),
+    'number': lambda p: p.get('number'),
+    'select': _extract_select,
+    'multi_select': lambda p: [item.get('name') for item in p.get('multi_select', [])],
+    'date': lambda p: _date_start(p.get('date')),
+    'people': _extract_people,
+    'email': lambda p: p.get('email'),
+    'phone_number': lambda p: p.get('phone_number'),
+    'url': lambda p: p.get('url'),
+    'checkbox': lambda p: p.get('checkbox', False),
+    'formula': _extract_formula,
+    'rollup': _extract_rollup,
+}
+
+
 def extract_property_value(prop: dict) -> Any:
     """
     Extract value from a Notion property object.
@@ -57,143 +156,120 @@ def extract_property_value(prop: dict) -> Any:
     if not prop:
         return None
 
-    prop_type = prop.get('type')
+    handler = _EXTRACTORS.get(prop.get('type'))
+    return handler(prop) if handler else None
 
-    if prop_type == 'title':
-        title_parts = prop.get('title', [])
-        return ''.join(t.get('plain_text', '') for t in title_parts) or None
 
-    elif prop_type == 'rich_text':
-        text_parts = prop.get('rich_text', [])
-        return ''.join(t.get('plain_text', '') for t in text_parts) or None
+# Alternate Notion property names, tried in order
+_ALIASES = {
+    'client': ('Client', 'Account'),
+    'stage': ('Deal stage', 'Stage'),
+    'deal_value': ('Deal value', 'Deal Value', 'Value', 'Amount'),
+    'expected_close': ('Expected close date', 'Expected Close', 'Close Date'),
+    'last_contact': ('Last contact date', 'Last Contact'),
+    'decision_maker': ('Decision maker', 'Decision Maker', 'Contact'),
+    'notes': ('Notes', 'Description'),
+}
 
-    elif prop_type == 'number':
-        return prop.get('number')
 
-    elif prop_type == 'select':
-        select = prop.get('select')
-        return select.get('name') if select else None
+def resolve_aliases(properties: dict) -> dict:
+    """
+    Resolve which alternate property names exist in a database schema.
 
-    elif prop_type == 'multi_select':
-        items = prop.get('multi_select', [])
-        return [item.get('name') for item in items]
+    Every page returned by one query carries the same property keys, so the
+    result can be computed from any one page and reused for the rest.
 
-    elif prop_type == 'date':
-        date_obj = prop.get('date')
-        if date_obj:
-            return date_obj.get('start')  # Returns ISO date string
-        return None
+    Args:
+        properties: A page's properties dict (or the database's)
 
-    elif prop_type == 'people':
-        people = prop.get('people', [])
-        names = []
-        for person in people:
-            name = person.get('name')
-            if name:
-                names.append(name)
-        return names[0] if len(names) == 1 else names if names else None
-
-    elif prop_type == 'email':
-        return prop.get('email')
-
-    elif prop_type == 'phone_number':
-        return prop.get('phone_number')
-
-    elif prop_type == 'url':
-        return prop.get('url')
-
-    elif prop_type == 'checkbox':
-        return prop.get('checkbox', False)
-
-    elif prop_type == 'formula':
-        formula = prop.get('formula', {})
-        formula_type = formula.get('type')
-        if formula_type == 'string':
-            return formula.get('string')
-        elif formula_type == 'number':
-            return formula.get('number')
-        elif formula_type == 'boolean':
-            return formula.get('boolean')
-        elif formula_type == 'date':
-            date_obj = formula.get('date')
-            return date_obj.get('start') if date_obj else None
-        return None
+    Returns:
+        dict: Field name -> tuple of the alternate names present, in order
+    """
+    return {
+        field: tuple(name for name in names if name in properties)
+        for field, names in _ALIASES.items()
+    }
 
-    elif prop_type == 'rollup':
-        rollup = prop.get('rollup', {})
-        rollup_type = rollup.get('type')
-        if rollup_type == 'number':
-            return rollup.get('number')
-        elif rollup_type == 'array':
-            # Return first value from array if present
-            array = rollup.get('array', [])
-            if array:
-                return extract_property_value(array[0])
-        return None
 
+def _first_of(props: dict, names: tuple) -> Any:
+    """First truthy value among alternate property names (like chained `or`)."""
+    for name in names:
+        value = extract_property_value(props.get(name))
+        if value:
+            return value
     return None
 
 
-def transform_deal(page: dict) -> Optional[dict]:
+def _title_value(prop: Optional[dict]) -> Any:
+    """Fast path for the Name property, which is almost always a one-part title."""
+    if not prop or prop.get('type') != 'title':
+        return extract_property_value(prop)
+    parts = prop.get('title')
+    if not parts:
+        return None
+    if len(parts) == 1:
+        return parts[0].get('plain_text') or None
+    return _plain_text(parts)
+
+
+def transform_deal(page: dict, aliases: Optional[dict] = None) -> Optional[dict]:
     """
     Transform a Notion page into a deal dict matching pipeline.yaml format.
 
     Args:
         page: Notion page object
+        aliases: Alternate property names from resolve_aliases(); resolved
+            from the page itself if not given
 
     Returns:
         dict or None: Transformed deal or None if invalid
     """
     props = page.get('properties', {})
 
-    # Extract name - skip if empty
-    name = extract_property_value(props.get('Name'))
+    # Extract name - skip if empty, before any other property is looked at
+    name = _title_value(props.get('Name'))
     if not name:
         return None
 
+    _xp = extract_property_value
+    if aliases is None:
+        aliases = resolve_aliases(props)
+
     # Extract client/account owner
-    client = extract_property_value(props.get('Client')) or extract_property_value(props.get('Account'))
-    account_owner = extract_property_value(props.get('Account owner'))
+    client = _first_of(props, aliases['client'])
+    account_owner = _xp(props.get('Account owner'))
 
     # Extract stage and likelihood
-    stage = extract_property_value(props.get('Deal stage')) or extract_property_value(props.get('Stage'))
-    likelihood = extract_property_value(props.get('Likelihood'))
+    stage = _first_of(props, aliases['stage'])
+    likelihood = _xp(props.get('Likelihood'))
     if likelihood is not None:
         likelihood = int(likelihood) if isinstance(likelihood, (int, float)) else 0
 
     # Extract deal value - try multiple possible field names
-    deal_value = None
-    for field_name in ['Deal value', 'Deal Value', 'Value', 'Amount']:
-        val = extract_property_value(props.get(field_name))
+    deal_value = 0
+    for field_name in aliases['deal_value']:
+        val = _xp(props.get(field_name))
         if val is not None:
             deal_value = parse_currency(val)
             break
 
-    if deal_value is None:
-        deal_value = 0
-
     # Extract dates
-    expected_close = extract_property_value(props.get('Expected close date')) or \
-                     extract_property_value(props.get('Expected Close')) or \
-                     extract_property_value(props.get('Close Date'))
-    last_contact = extract_property_value(props.get('Last contact date')) or \
-                   extract_property_value(props.get('Last Contact'))
+    expected_close = _first_of(props, aliases['expected_close'])
+    last_contact = _first_of(props, aliases['last_contact'])
 
     # Extract revenue ranges
-    revenue_min = parse_currency(extract_property_value(props.get('Target Revenue Min')))
-    revenue_max = parse_currency(extract_property_value(props.get('Target Revenue Max')))
+    revenue_min = parse_currency(_xp(props.get('Target Revenue Min')))
+    revenue_max = parse_currency(_xp(props.get('Target Revenue Max')))
 
     # Extract scenarios
-    worst_case = parse_currency(extract_property_value(props.get('Worst Case Scenario')))
-    best_case = parse_currency(extract_property_value(props.get('Best Case Scenario')))
+    worst_case = parse_currency(_xp(props.get('Worst Case Scenario')))
+    best_case = parse_currency(_xp(props.get('Best Case Scenario')))
 
     # Extract decision maker
-    decision_maker = extract_property_value(props.get('Decision maker')) or \
-                     extract_property_value(props.get('Decision Maker')) or \
-                     extract_property_value(props.get('Contact'))
+    decision_maker = _first_of(props, aliases['decision_maker'])
 
     # Extract notes
-    notes = extract_property_value(props.get('Notes')) or extract_property_value(props.get('Description'))
+    notes = _first_of(props, aliases['notes'])
 
     # Build deal dict
     deal = {
@@ -240,37 +316,74 @@ def calculate_pipeline_summary(deals: list) -> dict:
     Returns:
         dict: Pipeline summary stats
     """
-    total_value = sum(d.get('deal_value', 0) for d in deals)
-
-    # Weighted value based on likelihood
-    weighted_value = sum(
-        d.get('deal_value', 0) * (d.get('likelihood', 0) / 10.0)
-        for d in deals
-    )
-
-    # Count by stage
+    total_value = 0
+    weighted_value = 0.0
+    high_confidence_value = 0
+    high_confidence_count = 0
     by_stage = {}
+
+    # One pass accumulating every statistic
     for deal in deals:
-        stage = deal.get('stage') or 'Unknown'
-        if stage not in by_stage:
-            by_stage[stage] = {'count': 0, 'value': 0}
-        by_stage[stage]['count'] += 1
-        by_stage[stage]['value'] += deal.get('deal_value', 0)
+        value = deal.get('deal_value', 0)
+        likelihood = deal.get('likelihood', 0)
+
+        total_value += value
+        # Weighted value based on likelihood
+        weighted_value += value * (likelihood / 10.0)
+
+        # Count by stage
+        stage = by_stage.setdefault(deal.get('stage') or 'Unknown', {'count': 0, 'value': 0})
+        stage['count'] += 1
+        stage['value'] += value
 
-    # High confidence deals (likelihood >= 8)
-    high_confidence = [d for d in deals if d.get('likelihood', 0) >= 8]
-    high_confidence_value = sum(d.get('deal_value', 0) for d in high_confidence)
+        # High confidence deals (likelihood >= 8)
+        if likelihood >= 8:
+            high_confidence_value += value
+            high_confidence_count += 1
 
     return {
         'total_pipeline_value': total_value,
         'weighted_pipeline': int(weighted_value),
         'deals_count': len(deals),
         'high_confidence_value': high_confidence_value,
-        'high_confidence_count': len(high_confidence),
+        'high_confidence_count': high_confidence_count,
         'by_stage': by_stage,
     }
 
 
+def merge_deals(deals: list, pages: list) -> list:
+    """
+    Merge changed Notion pages into a previously synced deals list.
+
+    Changed deals replace the cached deal with the same notion_id, new ones
+    are appended, and pages that no longer transform to a valid deal are
+    dropped. The result keeps the full sync's deal value ordering.
+
+    Args:
+        deals: Cached deal dicts
+        pages: Notion pages edited since the cached deals were synced
+
+    Returns:
+        list: Merged deal dicts
+    """
+    aliases = resolve_aliases(pages[0].get('properties', {})) if pages else None
+    changed = {page.get('id'): transform_deal(page, aliases) for page in pages}
+    merged = [changed.pop(deal.get('notion_id'), deal) for deal in deals]
+    merged.extend(changed.values())
+    merged = [deal for deal in merged if deal]
+    merged.sort(key=lambda deal: deal.get('deal_value', 0), reverse=True)
+    return merged
+
+
+def _synced_within(data: dict, max_age: timedelta) -> bool:
+    """Check whether cached pipeline data was fully fetched from Notion within max_age."""
+    try:
+        synced_at = datetime.fromisoformat(data.get('full_synced_at') or data.get('synced_at'))
+    except (TypeError, ValueError):
+        return False
+    return datetime.utcnow() - synced_at < max_age
+
+
 def fetch_pipeline() -> dict:
     """
     Fetch pipeline data from Notion and transform it.
@@ -282,29 +395,56 @@ def fetch_pipeline() -> dict:
     if not database_id:
         raise ValueError("NOTION_PIPELINE_DB_ID environment variable not set")
 
-    client = NotionClient()
-
-    # Query all pages from the database
-    pages = client.query_database(
-        database_id,
-        sorts=[{'property': 'Deal value', 'direction': 'descending'}]
-    )
-
-    # Transform pages to deals
-    deals = []
-    for page in pages:
-        deal = transform_deal(page)
-        if deal:
-            deals.append(deal)
+    with NotionClient() as client:
+        # One single-row query tells us whether anything changed since the
+        # cached copy was built; if not, skip paging and transforming
+        last_edited = client.get_last_edited_time(database_id)
+        stale = get_stale(CACHE_KEY)
+        incremental = bool(stale and last_edited and stale.get('last_edited_max')
+                           and _synced_within(stale, timedelta(hours=REVALIDATE_MAX_AGE_HOURS)))
+        if incremental and stale['last_edited_max'] == last_edited:
+            stale.pop('_cached_at', None)
+            set_cached(CACHE_KEY, stale)
+            return stale
+
+        if incremental:
+            # Only fetch pages edited since the cached copy was built.
+            # Notion rounds last_edited_time to the minute, so on_or_after
+            # re-fetches a few unchanged pages; merging them is idempotent.
+            # Unnamed pages aren't filtered out here: a deal whose name was
+            # cleared must come back so merge_deals can drop it.
+            changed = client.query_database(database_id, filter_obj={
+                'timestamp': 'last_edited_time',
+                'last_edited_time': {'on_or_after': stale['last_edited_max']},
+            })
+            deals = merge_deals(stale.get('deals', []), changed)
+            full_synced_at = stale.get('full_synced_at') or stale.get('synced_at')
+        else:
+            # Query all named pages from the database, transforming each API
+            # page while the next one is being fetched
+            deals = []
+            aliases = None
+            for pages in client.iter_database_pages(
+                database_id,
+                filter_obj=NAMED_PAGES_FILTER,
+                sorts=[{'property': 'Deal value', 'direction': 'descending'}]
+            ):
+                if aliases is None and pages:
+                    aliases = resolve_aliases(pages[0].get('properties', {}))
+                deals.extend([deal for page in pages if (deal := transform_deal(page, aliases))])
+            full_synced_at = None
 
     # Calculate summary
     summary = calculate_pipeline_summary(deals)
 
+    synced_at = datetime.utcnow().isoformat()
     result = {
         'deals': deals,
         'pipeline_summary': summary,
-        'synced_at': datetime.utcnow().isoformat(),
+        'synced_at': synced_at,
+        'full_synced_at': full_synced_at or synced_at,
         'source': 'notion',
+        'last_edited_max': last_edited,
     }
 
     # Cache the result
@@ -313,10 +453,51 @@ def fetch_pipeline() -> dict:
     return result
 
 
+def _get_refresh_executor() -> ThreadPoolExecutor:
+    """Get the background refresher, recreating it after a fork."""
+    global _refresh_executor, _refresh_executor_pid
+    pid = os.getpid()
+    if _refresh_executor_pid != pid:
+        _refresh_executor = ThreadPoolExecutor(max_workers=1, thread_name_prefix='notion-refresh')
+        _refresh_executor_pid = pid
+    return _refresh_executor
+
+
+def _refresh_pipeline() -> None:
+    """Refetch the pipeline into the cache, releasing the refresh lock when done."""
+    try:
+        fetch_pipeline()
+    except Exception as e:
+        print(f"[Notion Pipeline] Background refresh failed: {e}")
+    finally:
+        _refresh_lock.release()
+
+
+def refresh_in_background() -> bool:
+    """
+    Start a background pipeline refresh unless one is already running.
+
+    Returns:
+        bool: True if a refresh was started
+    """
+    if not _refresh_lock.acquire(blocking=False):
+        return False
+    try:
+        _get_refresh_executor().submit(_refresh_pipeline)
+    except Exception:
+        _refresh_lock.release()
+        raise
+    return True
+
+
 def get_pipeline() -> dict:
     """
     Get pipeline data, using cache if fresh.
 
+    An expired cache entry that was fully synced within
+    REVALIDATE_MAX_AGE_HOURS is returned as-is (flagged 'stale') while it is
+    refreshed in the background, so the request doesn't wait on Notion.
+
     Returns:
         dict: Pipeline data with deals and summary
     """
@@ -326,6 +507,14 @@ def get_pipeline() -> dict:
         cached['cached'] = True
         return cached
 
+    stale = get_stale(CACHE_KEY)
+    if stale and _synced_within(stale, timedelta(hours=REVALIDATE_MAX_AGE_HOURS)):
+        refresh_in_background()
+        stale.pop('_cached_at', None)
+        stale['cached'] = True
+        stale['stale'] = True
+        return stale
+
     # Fetch fresh data
     return fetch_pipeline()
 
@@ -1,16 +1,20 @@
 """AI-powered analysis API routes."""
 
-from datetime import datetime
-from flask import Blueprint, jsonify, request
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timezone
+from functools import wraps
 
-from xero import XeroClient, XeroAuth
+from flask import Blueprint, request
+
+from json_provider import etag_response, json_response, payload_etag
+from xero import get_xero_client, get_xero_auth
 from context import load_all_context
-from ai import ClaudeClient
+from ai import get_claude_client
 from ai.cache import cache_key, get_cached, set_cached, clear_cache, get_cache_stats, DEFAULT_TTL
 
 ai_bp = Blueprint('ai', __name__)
-xero_client = XeroClient()
-xero_auth = XeroAuth()
+xero_client = get_xero_client()
+xero_auth = get_xero_auth()
 
 # Cache TTL in seconds (uses DEFAULT_TTL from cache module, default 4 hours)
 CACHE_TTL = DEFAULT_TTL
@@ -18,12 +22,10 @@ CACHE_TTL = DEFAULT_TTL
 
 def require_xero_connection(f):
     """Decorator to ensure Xero connection before API calls."""
-    from functools import wraps
-
     @wraps(f)
     def decorated(*args, **kwargs):
         if not xero_auth.is_connected():
-            return jsonify({'error': 'Not connected to Xero'}), 401
+            return json_response({'error': 'Not connected to Xero'}, 401)
         return f(*args, **kwargs)
     return decorated
 
@@ -33,104 +35,161 @@ def get_financial_data():
     return xero_client.get_dashboard_data()
 
 
-@ai_bp.route('/api/ai/daily-insights')
-@require_xero_connection
-def daily_insights():
-    """Generate AI-powered daily financial insights."""
-    try:
-        # Check cache first
-        cache_id = cache_key('daily_insights')
-        cached_result = get_cached(cache_id, cache_type='daily_insights')
-        if cached_result:
-            return jsonify({
-                **cached_result,
-                'cached': True
-            })
+def utc_now_iso():
+    """Current UTC time as an ISO string with offset, to the second."""
+    return datetime.now(timezone.utc).isoformat(timespec='seconds')
 
-        # Get financial data from Xero
-        financial_data = get_financial_data()
 
-        # Load business context
-        context = load_all_context()
+# How long a failed generation is remembered, so repeated requests during an
+# upstream outage or rate limit don't each retry Xero and Claude
+ERROR_CACHE_TTL = 60
 
-        # Generate insights using Claude
-        claude = ClaudeClient()
-        insights = claude.daily_insights(financial_data, context)
 
-        result = {
-            'success': True,
-            'insights': insights,
-            'generated_at': datetime.utcnow().isoformat(),
-            'data_as_of': financial_data.get('last_synced'),
-        }
-
-        # Cache the result in Postgres
-        set_cached(cache_id, result, CACHE_TTL, cache_type='daily_insights')
-
-        return jsonify({**result, 'cached': False})
-
-    except ValueError as e:
+def error_payload(e):
+    """JSON error body for a failed AI request."""
+    if isinstance(e, ValueError):
         # Missing API key
-        return jsonify({
+        return {
             'success': False,
             'error': str(e),
             'hint': 'Ensure ANTHROPIC_API_KEY is set in .env'
-        }), 500
+        }
 
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    return {
+        'success': False,
+        'error': str(e)
+    }
+
+
+def error_response(e):
+    """JSON error response for a failed AI request."""
+    return json_response(error_payload(e), 500)
+
+
+def cached_ai(name, cache_type, ttl=CACHE_TTL):
+    """
+    Decorator serving an AI route's result from cache.
+
+    On a hit the cached result is returned before any Xero or Claude work.
+    On a miss the route generates the result dict, which is cached in
+    Postgres and returned. Results carry an ETag cached alongside them, so
+    clients revalidating with If-None-Match get a 304. Failures are cached for ERROR_CACHE_TTL seconds
+    and returned with a Retry-After header until they expire.
+
+    Args:
+        name: Name the cache key is derived from
+        cache_type: Cache type the result is stored under
+        ttl: Time to live in seconds
+    """
+    error_cache_type = f'{cache_type}_error'
+
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                cache_id = cache_key(name)
+                cached_result = get_cached(cache_id, cache_type=cache_type)
+                if cached_result:
+                    # The cached dict may be shared (in-memory tier): copy, don't mutate
+                    body = {**cached_result, 'cached': True}
+                    etag = body.pop('_etag', None) or payload_etag(cached_result)
+                    return etag_response(body, etag)
+
+                error_id = cache_key(name, 'error')
+                cached_error = get_cached(error_id, cache_type=error_cache_type)
+                if cached_error:
+                    return json_response({**cached_error, 'cached': True}, 500, {
+                        'Retry-After': str(ERROR_CACHE_TTL)
+                    })
+
+                try:
+                    result = f(*args, **kwargs)
+                except Exception as e:
+                    set_cached(error_id, error_payload(e), ERROR_CACHE_TTL,
+                               cache_type=error_cache_type)
+                    raise
+
+                etag = payload_etag(result)
+                set_cached(cache_id, {**result, '_etag': etag}, ttl, cache_type=cache_type)
+
+                return etag_response({**result, 'cached': False}, etag)
+
+            except Exception as e:
+                return error_response(e)
+        return decorated
+    return decorator
+
+
+def generate_daily_insights(financial_data, context):
+    """Generate the daily insights result."""
+    insights = get_claude_client().daily_insights(financial_data, context)
+
+    return {
+        'success': True,
+        'insights': insights,
+        'generated_at': utc_now_iso(),
+        'data_as_of': financial_data.get('last_synced'),
+    }
 
 
-@ai_bp.route('/api/ai/monthly-analysis')
-@require_xero_connection
-def monthly_analysis():
-    """Generate AI-powered monthly strategic analysis."""
-    try:
-        # Check cache first
-        cache_id = cache_key('monthly_analysis')
-        cached_result = get_cached(cache_id, cache_type='monthly_analysis')
-        if cached_result:
-            return jsonify({
-                **cached_result,
-                'cached': True
-            })
+def generate_monthly_analysis(financial_data, context):
+    """Generate the monthly analysis result."""
+    analysis = get_claude_client().monthly_analysis(financial_data, context)
 
-        # Get financial data from Xero
-        financial_data = get_financial_data()
+    return {
+        'success': True,
+        'analysis': analysis,
+        'generated_at': utc_now_iso(),
+    }
 
-        # Load business context
-        context = load_all_context()
 
-        # Generate analysis using Claude
-        claude = ClaudeClient()
-        analysis = claude.monthly_analysis(financial_data, context)
+def generate_cash_forecast(forecast_data, context):
+    """Generate the cash forecast result (needs get_forecast_data() data)."""
+    forecast = get_claude_client().cash_forecast(forecast_data, context)
 
-        result = {
-            'success': True,
-            'analysis': analysis,
-            'generated_at': datetime.utcnow().isoformat(),
-        }
+    return {
+        'success': True,
+        'forecast': forecast,
+        'generated_at': utc_now_iso(),
+        'data_as_of': forecast_data.get('last_synced'),
+    }
 
-        # Cache the result in Postgres
-        set_cached(cache_id, result, CACHE_TTL, cache_type='monthly_analysis')
 
-        return jsonify({**result, 'cached': False})
+def generate_anomalies(financial_data, context):
+    """Generate the anomaly detection result."""
+    anomalies = get_claude_client().detect_anomalies(financial_data, context)
 
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'hint': 'Ensure ANTHROPIC_API_KEY is set in .env'
-        }), 500
+    return {
+        'success': True,
+        'anomalies': anomalies,
+        'generated_at': utc_now_iso(),
+        'data_as_of': financial_data.get('last_synced'),
+    }
 
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+
+# Cached AI reports: cache name -> (cache type, generator)
+AI_REPORTS = {
+    'daily_insights': ('daily_insights', generate_daily_insights),
+    'monthly_analysis': ('monthly_analysis', generate_monthly_analysis),
+    'cash_forecast': ('forecast', generate_cash_forecast),
+    'anomalies': ('anomalies', generate_anomalies),
+}
+
+
+@ai_bp.route('/api/ai/daily-insights')
+@require_xero_connection
+@cached_ai('daily_insights', 'daily_insights')
+def daily_insights():
+    """Generate AI-powered daily financial insights."""
+    return generate_daily_insights(get_financial_data(), load_all_context())
+
+
+@ai_bp.route('/api/ai/monthly-analysis')
+@require_xero_connection
+@cached_ai('monthly_analysis', 'monthly_analysis')
+def monthly_analysis():
+    """Generate AI-powered monthly strategic analysis."""
+    return generate_monthly_analysis(get_financial_data(), load_all_context())
 
 
 @ai_bp.route('/api/ai/ask', methods=['POST'])
@@ -140,17 +199,17 @@ def ask_question():
     try:
         data = request.get_json()
         if not data or 'question' not in data:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Question is required'
-            }), 400
+            }, 400)
 
         question = data['question'].strip()
         if not question:
-            return jsonify({
+            return json_response({
                 'success': False,
                 'error': 'Question cannot be empty'
-            }), 400
+            }, 400)
 
         # Get financial data from Xero
         financial_data = get_financial_data()
@@ -159,28 +218,18 @@ def ask_question():
         context = load_all_context()
 
         # Get answer from Claude
-        claude = ClaudeClient()
+        claude = get_claude_client()
         answer = claude.answer_question(question, financial_data, context)
 
-        return jsonify({
+        return json_response({
             'success': True,
             'question': question,
             'answer': answer,
-            'answered_at': datetime.utcnow().isoformat(),
+            'answered_at': utc_now_iso(),
         })
 
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'hint': 'Ensure ANTHROPIC_API_KEY is set in .env'
-        }), 500
-
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        return error_response(e)
 
 
 @ai_bp.route('/api/ai/refresh-insights', methods=['POST'])
@@ -191,21 +240,8 @@ def refresh_insights():
         # Clear daily insights cache to force fresh generation
         clear_cache(cache_type='daily_insights')
 
-        # Force sync from Xero
-        financial_data = get_financial_data()
-
-        # Load business context
-        context = load_all_context()
-
-        # Generate fresh insights
-        claude = ClaudeClient()
-        insights = claude.daily_insights(financial_data, context)
-
         result = {
-            'success': True,
-            'insights': insights,
-            'generated_at': datetime.utcnow().isoformat(),
-            'data_as_of': financial_data.get('last_synced'),
+            **generate_daily_insights(get_financial_data(), load_all_context()),
             'message': 'Cache cleared, data synced and insights refreshed'
         }
 
@@ -213,127 +249,85 @@ def refresh_insights():
         cache_id = cache_key('daily_insights')
         set_cached(cache_id, result, CACHE_TTL, cache_type='daily_insights')
 
-        return jsonify({**result, 'cached': False})
-
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'hint': 'Ensure ANTHROPIC_API_KEY is set in .env'
-        }), 500
+        return json_response({**result, 'cached': False})
 
     except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+        return error_response(e)
 
 
-@ai_bp.route('/api/ai/forecast')
+@ai_bp.route('/api/ai/refresh-all', methods=['POST'])
 @require_xero_connection
-def cash_forecast():
-    """Generate 4-week cash flow forecast."""
-    try:
-        # Check cache first
-        cache_id = cache_key('cash_forecast')
-        cached_result = get_cached(cache_id, cache_type='forecast')
-        if cached_result:
-            return jsonify({
-                **cached_result,
-                'cached': True
-            })
-
-        # Get financial data from Xero (including historical monthly expenses for burn rate)
-        financial_data = xero_client.get_forecast_data()
+def refresh_all():
+    """
+    Sync Xero data once and regenerate every cached AI report.
 
-        # Load business context
+    The Claude requests run concurrently, so the refresh takes about as long
+    as the slowest report rather than the sum of all four.
+    """
+    try:
+        # Forecast data is the dashboard data plus monthly expenses
+        forecast_data = xero_client.get_forecast_data()
+        financial_data = {k: v for k, v in forecast_data.items() if k != 'monthly_expenses'}
         context = load_all_context()
 
-        # Generate forecast using Claude
-        claude = ClaudeClient()
-        forecast = claude.cash_forecast(financial_data, context)
-
-        result = {
-            'success': True,
-            'forecast': forecast,
-            'generated_at': datetime.utcnow().isoformat(),
-            'data_as_of': financial_data.get('last_synced'),
-        }
+        # Fail fast on a missing API key before starting any requests
+        get_claude_client()
+
+        with ThreadPoolExecutor(max_workers=len(AI_REPORTS)) as executor:
+            futures = {
+                name: executor.submit(
+                    generate,
+                    forecast_data if name == 'cash_forecast' else financial_data,
+                    context,
+                )
+                for name, (_, generate) in AI_REPORTS.items()
+            }
+
+        refreshed = []
+        errors = {}
+        for name, future in futures.items():
+            try:
+                result = future.result()
+            except Exception as e:
+                errors[name] = str(e)
+                continue
+            cache_type = AI_REPORTS[name][0]
+            set_cached(cache_key(name), result, CACHE_TTL, cache_type=cache_type)
+            refreshed.append(name)
+
+        return json_response({
+            'success': not errors,
+            'refreshed': refreshed,
+            'errors': errors,
+            'generated_at': utc_now_iso(),
+        }, 200 if not errors else 500)
 
-        # Cache the result in Postgres
-        set_cached(cache_id, result, CACHE_TTL, cache_type='forecast')
+    except Exception as e:
+        return error_response(e)
 
-        return jsonify({**result, 'cached': False})
 
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'hint': 'Ensure ANTHROPIC_API_KEY is set in .env'
-        }), 500
-
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+@ai_bp.route('/api/ai/forecast')
+@require_xero_connection
+@cached_ai('cash_forecast', 'forecast')
+def cash_forecast():
+    """Generate 4-week cash flow forecast."""
+    # Forecast data includes historical monthly expenses for burn rate
+    return generate_cash_forecast(xero_client.get_forecast_data(), load_all_context())
 
 
 @ai_bp.route('/api/ai/anomalies')
 @require_xero_connection
+@cached_ai('anomalies', 'anomalies')
 def detect_anomalies():
     """Detect financial anomalies and risks."""
-    try:
-        # Check cache first
-        cache_id = cache_key('anomalies')
-        cached_result = get_cached(cache_id, cache_type='anomalies')
-        if cached_result:
-            return jsonify({
-                **cached_result,
-                'cached': True
-            })
-
-        # Get financial data from Xero
-        financial_data = get_financial_data()
-
-        # Load business context
-        context = load_all_context()
-
-        # Detect anomalies using Claude
-        claude = ClaudeClient()
-        anomalies = claude.detect_anomalies(financial_data, context)
-
-        result = {
-            'success': True,
-            'anomalies': anomalies,
-            'generated_at': datetime.utcnow().isoformat(),
-            'data_as_of': financial_data.get('last_synced'),
-        }
-
-        # Cache the result in Postgres
-        set_cached(cache_id, result, CACHE_TTL, cache_type='anomalies')
-
-        return jsonify({**result, 'cached': False})
-
-    except ValueError as e:
-        return jsonify({
-            'success': False,
-            'error': str(e),
-            'hint': 'Ensure ANTHROPIC_API_KEY is set in .env'
-        }), 500
-
-    except Exception as e:
-        return jsonify({
-            'success': False,
-            'error': str(e)
-        }), 500
+    return generate_anomalies(get_financial_data(), load_all_context())
 
 
 @ai_bp.route('/api/ai/cache-stats')
 def cache_stats():
     """Get cache statistics."""
     stats = get_cache_stats()
-    return jsonify({
+    return json_response({
         'success': True,
         'stats': stats
     })
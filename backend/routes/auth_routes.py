@@ -1,10 +1,10 @@
 import os
 from flask import Blueprint, redirect, request, session, jsonify, url_for
 
-from xero import XeroAuth
+from xero import get_xero_auth
 
 auth_bp = Blueprint('auth', __name__)
-xero_auth = XeroAuth()
+xero_auth = get_xero_auth()
 
 # Frontend URL for redirects after OAuth
 FRONTEND_URL = os.getenv('FRONTEND_URL', 'http://localhost:5173')
@@ -80,28 +80,22 @@ def callback():
 def status():
     """Check Xero connection status."""
     try:
-        from database import XeroToken
-        import sys
-
-        # Debug: check if any tokens exist
-        token = XeroToken.query.first()
-        print(f"DEBUG: Token found: {token is not None}", file=sys.stderr)
-        if token:
-            print(f"DEBUG: tenant_id={token.tenant_id}, expires_at={token.expires_at}", file=sys.stderr)
-
+        # Both checks are served from XeroAuth's short-lived cache while
+        # connected, so polling this endpoint rarely touches the database
         is_connected = xero_auth.is_connected()
-        print(f"DEBUG: is_connected={is_connected}", file=sys.stderr)
 
         if is_connected:
+            tenant_id, tenant_name = xero_auth.get_tenant()
             return jsonify({
                 'connected': True,
-                'tenant_name': token.tenant_name if token else None,
-                'tenant_id': token.tenant_id if token else None,
+                'tenant_name': tenant_name,
+                'tenant_id': tenant_id,
             })
         else:
             return jsonify({'connected': False})
 
     except Exception as e:
+        import sys
         import traceback
         print(f"DEBUG: Exception in status: {e}", file=sys.stderr)
         traceback.print_exc()
@@ -1,38 +1,67 @@
-from flask import Blueprint, jsonify, request
+import heapq
+import os
+import re
+import threading
+import time
+from collections import defaultdict
+from flask import Blueprint, Response, current_app, jsonify, request
 from datetime import date, timedelta
-from sqlalchemy import func
+from functools import wraps
+from sqlalchemy import func, select
+from sqlalchemy.dialects.postgresql import aggregate_order_by
 
-from xero import XeroClient, XeroAuth
+from xero import get_xero_client, get_xero_auth
 from database.db import db
 from database.models import BankTransaction
-from ai.cache import cache_key, get_cached, set_cached
+from services.history_sync import sync_all_from_xero
+from json_provider import (
+    etag_response, json_endpoint, json_response, not_modified, payload_etag,
+    with_etag,
+)
+from ai.cache import cache_key, get_cached, set_cached, clear_cache
 from context.loader import (
     load_all_context,
     load_pipeline,
+    load_yaml_file,
     get_deals_by_stage,
-    get_overdue_deals,
-    get_deals_closing_this_month,
     calculate_weighted_pipeline,
+    classify_deals,
     get_at_risk_clients,
     get_active_clients,
     get_critical_risks,
     get_current_metrics,
     get_q1_goals,
     get_transition_status,
+    get_context_mtimes,
 )
 
-# Dashboard cache TTL: 5 minutes (Xero data doesn't change frequently)
-DASHBOARD_CACHE_TTL = 300
+# Dashboard cache TTL: 5 minutes by default (Xero data doesn't change frequently)
+DASHBOARD_CACHE_TTL = int(os.getenv('DASHBOARD_CACHE_TTL', 300))
+
+# Refetch the dashboard in the background this often (seconds; 0 disables),
+# a little under the TTL so /api/dashboard keeps hitting a warm cache
+DASHBOARD_WARM_INTERVAL = int(os.getenv('DASHBOARD_WARM_INTERVAL', 240))
+
+# Stop warming once /api/dashboard hasn't been requested for this long
+# (seconds), so an idle process doesn't spend the Xero daily quota
+DASHBOARD_WARM_IDLE = int(os.getenv('DASHBOARD_WARM_IDLE', 900))
+
+_warmer_lock = threading.Lock()
+_warmer_pid = None
+_dashboard_last_hit = 0.0
+
+# Last /api/context/summary body and the inputs it was built from
+_summary_lock = threading.Lock()
+_summary_signature = None
+_summary_body = None
 
 data_bp = Blueprint('data', __name__)
-xero_client = XeroClient()
-xero_auth = XeroAuth()
+xero_client = get_xero_client()
+xero_auth = get_xero_auth()
 
 
 def require_xero_connection(f):
     """Decorator to ensure Xero connection before API calls."""
-    from functools import wraps
-
     @wraps(f)
     def decorated(*args, **kwargs):
         if not xero_auth.is_connected():
@@ -41,70 +70,150 @@ def require_xero_connection(f):
     return decorated
 
 
-@data_bp.route('/api/dashboard')
-@require_xero_connection
-def dashboard():
-    """Get all dashboard data in a single call."""
-    try:
-        # Check cache first
-        cache_id = cache_key('dashboard')
-        cached_result = get_cached(cache_id, cache_type='dashboard')
-        if cached_result:
-            return jsonify({**cached_result, 'cached': True})
+def cached_xero(cache_type='dashboard', ttl=DASHBOARD_CACHE_TTL, vary=None):
+    """
+    Decorator caching a Xero data route's response.
+
+    The cache key is the route name plus its query string, or plus
+    vary(request.args) when given, so equivalent queries (e.g. out-of-range
+    values the route clamps) share one entry. Only successful
+    responses (a plain dict) are cached; error tuples pass straight through.
+    The payload's ETag is cached with it, so a client revalidating with
+    If-None-Match gets a 304 while the cached entry is unchanged.
+
+    Args:
+        cache_type: Cache type the response is stored under
+        ttl: Time to live in seconds
+        vary: Optional function mapping request.args to the cache key parts
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            if vary is None:
+                cache_id = cache_key(f.__name__, sorted(request.args.items()))
+            else:
+                cache_id = cache_key(f.__name__, vary(request.args))
+            cached_result = get_cached(cache_id, cache_type=cache_type)
+            if cached_result:
+                # The cached dict may be shared (in-memory tier): copy, don't mutate
+                body = {**cached_result, 'cached': True}
+                etag = body.pop('_etag', None) or payload_etag(cached_result)
+                return etag_response(body, etag)
 
-        # Fetch fresh data
-        data = xero_client.get_dashboard_data()
+            result = f(*args, **kwargs)
+            if not isinstance(result, dict):
+                return result
 
-        # Cache the result
-        set_cached(cache_id, data, DASHBOARD_CACHE_TTL, cache_type='dashboard')
+            etag = store_xero_result(cache_id, result, ttl, cache_type)
+            return etag_response({**result, 'cached': False}, etag)
+        return decorated
+    return decorator
 
-        return jsonify({**data, 'cached': False})
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
 
+def store_xero_result(cache_id, result, ttl=DASHBOARD_CACHE_TTL, cache_type='dashboard'):
+    """
+    Cache a Xero route result together with its ETag, as cached_xero reads it.
 
-@data_bp.route('/api/cash-position')
-@require_xero_connection
-def cash_position():
-    """Get current cash position across all bank accounts."""
-    try:
-        data = xero_client.get_bank_summary()
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    Returns:
+        str: The payload's ETag
+    """
+    etag = payload_etag(result)
+    set_cached(cache_id, {**result, '_etag': etag}, ttl, cache_type=cache_type)
+    return etag
 
 
-@data_bp.route('/api/receivables')
-@require_xero_connection
-def receivables():
-    """Get outstanding receivables (invoices owed to us)."""
-    try:
-        data = xero_client.get_receivables_summary()
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+def _warm_dashboard(app):
+    """
+    Refetch the dashboard into the cache every DASHBOARD_WARM_INTERVAL seconds.
 
+    Skips the refresh while /api/dashboard has gone unrequested in this
+    process for DASHBOARD_WARM_IDLE seconds.
+    """
+    marker_id = cache_key('dashboard', 'warmed')
+    while True:
+        time.sleep(DASHBOARD_WARM_INTERVAL)
+        if time.monotonic() - _dashboard_last_hit > DASHBOARD_WARM_IDLE:
+            continue
+        with app.app_context():
+            try:
+                # Another worker refreshed the shared cache recently
+                if get_cached(marker_id, cache_type='dashboard'):
+                    continue
+                if not xero_auth.is_connected():
+                    continue
+                set_cached(marker_id, {'warmed': True}, DASHBOARD_WARM_INTERVAL * 3 // 4,
+                           cache_type='dashboard')
+                store_xero_result(cache_key('dashboard', []), xero_client.get_dashboard_data())
+            except Exception as e:
+                print(f"[Dashboard] Background refresh failed: {e}")
+
+
+@data_bp.before_request
+def _ensure_dashboard_warmer():
+    """
+    Record a /api/dashboard request and start the warmer thread on the first one.
 
-@data_bp.route('/api/payables')
-@require_xero_connection
-def payables():
-    """Get outstanding payables (bills we owe)."""
-    try:
-        data = xero_client.get_payables_summary()
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    The thread is started once per process (threads don't survive fork).
+    """
+    global _warmer_pid, _dashboard_last_hit
+    if not DASHBOARD_WARM_INTERVAL or request.endpoint != 'data.dashboard':
+        return
+    _dashboard_last_hit = time.monotonic()
+    pid = os.getpid()
+    if _warmer_pid == pid:
+        return
+    with _warmer_lock:
+        if _warmer_pid == pid:
+            return
+        threading.Thread(
+            target=_warm_dashboard, args=(current_app._get_current_object(),),
+            name='dashboard-warmer', daemon=True
+        ).start()
+        _warmer_pid = pid
+
+
+# Read-only Xero endpoints: (path, endpoint name, XeroClient method, docstring).
+# Each one fetches a single XeroClient summary, so the handlers are generated
+# from this table and share the connection check, caching and error handling.
+XERO_ENDPOINTS = [
+    ('/api/dashboard', 'dashboard', 'get_dashboard_data',
+     'Get all dashboard data in a single call.'),
+    ('/api/cash-position', 'cash_position', 'get_bank_summary',
+     'Get current cash position across all bank accounts.'),
+    ('/api/receivables', 'receivables', 'get_receivables_summary',
+     'Get outstanding receivables (invoices owed to us).'),
+    ('/api/payables', 'payables', 'get_payables_summary',
+     'Get outstanding payables (bills we owe).'),
+    ('/api/pnl', 'profit_and_loss', 'get_profit_and_loss',
+     'Get Profit & Loss summary for current month.'),
+]
+
+
+def _make_xero_handler(name, method, doc, cache_type='dashboard'):
+    """
+    Build a cached route handler that returns one XeroClient summary.
+
+    Args:
+        name: Endpoint name (also used in the cache key)
+        method: Name of the XeroClient method to call
+        doc: Docstring for the generated handler
+        cache_type: Cache type the response is stored under
+    """
+    fetch = getattr(xero_client, method)
 
+    def handler():
+        try:
+            return fetch()
+        except Exception as e:
+            return jsonify({'error': str(e)}), 500
 
-@data_bp.route('/api/pnl')
-@require_xero_connection
-def profit_and_loss():
-    """Get Profit & Loss summary for current month."""
-    try:
-        data = xero_client.get_profit_and_loss()
-        return jsonify(data)
-    except Exception as e:
-        return jsonify({'error': str(e)}), 500
+    handler.__name__ = name
+    handler.__doc__ = doc
+    return require_xero_connection(cached_xero(cache_type)(handler))
+
+
+for _path, _name, _method, _doc in XERO_ENDPOINTS:
+    data_bp.add_url_rule(_path, _name, _make_xero_handler(_name, _method, _doc))
 
 
 @data_bp.route('/api/sync', methods=['POST'])
@@ -112,14 +221,15 @@ def profit_and_loss():
 def sync():
     """Manually trigger a full data refresh from Xero."""
     try:
-        # Force refresh by getting all dashboard data
+        # Drop cached Xero responses and get fresh dashboard data
+        clear_cache(cache_type='dashboard')
+        clear_cache(cache_type='recurring_costs')
         data = xero_client.get_dashboard_data()
 
         # Also sync historical data from Xero
-        from services.history_sync import sync_all_from_xero
         history_sync_result = sync_all_from_xero(xero_client, days_back=90)
 
-        return jsonify({
+        return json_response({
             'success': True,
             'message': 'Data synced successfully',
             'data': data,
@@ -135,23 +245,28 @@ def sync():
             },
         })
     except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+        return json_response({'success': False, 'error': str(e)}, 500)
+
+
+def recurring_costs_months(args):
+    """Get the recurring-costs lookback from the query string, clamped to 3-12 months."""
+    months = args.get('months', 6, type=int)
+    return min(max(months, 3), 12)
 
 
 @data_bp.route('/api/recurring-costs')
 @require_xero_connection
+@cached_xero(cache_type='recurring_costs', vary=recurring_costs_months)
 def recurring_costs():
     """Get recurring costs analysis and future predictions."""
     try:
-        from flask import request
-        months = request.args.get('months', 6, type=int)
-        months = min(max(months, 3), 12)  # Clamp between 3-12 months
+        months = recurring_costs_months(request.args)
 
         data = xero_client.get_recurring_costs_analysis(months=months)
-        return jsonify({
+        return {
             'success': True,
             **data,
-        })
+        }
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -160,160 +275,210 @@ def recurring_costs():
 # CONTEXT DATA ENDPOINTS (Pipeline, Clients, Risks, Metrics)
 # =============================================================================
 
+def context_signature(pipeline=None):
+    """
+    Get the inputs a context route's response is derived from.
+
+    That is the context file mtimes and today's date (deal ages move
+    daily), plus the pipeline's source and sync time when the route reads
+    the pipeline, which may come from Notion rather than a file.
+    """
+    signature = (get_context_mtimes(),)
+    if pipeline is not None:
+        signature += (pipeline.get('source'), pipeline.get('synced_at'))
+    return signature + (date.today().isoformat(),)
+
+
+def context_etag(uses_pipeline=False):
+    """
+    Decorator tagging a read-only context route with an ETag.
+
+    The tag comes from context_signature(), so a client revalidating with
+    If-None-Match gets a 304 without the route running while the context
+    is unchanged. Error tuples pass through untagged.
+
+    Args:
+        uses_pipeline: Whether the response depends on the loaded pipeline
+    """
+    def decorator(f):
+        @wraps(f)
+        def decorated(*args, **kwargs):
+            try:
+                pipeline = load_pipeline() if uses_pipeline else None
+                etag = payload_etag(context_signature(pipeline))
+            except Exception as e:
+                return jsonify({'success': False, 'error': str(e)}), 500
+
+            response = not_modified(etag)
+            if response is not None:
+                return response
+
+            response = f(*args, **kwargs)
+            if isinstance(response, tuple) or response.status_code != 200:
+                return response
+            return with_etag(response, etag)
+        return decorated
+    return decorator
+
+
 @data_bp.route('/api/context/pipeline')
+@context_etag(uses_pipeline=True)
+@json_endpoint
 def get_pipeline():
     """Get full sales pipeline data."""
-    try:
-        pipeline = load_pipeline()
-        overdue = get_overdue_deals()
-        closing_this_month = get_deals_closing_this_month()
-        weighted = calculate_weighted_pipeline()
-
-        return jsonify({
-            'success': True,
-            'pipeline': pipeline,
-            'summary': {
-                'total_deals': len(pipeline.get('deals', [])),
-                'total_value': sum(d.get('deal_value', 0) for d in pipeline.get('deals', [])),
-                'weighted_value': weighted,
-                'overdue_count': len(overdue),
-                'closing_this_month_count': len(closing_this_month),
-            },
-            'overdue_deals': overdue,
-            'closing_this_month': closing_this_month,
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    pipeline = load_pipeline()
+    deals = classify_deals(pipeline.get('deals', []))
+    weighted = calculate_weighted_pipeline(pipeline=pipeline)
+
+    return {
+        'pipeline': pipeline,
+        'summary': {
+            'total_deals': deals.deal_count,
+            'total_value': deals.total_value,
+            'weighted_value': weighted,
+            'overdue_count': len(deals.overdue),
+            'closing_this_month_count': len(deals.closing_this_month),
+        },
+        'overdue_deals': deals.overdue,
+        'closing_this_month': deals.closing_this_month,
+    }
 
 
 @data_bp.route('/api/context/clients')
+@context_etag()
+@json_endpoint
 def get_clients():
     """Get client portfolio data."""
-    try:
-        context = load_all_context()
-        clients_data = context.get('clients', {})
-        at_risk = get_at_risk_clients()
-        active = get_active_clients()
+    clients_data = load_yaml_file('clients.yaml')
+    at_risk = get_at_risk_clients()
+    active = get_active_clients()
 
-        return jsonify({
-            'success': True,
-            'clients': clients_data.get('clients', []),
-            'summary': clients_data.get('summary', {}),
-            'at_risk_clients': at_risk,
-            'active_clients': active,
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return {
+        'clients': clients_data.get('clients', []),
+        'summary': clients_data.get('summary', {}),
+        'at_risk_clients': at_risk,
+        'active_clients': active,
+    }
 
 
 @data_bp.route('/api/context/risks')
+@context_etag()
+@json_endpoint
 def get_risks():
     """Get risk management data."""
-    try:
-        critical_risks = get_critical_risks()
-        context = load_all_context()
-        all_risks = context.get('risks', {}).get('risks', [])
+    critical_risks = get_critical_risks()
+    all_risks = load_yaml_file('risks.yaml').get('risks', [])
 
-        return jsonify({
-            'success': True,
-            'critical_risks': critical_risks,
-            'all_risks': all_risks,
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return {
+        'critical_risks': critical_risks,
+        'all_risks': all_risks,
+    }
 
 
 @data_bp.route('/api/context/metrics')
+@context_etag()
+@json_endpoint
 def get_metrics():
     """Get current business metrics."""
-    try:
-        metrics = get_current_metrics()
-        context = load_all_context()
-        all_metrics = context.get('metrics', {})
+    metrics = get_current_metrics()
+    all_metrics = load_yaml_file('metrics.yaml')
 
-        return jsonify({
-            'success': True,
-            'current': metrics,
-            'definitions': all_metrics,
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return {
+        'current': metrics,
+        'definitions': all_metrics,
+    }
 
 
 @data_bp.route('/api/context/goals')
+@context_etag()
+@json_endpoint
 def get_goals():
     """Get strategic goals and milestones."""
-    try:
-        q1_goals = get_q1_goals()
-        context = load_all_context()
-        all_goals = context.get('goals', {})
+    q1_goals = get_q1_goals()
+    all_goals = load_yaml_file('goals.yaml')
 
-        return jsonify({
-            'success': True,
-            'q1_2026': q1_goals,
-            'all_goals': all_goals,
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return {
+        'q1_2026': q1_goals,
+        'all_goals': all_goals,
+    }
 
 
 @data_bp.route('/api/context/transition')
+@context_etag()
+@json_endpoint
 def get_transition():
     """Get services-to-platform transition status."""
-    try:
-        transition = get_transition_status()
+    transition = get_transition_status()
 
-        return jsonify({
-            'success': True,
-            'transition': transition,
-        })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+    return {
+        'transition': transition,
+    }
 
 
 @data_bp.route('/api/context/summary')
 def get_context_summary():
-    """Get a comprehensive summary of all context data for the dashboard."""
+    """
+    Get a comprehensive summary of all context data for the dashboard.
+
+    The summary only depends on the context files, the pipeline sync and
+    today's date, so the encoded body is cached on those and served with
+    an ETag. Every section is built and encoded before the response
+    starts, so any failure still gets a proper 500 response.
+    """
+    global _summary_signature, _summary_body
+
     try:
-        # Load all context
+        # Load all context once; the pipeline helpers reuse its pipeline
         context = load_all_context()
-        pipeline = load_pipeline()
-        overdue = get_overdue_deals()
-        closing_this_month = get_deals_closing_this_month()
-        weighted = calculate_weighted_pipeline()
+        pipeline = context['pipeline']
+        signature = context_signature(pipeline)
+        etag = payload_etag(signature)
+
+        response = not_modified(etag)
+        if response is not None:
+            return response
+        with _summary_lock:
+            body = _summary_body if _summary_signature == signature else None
+        if body is not None:
+            return with_etag(Response(body, mimetype='application/json'), etag)
+
+        deals = classify_deals(pipeline.get('deals', []))
+        weighted = calculate_weighted_pipeline(pipeline=pipeline)
         at_risk_clients = get_at_risk_clients()
+
         critical_risks = get_critical_risks()
+        critical_count = high_count = 0
+        for risk in critical_risks:
+            if risk.severity == 'Critical':
+                critical_count += 1
+            elif risk.severity == 'High':
+                high_count += 1
+
         metrics = get_current_metrics()
-        q1_goals = get_q1_goals()
         transition = get_transition_status()
 
-        # Build summary
-        deals = pipeline.get('deals', [])
-        won_deals = [d for d in deals if d.get('stage') == 'Won']
-        high_confidence = [d for d in deals if d.get('likelihood', 0) >= 8 and d.get('stage') != 'Won']
-
-        return jsonify({
+        response = json_response({
             'success': True,
             'pipeline_summary': {
-                'total_value': sum(d.get('deal_value', 0) for d in deals),
+                'total_value': deals.total_value,
                 'weighted_value': weighted.get('weighted_total', 0),
-                'deal_count': len(deals),
-                'won_value': sum(d.get('deal_value', 0) for d in won_deals),
-                'high_confidence_value': sum(d.get('deal_value', 0) for d in high_confidence),
+                'deal_count': deals.deal_count,
+                'won_value': deals.won_value,
+                'high_confidence_value': deals.high_confidence_value,
                 'overdue_deals': [{
                     'name': d.get('name'),
                     'client': d.get('client'),
                     'value': d.get('deal_value'),
                     'days_overdue': d.get('days_overdue'),
                     'decision_maker': d.get('decision_maker'),
-                } for d in overdue],
+                } for d in deals.overdue],
                 'closing_this_month': [{
                     'name': d.get('name'),
                     'client': d.get('client'),
                     'value': d.get('deal_value'),
                     'likelihood': d.get('likelihood'),
                     'expected_close': d.get('expected_close'),
-                } for d in closing_this_month],
+                } for d in deals.closing_this_month],
             },
             'client_summary': {
                 'at_risk_count': len(at_risk_clients),
@@ -321,8 +486,8 @@ def get_context_summary():
                 'at_risk_clients': at_risk_clients,
             },
             'risk_summary': {
-                'critical_count': len([r for r in critical_risks if r.get('severity') == 'Critical']),
-                'high_count': len([r for r in critical_risks if r.get('severity') == 'High']),
+                'critical_count': critical_count,
+                'high_count': high_count,
                 'top_risks': critical_risks[:3],
             },
             'financial_summary': {
@@ -336,13 +501,163 @@ def get_context_summary():
                 'revenue_mix': transition.get('revenue_mix', {}).get('current', {}),
                 'target_2026': transition.get('revenue_mix', {}).get('target_end_2026', {}),
             },
-            'q1_goals': q1_goals,
+            'q1_goals': get_q1_goals(),
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
+    with _summary_lock:
+        _summary_signature, _summary_body = signature, response.get_data()
+    return with_etag(response, etag)
+
+
+# Company suffixes dropped when grouping payments by client (longer first)
+CLIENT_NAME_SUFFIXES = [
+    ' UK Limited', ' UK Ltd', ' UK Ltd.',
+    ' Limited', ' Ltd', ' Ltd.',
+    ' Company', ' Corp', ' Corporation',
+    ' Inc.', ' Inc',
+    ' PLC', ' plc', ' Plc',
+    ' LLP', ' LP', ' LLC',
+]
+
+# Clients listed in the cash-concentration response (at least 5, which the
+# top-5 metric and the dashboard card use)
+CONCENTRATION_TOP_CLIENTS = 10
+
+# The prefix and suffix rules as regular expressions. Python's re and
+# PostgreSQL's regexp_replace accept the same syntax, so the SQL grouping
+# and the Python fallback normalize identically.
+PAYMENT_PREFIX_PATTERN = r'^Payment(: | from )'
+CLIENT_SUFFIX_PATTERN = r'(\s+({}))+$'.format(
+    '|'.join(re.escape(suffix.strip()) for suffix in CLIENT_NAME_SUFFIXES)
+)
+_PAYMENT_PREFIX_RE = re.compile(PAYMENT_PREFIX_PATTERN)
+_CLIENT_SUFFIX_RE = re.compile(CLIENT_SUFFIX_PATTERN)
+
+# Stripped client names that don't identify a client
+GENERIC_PAYMENT_NAMES = ('', 'payment', 'transfer')
+
+
+def payment_client_name(description):
+    """Extract the client name from a 'Payment: Client' style description."""
+    return _PAYMENT_PREFIX_RE.sub('', description or '', count=1).strip()
+
+
+def normalize_client_name(name):
+    """Normalize client names to group related entities together (all trailing suffixes removed)."""
+    return _CLIENT_SUFFIX_RE.sub('', name.strip())
+
+
+def _client_payment_filters(start_date, end_date):
+    """Filters selecting receivable payments received in a date range."""
+    return (
+        BankTransaction.source_type == 'Receivable Payment',
+        BankTransaction.transaction_date >= start_date,
+        BankTransaction.transaction_date <= end_date,
+        BankTransaction.debit_gbp > 0,
+    )
+
+
+def _uses_postgres():
+    return db.session.get_bind().dialect.name == 'postgresql'
+
+
+def _pg_client_totals(start_date, end_date):
+    """
+    Select (display_name, amount) per client, grouped in PostgreSQL.
+
+    The client name is extracted and normalized with regexp_replace,
+    mirroring payment_client_name() and normalize_client_name().
+    """
+    client_name = func.regexp_replace(
+        func.regexp_replace(
+            func.coalesce(BankTransaction.description, ''),
+            PAYMENT_PREFIX_PATTERN, '',
+        ),
+        r'^\s+|\s+$', '', 'g',
+    )
+    normalized = func.regexp_replace(client_name, CLIENT_SUFFIX_PATTERN, '')
+    display_name = func.array_agg(
+        aggregate_order_by(client_name, func.length(client_name).desc())
+    )[1]
+    total = func.sum(BankTransaction.debit_gbp)
+    return select(display_name, total).where(
+        *_client_payment_filters(start_date, end_date),
+        func.lower(client_name).notin_(GENERIC_PAYMENT_NAMES),
+    ).group_by(normalized)
+
+
+def _client_payment_totals(start_date, end_date):
+    """
+    Total receivable payments per client.
+
+    On PostgreSQL the database groups by normalized client and returns one
+    row each. Other databases (SQLite in development) have no
+    regexp_replace; there descriptions are grouped in SQL and merged by
+    client in Python.
+
+    Returns:
+        list: (display_name, amount) tuples; display_name is the longest
+            raw client name seen for that client
+    """
+    if _uses_postgres():
+        rows = db.session.execute(_pg_client_totals(start_date, end_date))
+        return [(name, float(amount or 0)) for name, amount in rows]
+
+    payments = db.session.execute(select(
+        BankTransaction.description,
+        func.sum(BankTransaction.debit_gbp),
+    ).where(
+        *_client_payment_filters(start_date, end_date)
+    ).group_by(BankTransaction.description))
+
+    amounts = defaultdict(float)
+    display_names = {}
+    for description, amount in payments:
+        client_name = payment_client_name(description)
+        # Skip empty or generic descriptions
+        if client_name.lower() in GENERIC_PAYMENT_NAMES:
+            continue
+
+        # Aggregate by normalized name, keeping the most complete name for display
+        normalized = normalize_client_name(client_name)
+        amounts[normalized] += float(amount or 0)
+        if len(client_name) > len(display_names.get(normalized, '')):
+            display_names[normalized] = client_name
+
+    return [(display_names[normalized], amount) for normalized, amount in amounts.items()]
+
+
+def _top_client_payments(start_date, end_date, limit):
+    """
+    The largest client payment totals, with the overall total and client count.
+
+    On PostgreSQL the total and count are window aggregates over the
+    grouped clients, so only `limit` rows are returned.
+
+    Returns:
+        tuple: ([(display_name, amount)] largest first, total_received, client_count)
+    """
+    if not _uses_postgres():
+        client_totals = _client_payment_totals(start_date, end_date)
+        top = heapq.nlargest(limit, client_totals, key=lambda client: client[1])
+        return top, sum(amount for _, amount in client_totals), len(client_totals)
+
+    clients = _pg_client_totals(start_date, end_date)
+    total = func.sum(BankTransaction.debit_gbp)
+    rows = db.session.execute(clients.add_columns(
+        func.sum(total).over(),
+        func.count().over(),
+    ).order_by(total.desc()).limit(limit)).all()
+    if not rows:
+        return [], 0, 0
+    top = [(name, float(amount or 0)) for name, amount, _, _ in rows]
+    return top, float(rows[0][2] or 0), rows[0][3]
+
 
 @data_bp.route('/api/metrics/cash-concentration')
+@json_endpoint
 def get_cash_concentration():
     """
     Calculate cash concentration risk based on revenue dependency on top clients.
@@ -350,6 +665,10 @@ def get_cash_concentration():
     Analyzes receivable payments over the last 12 months to determine
     concentration risk from client dependency.
 
+    Query params:
+        summary: If 'true' (or 1), only the top 5 clients are listed and
+            loaded; others_percent still covers the rest
+
     Risk levels:
     - HIGH: Top 1 client > 40% of total
     - MEDIUM: Top 3 clients > 70% of total
@@ -358,149 +677,79 @@ def get_cash_concentration():
     Returns:
         Client concentration data with risk assessment
     """
-    try:
-        # Get date range for last 12 months
-        end_date = date.today()
-        start_date = end_date - timedelta(days=365)
-
-        # Query receivable payments from bank_transactions
-        # Use 'Receivable Payment' which represents client invoice payments
-        payments = db.session.query(
-            BankTransaction.description,
-            func.sum(BankTransaction.debit_gbp).label('total_amount')
-        ).filter(
-            BankTransaction.source_type == 'Receivable Payment',
-            BankTransaction.transaction_date >= start_date,
-            BankTransaction.transaction_date <= end_date,
-            BankTransaction.debit_gbp > 0
-        ).group_by(
-            BankTransaction.description
-        ).all()
-
-        # Extract client names and aggregate by client
-        client_totals = {}
-
-        def normalize_client_name(name):
-            """Normalize client names to group related entities together."""
-            name = name.strip()
-            # Common suffixes to remove for grouping - order matters (longer first)
-            suffixes = [
-                ' UK Limited', ' UK Ltd', ' UK Ltd.',
-                ' Limited', ' Ltd', ' Ltd.',
-                ' Company', ' Corp', ' Corporation',
-                ' Inc.', ' Inc',
-                ' PLC', ' plc', ' Plc',
-                ' LLP', ' LP', ' LLC',
-            ]
-            normalized = name
-            # Keep removing suffixes until none match
-            changed = True
-            while changed:
-                changed = False
-                for suffix in suffixes:
-                    if normalized.endswith(suffix):
-                        normalized = normalized[:-len(suffix)].strip()
-                        changed = True
-                        break
-            return normalized
-
-        for payment in payments:
-            description = payment.description or ''
-            amount = float(payment.total_amount or 0)
-
-            # Extract client name from description
-            # Format: "Payment: Client Name" or just the description
-            if description.startswith('Payment: '):
-                client_name = description[9:].strip()
-            elif description.startswith('Payment from '):
-                client_name = description[13:].strip()
-            else:
-                client_name = description.strip()
-
-            # Skip empty or generic descriptions
-            if not client_name or client_name.lower() in ['', 'payment', 'transfer']:
-                continue
-
-            # Normalize client name for grouping (but keep original for display)
-            normalized = normalize_client_name(client_name)
-
-            # Aggregate by normalized name
-            if normalized in client_totals:
-                client_totals[normalized]['amount'] += amount
-                # Keep the most complete name for display
-                if len(client_name) > len(client_totals[normalized]['display_name']):
-                    client_totals[normalized]['display_name'] = client_name
-            else:
-                client_totals[normalized] = {
-                    'amount': amount,
-                    'display_name': client_name
-                }
-
-        # Calculate total received
-        total_received = sum(c['amount'] for c in client_totals.values())
-
-        if total_received == 0:
-            return jsonify({
-                'success': True,
-                'period': 'Last 12 months',
-                'total_received': 0,
-                'top_1_percent': 0,
-                'top_3_percent': 0,
-                'top_5_percent': 0,
-                'concentration_risk': 'LOW',
-                'client_count': 0,
-                'clients': []
-            })
-
-        # Sort clients by amount descending
-        sorted_clients = sorted(
-            client_totals.items(),
-            key=lambda x: x[1]['amount'],
-            reverse=True
-        )
-
-        # Calculate percentages and cumulative percentages
-        clients_data = []
-        cumulative = 0
-        for normalized_name, client_info in sorted_clients:
-            amount = client_info['amount']
-            display_name = client_info['display_name']
-            percent = (amount / total_received) * 100
-            cumulative += percent
-            clients_data.append({
-                'client': display_name,
-                'amount': round(amount, 2),
-                'percent': round(percent, 1),
-                'cumulative_percent': round(cumulative, 1)
-            })
-
-        # Calculate concentration metrics
-        top_1_percent = clients_data[0]['percent'] if len(clients_data) >= 1 else 0
-        top_3_percent = clients_data[2]['cumulative_percent'] if len(clients_data) >= 3 else (
-            clients_data[-1]['cumulative_percent'] if clients_data else 0
+    # Get date range for last 12 months
+    end_date = date.today()
+    start_date = end_date - timedelta(days=365)
+
+    # Only the largest clients are listed (the card charts the top 5 plus
+    # "Others", sent as others_percent); the concentration metrics below
+    # only need the top 5
+    if request.args.get('summary', '').lower() in ('1', 'true'):
+        top_clients, total_received, client_count = _top_client_payments(
+            start_date, end_date, 5
         )
-        top_5_percent = clients_data[4]['cumulative_percent'] if len(clients_data) >= 5 else (
-            clients_data[-1]['cumulative_percent'] if clients_data else 0
+    else:
+        client_totals = _client_payment_totals(start_date, end_date)
+        total_received = sum(amount for _, amount in client_totals)
+        client_count = len(client_totals)
+        top_clients = heapq.nlargest(
+            CONCENTRATION_TOP_CLIENTS, client_totals, key=lambda client: client[1]
         )
 
-        # Determine risk level
-        if top_1_percent > 40:
-            concentration_risk = 'HIGH'
-        elif top_3_percent > 70:
-            concentration_risk = 'MEDIUM'
-        else:
-            concentration_risk = 'LOW'
-
-        return jsonify({
-            'success': True,
+    if total_received == 0:
+        return {
             'period': 'Last 12 months',
-            'total_received': round(total_received, 2),
-            'top_1_percent': round(top_1_percent, 1),
-            'top_3_percent': round(top_3_percent, 1),
-            'top_5_percent': round(top_5_percent, 1),
-            'concentration_risk': concentration_risk,
-            'client_count': len(clients_data),
-            'clients': clients_data
+            'total_received': 0,
+            'top_1_percent': 0,
+            'top_3_percent': 0,
+            'top_5_percent': 0,
+            'others_percent': 0,
+            'concentration_risk': 'LOW',
+            'client_count': 0,
+            'clients': []
+        }
+
+    # Calculate percentages and cumulative percentages
+    clients_data = []
+    cumulative = 0
+    for display_name, amount in top_clients:
+        percent = (amount / total_received) * 100
+        cumulative += percent
+        clients_data.append({
+            'client': display_name,
+            'amount': round(amount, 2),
+            'percent': round(percent, 1),
+            'cumulative_percent': round(cumulative, 1)
         })
-    except Exception as e:
-        return jsonify({'success': False, 'error': str(e)}), 500
+
+    # Calculate concentration metrics
+    top_1_percent = clients_data[0]['percent'] if len(clients_data) >= 1 else 0
+    top_3_percent = clients_data[2]['cumulative_percent'] if len(clients_data) >= 3 else (
+        clients_data[-1]['cumulative_percent'] if clients_data else 0
+    )
+    top_5_percent = clients_data[4]['cumulative_percent'] if len(clients_data) >= 5 else (
+        clients_data[-1]['cumulative_percent'] if clients_data else 0
+    )
+
+    # Share of everyone outside the top 5
+    others_percent = 100 - top_5_percent if client_count > 5 else 0
+
+    # Determine risk level
+    if top_1_percent > 40:
+        concentration_risk = 'HIGH'
+    elif top_3_percent > 70:
+        concentration_risk = 'MEDIUM'
+    else:
+        concentration_risk = 'LOW'
+
+    return {
+        'period': 'Last 12 months',
+        'total_received': round(total_received, 2),
+        'top_1_percent': round(top_1_percent, 1),
+        'top_3_percent': round(top_3_percent, 1),
+        'top_5_percent': round(top_5_percent, 1),
+        'others_percent': round(others_percent, 1),
+        'concentration_risk': concentration_risk,
+        'client_count': client_count,
+        'clients': clients_data
+    }
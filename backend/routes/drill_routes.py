@@ -6,27 +6,33 @@ detailed transactions behind summary numbers.
 
 Supports both Xero API data (recent) and historical CSV imports (older data).
 """
+import base64
 from datetime import date, datetime, timedelta
+from functools import wraps
 from flask import Blueprint, jsonify, request
 
-from sqlalchemy.orm import joinedload
-from xero import XeroClient, XeroAuth
+from sqlalchemy import func, case, tuple_
+from sqlalchemy.orm import raiseload, selectinload
+from xero import get_xero_client, get_xero_auth
 from database import db, HistoricalInvoice, HistoricalLineItem
+from json_provider import json_response
+from ai.cache import get_cached, set_cached
 
 drill_bp = Blueprint('drill', __name__)
-xero_client = XeroClient()
-xero_auth = XeroAuth()
+xero_client = get_xero_client()
+xero_auth = get_xero_auth()
 
 
 # Date threshold for switching to historical data
 # Xero API has limited historical access, so older requests use CSV imports
 HISTORICAL_CUTOFF_DAYS = 365  # Use historical data for requests older than 1 year
 
+# Seconds the historical data counts are cached for
+HISTORICAL_STATS_TTL = 60
+
 
 def require_xero_connection(f):
     """Decorator to ensure Xero connection before API calls."""
-    from functools import wraps
-
     @wraps(f)
     def decorated(*args, **kwargs):
         if not xero_auth.is_connected():
@@ -35,6 +41,25 @@ def require_xero_connection(f):
     return decorated
 
 
+def summarize_invoices(invoices):
+    """
+    Total a drill-down invoice list in one pass.
+
+    Returns:
+        tuple: (total_outstanding, total_overdue, overdue_count)
+    """
+    total_outstanding = 0
+    total_overdue = 0
+    overdue_count = 0
+    for inv in invoices:
+        amount_due = inv['amount_due']
+        total_outstanding += amount_due
+        if inv['is_overdue']:
+            total_overdue += amount_due
+            overdue_count += 1
+    return total_outstanding, total_overdue, overdue_count
+
+
 def parse_date(date_str, default=None):
     """Parse ISO date string to date object.
 
@@ -114,9 +139,15 @@ def drill_cash():
 @drill_bp.route('/api/drill/cash/accounts')
 @require_xero_connection
 def drill_cash_accounts():
-    """Get list of bank accounts for filtering."""
+    """
+    Get list of bank accounts for filtering.
+
+    Query params:
+        refresh: If 'true', force cache refresh
+    """
     try:
-        accounts = xero_client.get_bank_accounts()
+        force_refresh = request.args.get('refresh', '').lower() == 'true'
+        accounts = xero_client.get_bank_accounts(force_refresh=force_refresh)
         return jsonify({
             'success': True,
             'accounts': accounts,
@@ -207,9 +238,7 @@ def drill_receivables():
             data['invoices'] = invoices
 
         # Calculate summary
-        total_outstanding = sum(inv['amount_due'] for inv in invoices)
-        total_overdue = sum(inv['amount_due'] for inv in invoices if inv['is_overdue'])
-        overdue_count = len([inv for inv in invoices if inv['is_overdue']])
+        total_outstanding, total_overdue, overdue_count = summarize_invoices(invoices)
 
         data['summary'] = {
             'total_outstanding': total_outstanding,
@@ -218,7 +247,7 @@ def drill_receivables():
             'overdue_count': overdue_count,
         }
 
-        return jsonify({
+        return json_response({
             'success': True,
             **data,
         })
@@ -294,9 +323,7 @@ def drill_payables():
             data['invoices'] = invoices
 
         # Calculate summary
-        total_outstanding = sum(inv['amount_due'] for inv in invoices)
-        total_overdue = sum(inv['amount_due'] for inv in invoices if inv['is_overdue'])
-        overdue_count = len([inv for inv in invoices if inv['is_overdue']])
+        total_outstanding, total_overdue, overdue_count = summarize_invoices(invoices)
 
         data['summary'] = {
             'total_outstanding': total_outstanding,
@@ -305,7 +332,7 @@ def drill_payables():
             'overdue_count': overdue_count,
         }
 
-        return jsonify({
+        return json_response({
             'success': True,
             **data,
         })
@@ -365,16 +392,16 @@ def drill_pnl():
             to_date=to_date,
         )
 
-        # Calculate totals
+        # Calculate totals in one pass over the categories
         categories = data.get('categories', [])
-        total_revenue = sum(
-            cat['total'] for cat in categories
-            if 'income' in cat['category'].lower() or 'revenue' in cat['category'].lower()
-        )
-        total_expenses = sum(
-            abs(cat['total']) for cat in categories
-            if 'expense' in cat['category'].lower() or 'cost' in cat['category'].lower()
-        )
+        total_revenue = 0
+        total_expenses = 0
+        for cat in categories:
+            name = cat['category'].lower()
+            if 'income' in name or 'revenue' in name:
+                total_revenue += cat['total']
+            if 'expense' in name or 'cost' in name:
+                total_expenses += abs(cat['total'])
 
         data['summary'] = {
             'total_revenue': total_revenue,
@@ -521,23 +548,38 @@ def drill_accounts():
 # HISTORICAL DATA ENDPOINTS
 # =============================================================================
 
-def get_historical_invoices(invoice_type, from_date=None, to_date=None, status=None,
-                            page=1, page_size=50):
+def encode_invoice_cursor(invoice):
+    """Encode a historical invoice's (invoice_date, id) as a page cursor."""
+    key = f'{invoice.invoice_date.isoformat()}:{invoice.id}'
+    return base64.urlsafe_b64encode(key.encode()).decode()
+
+
+def decode_invoice_cursor(cursor):
     """
-    Query historical invoices from CSV imports.
+    Decode a cursor from encode_invoice_cursor().
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    try:
+        invoice_date, invoice_id = base64.urlsafe_b64decode(cursor.encode()).decode().split(':')
+        return date.fromisoformat(invoice_date), int(invoice_id)
+    except (ValueError, UnicodeError) as e:
+        raise ValueError(f'Invalid cursor: {cursor}') from e
+
+
+def filter_historical_invoices(query, invoice_type, from_date=None, to_date=None, status=None):
+    """
+    Apply the historical drill-down filters to a HistoricalInvoice query.
 
     Args:
+        query: Query over HistoricalInvoice (rows or aggregates)
         invoice_type: 'receivable' or 'payable'
         from_date: Start date filter
         to_date: End date filter
-        status: Filter by status ('Paid', 'Awaiting Payment', or None for all)
-        page: Page number
-        page_size: Results per page
-
-    Returns:
-        dict with invoices list and metadata
+        status: Frontend status (AUTHORISED, PAID, or None/other for all)
     """
-    query = HistoricalInvoice.query.filter_by(invoice_type=invoice_type)
+    query = query.filter(HistoricalInvoice.invoice_type == invoice_type)
 
     if from_date:
         query = query.filter(HistoricalInvoice.invoice_date >= from_date)
@@ -550,18 +592,94 @@ def get_historical_invoices(invoice_type, from_date=None, to_date=None, status=N
         elif status.upper() == 'PAID':
             query = query.filter(HistoricalInvoice.status == 'Paid')
         # else: no filter (ALL)
+    return query
+
+
+def get_historical_invoice_summary(invoice_type, from_date=None, to_date=None, status=None):
+    """
+    Total all historical invoices matching the drill-down filters in SQL.
+
+    Unlike summarize_invoices() on a page, this covers every matching
+    invoice, in one aggregate query.
 
-    # Order by date descending
-    query = query.order_by(HistoricalInvoice.invoice_date.desc())
+    Returns:
+        tuple: (total_outstanding, total_overdue, invoice_count, overdue_count)
+    """
+    amount_due = func.coalesce(HistoricalInvoice.amount_due, 0)
+    overdue = HistoricalInvoice.is_overdue(datetime.utcnow().date())
+    query = db.session.query(
+        func.sum(amount_due),
+        func.sum(case((overdue, amount_due), else_=0)),
+        func.count(HistoricalInvoice.id),
+        func.sum(case((overdue, 1), else_=0)),
+    )
+    total_outstanding, total_overdue, invoice_count, overdue_count = filter_historical_invoices(
+        query, invoice_type, from_date, to_date, status
+    ).one()
+    return (float(total_outstanding or 0), float(total_overdue or 0),
+            invoice_count, int(overdue_count or 0))
+
+
+def get_historical_invoices(invoice_type, from_date=None, to_date=None, status=None,
+                            page=1, page_size=50, cursor=None, include_count=False):
+    """
+    Query historical invoices from CSV imports.
+
+    Pages are read with keyset pagination: the cursor holds the last
+    invoice's (invoice_date, id), so the next page is an index range scan
+    however deep it is. page (OFFSET) is still accepted for clients that
+    don't send a cursor. The matching total is only counted on request,
+    since COUNT(*) scans the whole filtered range.
+
+    Args:
+        invoice_type: 'receivable' or 'payable'
+        from_date: Start date filter
+        to_date: End date filter
+        status: Filter by status ('Paid', 'Awaiting Payment', or None for all)
+        page: Page number (ignored when cursor is given)
+        page_size: Results per page
+        cursor: next_cursor from the previous page
+        include_count: Also count all matching invoices (total_count)
+
+    Returns:
+        dict with invoices list and metadata
+
+    Raises:
+        ValueError: If the cursor is malformed
+    """
+    query = filter_historical_invoices(
+        HistoricalInvoice.query, invoice_type, from_date, to_date, status
+    )
+
+    total_count = query.count() if include_count else None
 
-    # Paginate
-    total_count = query.count()
-    offset = (page - 1) * page_size
-    invoices = query.offset(offset).limit(page_size).all()
+    # Order by date descending; id breaks ties so the cursor is exact
+    query = query.order_by(HistoricalInvoice.invoice_date.desc(), HistoricalInvoice.id.desc())
+
+    if cursor:
+        last_date, last_id = decode_invoice_cursor(cursor)
+        query = query.filter(
+            tuple_(HistoricalInvoice.invoice_date, HistoricalInvoice.id) < (last_date, last_id)
+        )
+    else:
+        query = query.offset((page - 1) * page_size)
+
+    # Overdue flag computed by the database alongside each row; one extra
+    # row tells whether another page follows. Serialization only reads
+    # columns, so touching line_items would raise rather than lazy-load
+    # once per row.
+    today = datetime.utcnow().date()
+    invoices = (
+        query.add_columns(HistoricalInvoice.is_overdue(today).label('is_overdue'))
+        .options(raiseload(HistoricalInvoice.line_items))
+        .limit(page_size + 1).all()
+    )
+    has_more = len(invoices) > page_size
+    invoices = invoices[:page_size]
 
     # Convert to API format
     invoice_list = []
-    for inv in invoices:
+    for inv, is_overdue in invoices:
         invoice_list.append({
             'invoice_id': f"hist_{inv.id}",  # Prefix to distinguish from Xero IDs
             'invoice_number': inv.invoice_number,
@@ -572,8 +690,8 @@ def get_historical_invoices(invoice_type, from_date=None, to_date=None, status=N
             'amount_due': float(inv.amount_due or 0),
             'amount_paid': float(inv.amount_paid or 0),
             'status': 'PAID' if inv.status == 'Paid' else 'AUTHORISED',
-            'is_overdue': inv.is_overdue(),
-            'days_overdue': inv.days_overdue(),
+            'is_overdue': bool(is_overdue),
+            'days_overdue': inv.days_overdue(today, is_overdue),
             'currency': inv.currency,
             'is_credit_note': inv.is_credit_note,
             'source': 'historical',
@@ -581,9 +699,10 @@ def get_historical_invoices(invoice_type, from_date=None, to_date=None, status=N
 
     return {
         'invoices': invoice_list,
-        'has_more': offset + len(invoices) < total_count,
+        'has_more': has_more,
+        'next_cursor': encode_invoice_cursor(invoices[-1][0]) if has_more else None,
         'total_count': total_count,
-        'page': page,
+        'page': None if cursor else page,
         'page_size': page_size,
         'from_date': from_date.isoformat() if from_date else None,
         'to_date': to_date.isoformat() if to_date else None,
@@ -600,15 +719,19 @@ def drill_historical_receivables():
         from_date: Start date (ISO format)
         to_date: End date (ISO format)
         status: Filter by status (AUTHORISED, PAID, or empty for all)
-        page: Page number (default: 1)
+        cursor: next_cursor from the previous response
+        page: Page number when no cursor is given (default: 1)
         page_size: Results per page (default: 50, max: 100)
+        include_count: If 'true', include total_count of matching invoices
     """
     try:
         from_date = parse_date(request.args.get('from_date'))
         to_date = parse_date(request.args.get('to_date'))
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
         page = request.args.get('page', 1, type=int)
         page_size = min(request.args.get('page_size', 50, type=int), 100)
+        include_count = request.args.get('include_count', '').lower() == 'true'
 
         data = get_historical_invoices(
             invoice_type='receivable',
@@ -617,19 +740,19 @@ def drill_historical_receivables():
             status=status,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            include_count=include_count,
         )
 
-        invoices = data['invoices']
-
-        # Calculate summary
-        total_outstanding = sum(inv['amount_due'] for inv in invoices)
-        total_overdue = sum(inv['amount_due'] for inv in invoices if inv['is_overdue'])
-        overdue_count = len([inv for inv in invoices if inv['is_overdue']])
+        # Summary over every matching invoice, not just this page
+        total_outstanding, total_overdue, count, overdue_count = get_historical_invoice_summary(
+            'receivable', from_date, to_date, status
+        )
 
         data['summary'] = {
             'total_outstanding': total_outstanding,
             'total_overdue': total_overdue,
-            'invoice_count': len(invoices),
+            'invoice_count': count,
             'overdue_count': overdue_count,
         }
 
@@ -638,6 +761,9 @@ def drill_historical_receivables():
             **data,
         })
 
+    except ValueError as e:
+        # Malformed cursor
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -651,15 +777,19 @@ def drill_historical_payables():
         from_date: Start date (ISO format)
         to_date: End date (ISO format)
         status: Filter by status (AUTHORISED, PAID, or empty for all)
-        page: Page number (default: 1)
+        cursor: next_cursor from the previous response
+        page: Page number when no cursor is given (default: 1)
         page_size: Results per page (default: 50, max: 100)
+        include_count: If 'true', include total_count of matching invoices
     """
     try:
         from_date = parse_date(request.args.get('from_date'))
         to_date = parse_date(request.args.get('to_date'))
         status = request.args.get('status')
+        cursor = request.args.get('cursor')
         page = request.args.get('page', 1, type=int)
         page_size = min(request.args.get('page_size', 50, type=int), 100)
+        include_count = request.args.get('include_count', '').lower() == 'true'
 
         data = get_historical_invoices(
             invoice_type='payable',
@@ -668,19 +798,19 @@ def drill_historical_payables():
             status=status,
             page=page,
             page_size=page_size,
+            cursor=cursor,
+            include_count=include_count,
         )
 
-        invoices = data['invoices']
-
-        # Calculate summary
-        total_outstanding = sum(inv['amount_due'] for inv in invoices)
-        total_overdue = sum(inv['amount_due'] for inv in invoices if inv['is_overdue'])
-        overdue_count = len([inv for inv in invoices if inv['is_overdue']])
+        # Summary over every matching invoice, not just this page
+        total_outstanding, total_overdue, count, overdue_count = get_historical_invoice_summary(
+            'payable', from_date, to_date, status
+        )
 
         data['summary'] = {
             'total_outstanding': total_outstanding,
             'total_overdue': total_overdue,
-            'bill_count': len(invoices),
+            'bill_count': count,
             'overdue_count': overdue_count,
         }
 
@@ -689,6 +819,9 @@ def drill_historical_payables():
             **data,
         })
 
+    except ValueError as e:
+        # Malformed cursor
+        return jsonify({'success': False, 'error': str(e)}), 400
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
 
@@ -702,15 +835,16 @@ def drill_historical_invoice_detail(invoice_id):
         invoice_id: The historical invoice ID (without 'hist_' prefix)
     """
     try:
-        # Use eager loading to fetch invoice + line items in single query
-        invoice = HistoricalInvoice.query.options(
-            joinedload(HistoricalInvoice.line_items)
-        ).get(invoice_id)
+        # Eager-load line items with one IN (...) query alongside the invoice
+        invoice = db.session.get(
+            HistoricalInvoice, invoice_id,
+            options=[selectinload(HistoricalInvoice.line_items)],
+        )
 
         if not invoice:
             return jsonify({'success': False, 'error': 'Invoice not found'}), 404
 
-        # Line items already loaded via joinedload
+        # Line items already loaded via selectinload
         line_items = [item.to_dict() for item in invoice.line_items]
 
         return jsonify({
@@ -731,42 +865,42 @@ def drill_historical_stats():
     """
     Get statistics about historical data available.
 
-    Returns counts and date ranges for historical data.
+    Returns counts and date ranges for historical data. The result is
+    cached for HISTORICAL_STATS_TTL seconds so dashboard polls don't
+    re-count the tables.
     """
     try:
-        from sqlalchemy import func
-
-        # Get counts
-        receivables_count = HistoricalInvoice.query.filter_by(invoice_type='receivable').count()
-        payables_count = HistoricalInvoice.query.filter_by(invoice_type='payable').count()
-        line_items_count = HistoricalLineItem.query.count()
-
-        # Get date ranges
-        receivables_range = db.session.query(
-            func.min(HistoricalInvoice.invoice_date),
-            func.max(HistoricalInvoice.invoice_date)
-        ).filter_by(invoice_type='receivable').first()
-
-        payables_range = db.session.query(
-            func.min(HistoricalInvoice.invoice_date),
-            func.max(HistoricalInvoice.invoice_date)
-        ).filter_by(invoice_type='payable').first()
+        stats = get_cached('historical_stats', cache_type='historical_stats')
+        if stats is None:
+            # Counts and date ranges for both invoice types in one query
+            ranges = {
+                invoice_type: (count, earliest, latest)
+                for invoice_type, count, earliest, latest in db.session.query(
+                    HistoricalInvoice.invoice_type,
+                    func.count(HistoricalInvoice.id),
+                    func.min(HistoricalInvoice.invoice_date),
+                    func.max(HistoricalInvoice.invoice_date),
+                ).filter(
+                    HistoricalInvoice.invoice_type.in_(['receivable', 'payable'])
+                ).group_by(HistoricalInvoice.invoice_type)
+            }
+            line_items_count = db.session.query(func.count(HistoricalLineItem.id)).scalar()
+
+            stats = {}
+            for invoice_type, key in (('receivable', 'receivables'), ('payable', 'payables')):
+                count, earliest, latest = ranges.get(invoice_type, (0, None, None))
+                stats[key] = {
+                    'count': count,
+                    'earliest_date': earliest.isoformat() if earliest else None,
+                    'latest_date': latest.isoformat() if latest else None,
+                }
+            stats['line_items_count'] = line_items_count
+            set_cached('historical_stats', stats, HISTORICAL_STATS_TTL,
+                       cache_type='historical_stats')
 
         return jsonify({
             'success': True,
-            'stats': {
-                'receivables': {
-                    'count': receivables_count,
-                    'earliest_date': receivables_range[0].isoformat() if receivables_range[0] else None,
-                    'latest_date': receivables_range[1].isoformat() if receivables_range[1] else None,
-                },
-                'payables': {
-                    'count': payables_count,
-                    'earliest_date': payables_range[0].isoformat() if payables_range[0] else None,
-                    'latest_date': payables_range[1].isoformat() if payables_range[1] else None,
-                },
-                'line_items_count': line_items_count,
-            }
+            'stats': stats,
         })
 
     except Exception as e:
@@ -783,20 +917,16 @@ def get_historical_revenue(from_date, to_date):
     Returns:
         dict with revenue breakdown
     """
-    from sqlalchemy import func, case
-
     # Use database aggregation instead of Python loops for efficiency
     result = db.session.query(
         # Gross revenue (non-credit notes)
         func.coalesce(func.sum(case(
-            (HistoricalInvoice.is_credit_note == False,
-             HistoricalInvoice.total - func.coalesce(HistoricalInvoice.tax_total, 0)),
+            (HistoricalInvoice.is_credit_note == False, HistoricalInvoice.net_total()),
             else_=0
         )), 0).label('gross_revenue'),
         # Credit notes total
         func.coalesce(func.sum(case(
-            (HistoricalInvoice.is_credit_note == True,
-             HistoricalInvoice.total - func.coalesce(HistoricalInvoice.tax_total, 0)),
+            (HistoricalInvoice.is_credit_note == True, HistoricalInvoice.net_total()),
             else_=0
         )), 0).label('credit_notes'),
         # Tax total
@@ -4,22 +4,25 @@ History and metrics API routes.
 Provides endpoints for historical financial data and calculated metrics.
 """
 
+import time
 from flask import Blueprint, jsonify, request
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 from decimal import Decimal
+from functools import wraps
+from statistics import mean
+from sqlalchemy import func
 
 from database.db import db
 from database.models import MonthlySnapshot, AccountBalanceHistory, BankTransaction, MonthlyCashSnapshot
-from xero import XeroClient, XeroAuth
+from services.history_sync import sync_all_from_xero
+from xero import get_xero_client, get_xero_auth
 
 history_bp = Blueprint('history', __name__)
-xero_auth = XeroAuth()
+xero_auth = get_xero_auth()
 
 
 def require_xero_connection(f):
     """Decorator to ensure Xero connection before API calls."""
-    from functools import wraps
-
     @wraps(f)
     def decorated(*args, **kwargs):
         if not xero_auth.is_connected():
@@ -43,14 +46,16 @@ def get_snapshots():
         months = request.args.get('months', 60, type=int)
         months = min(max(months, 1), 120)  # Clamp between 1-120
 
-        snapshots = MonthlySnapshot.query.order_by(
-            MonthlySnapshot.snapshot_date.desc()
-        ).limit(months).all()
+        snapshots = MonthlySnapshot.serialize_query(
+            MonthlySnapshot.query.order_by(
+                MonthlySnapshot.snapshot_date.desc()
+            ).limit(months)
+        )
 
         return jsonify({
             'success': True,
             'count': len(snapshots),
-            'snapshots': [s.to_dict() for s in snapshots]
+            'snapshots': snapshots
         })
     except Exception as e:
         return jsonify({'success': False, 'error': str(e)}), 500
@@ -191,7 +196,7 @@ def get_runway():
         calculation_basis: Description of calculation method
     """
     try:
-        xero_client = XeroClient()
+        xero_client = get_xero_client()
 
         # Get current cash position
         bank_summary = xero_client.get_bank_summary()
@@ -247,10 +252,6 @@ def get_runway():
     except Exception as e:
         # Fall back to historical snapshot data
         try:
-            from database.models import MonthlyCashSnapshot
-            from sqlalchemy import func
-            from statistics import mean
-
             # Get last 6 months of snapshots
             snapshots = MonthlyCashSnapshot.query.order_by(
                 MonthlyCashSnapshot.snapshot_date.desc()
@@ -303,16 +304,13 @@ def trigger_backfill():
         months: Number of months to backfill (default 60)
         dry_run: If true, don't actually save (default false)
     """
-    import time
-    from datetime import timedelta
-
     try:
         data = request.get_json() or {}
         num_months = data.get('months', 60)
         dry_run = data.get('dry_run', False)
         num_months = min(max(num_months, 1), 120)
 
-        xero_client = XeroClient()
+        xero_client = get_xero_client()
 
         # Generate list of months to backfill
         today = date.today()
@@ -666,8 +664,6 @@ def drill_bank_transactions():
     Returns:
         Paginated transaction list with summary
     """
-    from sqlalchemy import func
-
     try:
         # Parse params
         from_date_str = request.args.get('from_date')
@@ -734,13 +730,15 @@ def drill_bank_transactions():
         # Paginate
         total_count = query.count()
         offset = (page - 1) * page_size
-        transactions = query.order_by(
-            BankTransaction.transaction_date.desc()
-        ).offset(offset).limit(page_size).all()
+        transactions = BankTransaction.serialize_query(
+            query.order_by(
+                BankTransaction.transaction_date.desc()
+            ).offset(offset).limit(page_size)
+        )
 
         return jsonify({
             'success': True,
-            'transactions': [t.to_dict() for t in transactions],
+            'transactions': transactions,
             'summary': {
                 'total_in': float(totals.total_in or 0),
                 'total_out': float(totals.total_out or 0),
@@ -759,8 +757,6 @@ def drill_bank_transactions():
 @history_bp.route('/api/drill/bank-transactions/accounts')
 def get_bank_accounts():
     """Get list of bank accounts from imported transactions."""
-    from sqlalchemy import func
-
     try:
         accounts = db.session.query(
             BankTransaction.bank_account,
@@ -785,8 +781,6 @@ def get_bank_accounts():
 @history_bp.route('/api/drill/bank-transactions/source-types')
 def get_source_types():
     """Get list of transaction source types."""
-    from sqlalchemy import func
-
     try:
         types = db.session.query(
             BankTransaction.source_type,
@@ -821,8 +815,6 @@ def get_runway_historical():
         calculation_basis: Description of calculation method
     """
     try:
-        from sqlalchemy import func
-
         # Get last 6 complete months (excluding current month)
         today = date.today()
         current_month_start = date(today.year, today.month, 1)
@@ -855,7 +847,7 @@ def get_runway_historical():
         # Get current cash position from Xero (if connected) or latest snapshot
         try:
             if xero_auth.is_connected():
-                xero_client = XeroClient()
+                xero_client = get_xero_client()
                 bank_summary = xero_client.get_bank_summary()
                 current_cash = float(bank_summary.get('total_balance', 0))
             else:
@@ -917,8 +909,7 @@ def sync_history():
         days_back = request.args.get('days_back', 90, type=int)
         days_back = min(max(days_back, 7), 365)  # Clamp between 7 and 365 days
 
-        from services.history_sync import sync_all_from_xero
-        xero_client = XeroClient()
+        xero_client = get_xero_client()
 
         result = sync_all_from_xero(xero_client, days_back=days_back)
 
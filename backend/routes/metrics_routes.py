@@ -12,10 +12,11 @@ Provides calculated metrics based on historical bank transaction data:
 from datetime import date, datetime, timedelta
 from statistics import mean, stdev
 from flask import Blueprint, jsonify, request
-from sqlalchemy import func, case, extract, and_, or_
+from sqlalchemy import func, case, extract, and_, or_, select
 
 from database import db
 from database.models import BankTransaction, MonthlyCashSnapshot
+from json_provider import json_response
 
 metrics_bp = Blueprint('metrics', __name__)
 
@@ -28,10 +29,10 @@ def get_current_cash_position():
     """Get current cash position from most recent snapshot or calculate from transactions."""
     # Try to get from Xero via dashboard data cache
     try:
-        from xero import XeroClient, XeroAuth
-        xero_auth = XeroAuth()
+        from xero import get_xero_client, get_xero_auth
+        xero_auth = get_xero_auth()
         if xero_auth.is_connected():
-            xero_client = XeroClient()
+            xero_client = get_xero_client()
             bank_data = xero_client.get_bank_summary()
             return bank_data.get('total_balance', 0)
     except Exception:
@@ -114,6 +115,57 @@ def extract_client_name(description):
     return normalize_description(description)
 
 
+def sum_by_description(source_type, start, end=None, search=None):
+    """
+    Total bank transactions per raw description, aggregated in the database.
+
+    Spend Money rows are totalled on credit_gbp (money out), everything else
+    on debit_gbp (money in); only rows with a positive amount are included.
+
+    Args:
+        source_type: Transaction source type to filter on
+        start: First transaction date (inclusive)
+        end: Last transaction date (inclusive), or None for no upper bound
+        search: Optional case-insensitive description substring
+
+    Returns:
+        list: (description, total, transaction_count) rows
+    """
+    amount = BankTransaction.credit_gbp if source_type == 'Spend Money' else BankTransaction.debit_gbp
+    query = db.session.query(
+        BankTransaction.description,
+        func.sum(amount),
+        func.count(BankTransaction.id),
+    ).filter(
+        BankTransaction.source_type == source_type,
+        BankTransaction.transaction_date >= start,
+        amount > 0
+    )
+    if end is not None:
+        query = query.filter(BankTransaction.transaction_date <= end)
+    if search:
+        query = query.filter(BankTransaction.description.ilike(f'%{search}%'))
+    return query.group_by(BankTransaction.description).all()
+
+
+def rollup_descriptions(rows, key=normalize_description):
+    """
+    Merge sum_by_description() rows whose descriptions map to the same name.
+
+    Args:
+        rows: (description, total, transaction_count) rows
+        key: Function mapping a raw description to a vendor/client name
+
+    Returns:
+        dict: {name: total as float}
+    """
+    totals = {}
+    for description, total, _ in rows:
+        name = key(description)
+        totals[name] = totals.get(name, 0) + float(total or 0)
+    return totals
+
+
 # =============================================================================
 # Widget 1: Cash Runway Confidence Band
 # =============================================================================
@@ -209,37 +261,41 @@ def fixed_costs():
         # Get 12 months of expense transactions
         twelve_months_ago = date.today() - timedelta(days=365)
 
-        expenses = BankTransaction.query.filter(
+        # Only the per-description aggregates are kept, so stream the
+        # columns in batches rather than materializing every row.
+        stmt = select(
+            BankTransaction.description,
+            BankTransaction.transaction_date,
+            BankTransaction.credit_gbp,
+        ).where(
             BankTransaction.source_type == 'Spend Money',
             BankTransaction.transaction_date >= twelve_months_ago,
             BankTransaction.credit_gbp > 0
-        ).all()
-
-        if not expenses:
-            return jsonify({
-                'success': False,
-                'error': 'No expense transactions found'
-            }), 400
+        ).execution_options(yield_per=500, stream_results=True)
 
         # Count occurrences per description
         monthly_presence = {}  # {description: set of months}
         monthly_amounts = {}   # {description: [amounts]}
+        all_months = set()
 
-        for tx in expenses:
-            desc = normalize_description(tx.description)
-            month = tx.transaction_date.strftime('%Y-%m')
+        for description, tx_date, credit in db.session.execute(stmt):
+            desc = normalize_description(description)
+            month = tx_date.strftime('%Y-%m')
 
             if desc not in monthly_presence:
                 monthly_presence[desc] = set()
                 monthly_amounts[desc] = []
 
             monthly_presence[desc].add(month)
-            monthly_amounts[desc].append(float(tx.credit_gbp or 0))
+            monthly_amounts[desc].append(float(credit or 0))
+            all_months.add(month)
+
+        if not all_months:
+            return jsonify({
+                'success': False,
+                'error': 'No expense transactions found'
+            }), 400
 
-        # Get total months in dataset
-        all_months = set()
-        for tx in expenses:
-            all_months.add(tx.transaction_date.strftime('%Y-%m'))
         total_months = len(all_months)
 
         # Fixed cost = appears in 80%+ of months
@@ -333,32 +389,13 @@ def vendor_trends():
         prior_start = date(year - 1, 1, 1)
         prior_end = date(year - 1, current_month, 1) - timedelta(days=1)
 
-        # Get current year transactions
-        current_txs = BankTransaction.query.filter(
-            BankTransaction.source_type == 'Spend Money',
-            BankTransaction.transaction_date >= current_start,
-            BankTransaction.transaction_date <= current_end,
-            BankTransaction.credit_gbp > 0
-        ).all()
-
-        # Get prior year transactions
-        prior_txs = BankTransaction.query.filter(
-            BankTransaction.source_type == 'Spend Money',
-            BankTransaction.transaction_date >= prior_start,
-            BankTransaction.transaction_date <= prior_end,
-            BankTransaction.credit_gbp > 0
-        ).all()
-
-        # Aggregate by vendor
-        current_by_vendor = {}
-        for tx in current_txs:
-            vendor = normalize_description(tx.description)
-            current_by_vendor[vendor] = current_by_vendor.get(vendor, 0) + float(tx.credit_gbp or 0)
-
-        prior_by_vendor = {}
-        for tx in prior_txs:
-            vendor = normalize_description(tx.description)
-            prior_by_vendor[vendor] = prior_by_vendor.get(vendor, 0) + float(tx.credit_gbp or 0)
+        # Aggregate spend by vendor for each period
+        current_by_vendor = rollup_descriptions(
+            sum_by_description('Spend Money', current_start, current_end)
+        )
+        prior_by_vendor = rollup_descriptions(
+            sum_by_description('Spend Money', prior_start, prior_end)
+        )
 
         # Combine all vendors
         all_vendors = set(current_by_vendor.keys()) | set(prior_by_vendor.keys())
@@ -424,11 +461,7 @@ def cash_concentration():
         # Get receivable payments (money from clients) - last 12 months
         twelve_months_ago = date.today() - timedelta(days=365)
 
-        payments = BankTransaction.query.filter(
-            BankTransaction.source_type == 'Receivable Payment',
-            BankTransaction.transaction_date >= twelve_months_ago,
-            BankTransaction.debit_gbp > 0
-        ).all()
+        payments = sum_by_description('Receivable Payment', twelve_months_ago)
 
         if not payments:
             return jsonify({
@@ -437,10 +470,7 @@ def cash_concentration():
             }), 400
 
         # Aggregate by client
-        client_totals = {}
-        for tx in payments:
-            client = extract_client_name(tx.description)
-            client_totals[client] = client_totals.get(client, 0) + float(tx.debit_gbp or 0)
+        client_totals = rollup_descriptions(payments, key=extract_client_name)
 
         # Sort by total
         sorted_clients = sorted(client_totals.items(), key=lambda x: x[1], reverse=True)
@@ -484,7 +514,7 @@ def cash_concentration():
             concentration_risk = 'LOW'
             risk_reason = 'Revenue is well diversified across clients'
 
-        return jsonify({
+        return json_response({
             'success': True,
             'period': 'Last 12 months',
             'total_received': round(total_received, 2),
@@ -649,7 +679,12 @@ def handle_spending_query(question, period):
             filter_term = cat
             break
 
-    # Query transactions
+    # Aggregate transactions per description, then group by vendor
+    rows = sum_by_description('Spend Money', period['start'], period['end'], search=filter_term)
+    by_vendor = rollup_descriptions(rows)
+    total = sum(by_vendor.values())
+
+    # A few raw transactions as examples
     query = BankTransaction.query.filter(
         BankTransaction.source_type == 'Spend Money',
         BankTransaction.transaction_date >= period['start'],
@@ -660,15 +695,7 @@ def handle_spending_query(question, period):
     if filter_term:
         query = query.filter(BankTransaction.description.ilike(f'%{filter_term}%'))
 
-    transactions = query.all()
-
-    total = sum(float(tx.credit_gbp or 0) for tx in transactions)
-
-    # Group by vendor
-    by_vendor = {}
-    for tx in transactions:
-        vendor = normalize_description(tx.description)
-        by_vendor[vendor] = by_vendor.get(vendor, 0) + float(tx.credit_gbp or 0)
+    samples = query.limit(5).all()
 
     sorted_vendors = sorted(by_vendor.items(), key=lambda x: x[1], reverse=True)
 
@@ -677,7 +704,7 @@ def handle_spending_query(question, period):
         'period': period['label'],
         'filter': filter_term,
         'total_gbp': round(total, 2),
-        'transaction_count': len(transactions),
+        'transaction_count': sum(count for _, _, count in rows),
         'breakdown': [
             {'vendor': v, 'amount': round(a, 2)}
             for v, a in sorted_vendors[:10]
@@ -688,7 +715,7 @@ def handle_spending_query(question, period):
                 'description': tx.description,
                 'amount': float(tx.credit_gbp)
             }
-            for tx in transactions[:5]
+            for tx in samples
         ]
     }
 
@@ -701,22 +728,11 @@ def handle_revenue_query(question, period):
     # Check for client name mentions (would need actual client list)
     # For now, just do a generic query
 
-    query = BankTransaction.query.filter(
-        BankTransaction.source_type == 'Receivable Payment',
-        BankTransaction.transaction_date >= period['start'],
-        BankTransaction.transaction_date <= period['end'],
-        BankTransaction.debit_gbp > 0
-    )
-
-    transactions = query.all()
-
-    total = sum(float(tx.debit_gbp or 0) for tx in transactions)
+    rows = sum_by_description('Receivable Payment', period['start'], period['end'])
 
     # Group by client
-    by_client = {}
-    for tx in transactions:
-        client = extract_client_name(tx.description)
-        by_client[client] = by_client.get(client, 0) + float(tx.debit_gbp or 0)
+    by_client = rollup_descriptions(rows, key=extract_client_name)
+    total = sum(by_client.values())
 
     sorted_clients = sorted(by_client.items(), key=lambda x: x[1], reverse=True)
 
@@ -724,7 +740,7 @@ def handle_revenue_query(question, period):
         'type': 'revenue',
         'period': period['label'],
         'total_gbp': round(total, 2),
-        'transaction_count': len(transactions),
+        'transaction_count': sum(count for _, _, count in rows),
         'breakdown': [
             {'client': c, 'amount': round(a, 2)}
             for c, a in sorted_clients[:10]
@@ -786,17 +802,9 @@ def handle_ranking_query(question, period):
     is_expense = any(word in question.lower() for word in ['expense', 'spend', 'cost', 'vendor'])
 
     if is_expense:
-        transactions = BankTransaction.query.filter(
-            BankTransaction.source_type == 'Spend Money',
-            BankTransaction.transaction_date >= period['start'],
-            BankTransaction.transaction_date <= period['end'],
-            BankTransaction.credit_gbp > 0
-        ).all()
-
-        by_vendor = {}
-        for tx in transactions:
-            vendor = normalize_description(tx.description)
-            by_vendor[vendor] = by_vendor.get(vendor, 0) + float(tx.credit_gbp or 0)
+        by_vendor = rollup_descriptions(
+            sum_by_description('Spend Money', period['start'], period['end'])
+        )
 
         sorted_items = sorted(by_vendor.items(), key=lambda x: x[1], reverse=True)
 
@@ -813,17 +821,10 @@ def handle_ranking_query(question, period):
 
     else:
         # Assume revenue/client ranking
-        transactions = BankTransaction.query.filter(
-            BankTransaction.source_type == 'Receivable Payment',
-            BankTransaction.transaction_date >= period['start'],
-            BankTransaction.transaction_date <= period['end'],
-            BankTransaction.debit_gbp > 0
-        ).all()
-
-        by_client = {}
-        for tx in transactions:
-            client = extract_client_name(tx.description)
-            by_client[client] = by_client.get(client, 0) + float(tx.debit_gbp or 0)
+        by_client = rollup_descriptions(
+            sum_by_description('Receivable Payment', period['start'], period['end']),
+            key=extract_client_name,
+        )
 
         sorted_items = sorted(by_client.items(), key=lambda x: x[1], reverse=True)
 
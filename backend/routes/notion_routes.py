@@ -30,8 +30,8 @@ def get_status():
         from notion.client import NotionClient
         database_id = os.getenv('NOTION_PIPELINE_DB_ID')
 
-        client = NotionClient()
-        status = client.test_connection(database_id)
+        with NotionClient() as client:
+            status = client.test_connection(database_id)
 
         return jsonify({
             'success': status.get('connected', False),
@@ -1,18 +1,19 @@
 """API routes for financial projections."""
 
 from datetime import datetime
+from functools import wraps
 from flask import Blueprint, jsonify, request
 
-from xero import XeroClient, XeroAuth
+from xero import get_xero_client, get_xero_auth
 from context import load_all_context
 from services.scenarios import calculate_scenarios
-from services.costs import get_historical_costs
+from services.costs import get_historical_costs, _costs_cache
 from services.categoriser import get_category_breakdown
 from services.gap_analysis import analyse_gap
 
 projection_bp = Blueprint('projections', __name__)
-xero_client = XeroClient()
-xero_auth = XeroAuth()
+xero_client = get_xero_client()
+xero_auth = get_xero_auth()
 
 # Default Q1 target from goals.yaml
 DEFAULT_Q1_TARGET = 375000
@@ -20,8 +21,6 @@ DEFAULT_Q1_TARGET = 375000
 
 def require_xero_connection(f):
     """Decorator to ensure Xero connection before API calls."""
-    from functools import wraps
-
     @wraps(f)
     def decorated(*args, **kwargs):
         if not xero_auth.is_connected():
@@ -138,7 +137,6 @@ def get_costs_only():
     except Exception as e:
         # Return cached data if available
         try:
-            from services.costs import _costs_cache
             if _costs_cache.get('data'):
                 return jsonify({
                     'success': True,
@@ -168,17 +168,17 @@ def process_bank_transactions_excel(file_content):
             curr = row.get('Currency')
 
             # Create transaction
-            transaction = BankTransaction(
-                transaction_date=tx_date,
-                bank_account=current_account,
-                source_type=str(source).strip(),
-                description=str(desc).strip() if desc is not None and not (isinstance(desc, float) and pd.isna(desc)) else None,
-                reference=str(ref).strip() if ref is not None and not (isinstance(ref, float) and pd.isna(ref)) else None,
-                currency=str(curr).strip() if curr is not None and not (isinstance(curr, float) and pd.isna(curr)) else 'GBP',
-                debit_gbp=debit_gbp,
-                credit_gbp=credit_gbp,
-            )
-            transactions.append(transaction)
+            # Plain dicts for a Core executemany insert (no ORM instances)
+            transactions.append({
+                'transaction_date': tx_date,
+                'bank_account': current_account,
+                'source_type': str(source).strip(),
+                'description': str(desc).strip() if desc is not None and not (isinstance(desc, float) and pd.isna(desc)) else None,
+                'reference': str(ref).strip() if ref is not None and not (isinstance(ref, float) and pd.isna(ref)) else None,
+                'currency': str(curr).strip() if curr is not None and not (isinstance(curr, float) and pd.isna(curr)) else 'GBP',
+                'debit_gbp': debit_gbp,
+                'credit_gbp': credit_gbp,
+            })
 
             # Track date range
             if earliest_date is None or tx_date < earliest_date:
@@ -190,12 +190,7 @@ def process_bank_transactions_excel(file_content):
 
         # Bulk insert transactions in batches for better performance
         print(f"[IMPORT] Inserting transactions into database...")
-        batch_size = 500
-        for i in range(0, len(transactions), batch_size):
-            batch = transactions[i:i + batch_size]
-            db.session.bulk_save_objects(batch)
-            if (i + batch_size) % 1000 == 0:
-                print(f"[IMPORT] Inserted {min(i + batch_size, len(transactions))}/{len(transactions)} transactions...")
+        BankTransaction.bulk_insert(transactions)
 
         db.session.commit()
         print(f"[IMPORT] Database commit complete in {time.time() - start_time:.2f}s")
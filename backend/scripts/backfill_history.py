@@ -22,8 +22,10 @@ import os
 sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.dirname(os.path.abspath(__file__)))))
 
 from backend.app import create_app
-from backend.database.db import db
-from backend.database.models import MonthlySnapshot
+from backend.config import Config
+# create_app() puts backend/ on sys.path and registers the `database` package;
+# importing `backend.database` here would give a second, unbound db instance.
+from database import db, MonthlySnapshot
 from backend.xero.client import XeroClient
 from backend.xero.auth import XeroAuth
 
@@ -134,7 +136,7 @@ def run_backfill(num_months: int = 60, dry_run: bool = False) -> dict:
     Returns:
         Summary dict with success/failure counts
     """
-    app = create_app()
+    app = create_app(engine_options=Config.SCRIPT_ENGINE_OPTIONS)
 
     with app.app_context():
         # Check Xero connection
@@ -22,11 +22,16 @@ from datetime import datetime
 from decimal import Decimal, InvalidOperation
 from collections import defaultdict
 
+from sqlalchemy import update
+
 # Add parent to path for imports
 sys.path.insert(0, '.')
 
 from backend.app import create_app
-from backend.database import db, HistoricalInvoice, HistoricalLineItem
+from backend.config import Config
+# create_app() puts backend/ on sys.path and registers the `database` package;
+# importing `backend.database` here would give a second, unbound db instance.
+from database import db, HistoricalInvoice, HistoricalLineItem
 
 
 # Currency conversion rates to GBP (approximate historical rates)
@@ -36,6 +41,9 @@ CURRENCY_RATES = {
     'USD': Decimal('0.79'),
 }
 
+# Invoice numbers per IN (...) lookup
+CHUNK_SIZE = 500
+
 
 def parse_uk_date(date_str):
     """Parse UK date format (DD/MM/YYYY) to date object."""
@@ -110,6 +118,24 @@ def calculate_gbp_total(total, currency):
     return total * rate
 
 
+def load_invoice_ids(invoice_numbers):
+    """
+    Look up existing invoices by number, in chunks.
+
+    Returns dict: {(invoice_number, invoice_type): id}
+    """
+    ids = {}
+    for i in range(0, len(invoice_numbers), CHUNK_SIZE):
+        rows = db.session.query(
+            HistoricalInvoice.invoice_number,
+            HistoricalInvoice.invoice_type,
+            HistoricalInvoice.id,
+        ).filter(HistoricalInvoice.invoice_number.in_(invoice_numbers[i:i + CHUNK_SIZE]))
+        for invoice_number, invoice_type, invoice_id in rows:
+            ids[(invoice_number, invoice_type)] = invoice_id
+    return ids
+
+
 def import_csv(filepath, default_type='receivable', dry_run=False):
     """
     Import a single CSV file.
@@ -153,6 +179,8 @@ def import_csv(filepath, default_type='receivable', dry_run=False):
     grouped = group_rows_by_invoice(rows)
     print(f"  Grouped into {len(grouped)} unique invoices")
 
+    # Parse every invoice first; database writes are batched below
+    parsed = []  # (invoice fields, line item dicts)
     for invoice_number, invoice_rows in grouped.items():
         try:
             # Use first row for invoice-level data
@@ -174,94 +202,91 @@ def import_csv(filepath, default_type='receivable', dry_run=False):
                 stats['invoices_skipped'] += 1
                 continue
 
-            due_date = parse_uk_date(first_row.get('DueDate'))
             total = parse_decimal(first_row.get('Total', 0))
-            tax_total = parse_decimal(first_row.get('TaxTotal', 0))
-            amount_paid = parse_decimal(first_row.get('InvoiceAmountPaid', 0))
-            amount_due = parse_decimal(first_row.get('InvoiceAmountDue', 0))
             currency = first_row.get('Currency', 'GBP').strip().upper()
-            status = first_row.get('Status', '').strip()
-            contact_name = first_row.get('ContactName', '').strip()
-
-            # Calculate GBP equivalent
-            gbp_total = calculate_gbp_total(total, currency)
-
-            # Check for existing invoice (upsert)
-            existing = HistoricalInvoice.query.filter_by(
-                invoice_number=invoice_number,
-                invoice_type=invoice_type
-            ).first()
-
-            if existing:
-                # Update existing
-                existing.contact_name = contact_name
-                existing.invoice_date = invoice_date
-                existing.due_date = due_date
-                existing.total = total
-                existing.tax_total = tax_total
-                existing.amount_paid = amount_paid
-                existing.amount_due = amount_due
-                existing.currency = currency
-                existing.gbp_total = gbp_total
-                existing.status = status
-                existing.is_credit_note = is_credit_note
-
-                # Delete existing line items to replace
-                HistoricalLineItem.query.filter_by(invoice_id=existing.id).delete()
-                invoice = existing
-                stats['invoices_updated'] += 1
-            else:
-                # Create new
-                invoice = HistoricalInvoice(
-                    invoice_number=invoice_number,
-                    invoice_type=invoice_type,
-                    is_credit_note=is_credit_note,
-                    contact_name=contact_name,
-                    invoice_date=invoice_date,
-                    due_date=due_date,
-                    total=total,
-                    tax_total=tax_total,
-                    amount_paid=amount_paid,
-                    amount_due=amount_due,
-                    currency=currency,
-                    gbp_total=gbp_total,
-                    status=status,
-                    source='csv_import',
-                )
-                db.session.add(invoice)
-                stats['invoices_created'] += 1
-
-            # Need to flush to get invoice ID for line items
-            if not dry_run:
-                db.session.flush()
 
-            # Create line items from each row
+            fields = {
+                'invoice_number': invoice_number,
+                'invoice_type': invoice_type,
+                'is_credit_note': is_credit_note,
+                'contact_name': first_row.get('ContactName', '').strip(),
+                'invoice_date': invoice_date,
+                'due_date': parse_uk_date(first_row.get('DueDate')),
+                'total': total,
+                'tax_total': parse_decimal(first_row.get('TaxTotal', 0)),
+                'amount_paid': parse_decimal(first_row.get('InvoiceAmountPaid', 0)),
+                'amount_due': parse_decimal(first_row.get('InvoiceAmountDue', 0)),
+                'currency': currency,
+                'gbp_total': calculate_gbp_total(total, currency),
+                'status': first_row.get('Status', '').strip(),
+            }
+
+            # Line items from each row
+            line_items = []
             for row in invoice_rows:
                 description = row.get('Description', '').strip()
-                quantity = parse_decimal(row.get('Quantity', 1))
-                unit_amount = parse_decimal(row.get('UnitAmount', 0))
                 line_amount = parse_decimal(row.get('LineAmount', 0))
-                account_code = row.get('AccountCode', '').strip()
-                tax_type = row.get('TaxType', '').strip()
-
                 if description or line_amount:
-                    line_item = HistoricalLineItem(
-                        invoice_id=invoice.id if not dry_run else 0,
-                        description=description,
-                        quantity=quantity,
-                        unit_amount=unit_amount,
-                        line_amount=line_amount,
-                        account_code=account_code,
-                        tax_type=tax_type,
-                    )
-                    if not dry_run:
-                        db.session.add(line_item)
-                    stats['line_items_created'] += 1
+                    line_items.append({
+                        'description': description,
+                        'quantity': parse_decimal(row.get('Quantity', 1)),
+                        'unit_amount': parse_decimal(row.get('UnitAmount', 0)),
+                        'line_amount': line_amount,
+                        'account_code': row.get('AccountCode', '').strip(),
+                        'tax_type': row.get('TaxType', '').strip(),
+                    })
+
+            parsed.append((fields, line_items))
 
         except Exception as e:
             stats['errors'].append(f"Error processing invoice {invoice_number}: {e}")
             stats['invoices_skipped'] += 1
 
+    # One query per chunk for existing invoices instead of one per invoice
+    existing = load_invoice_ids([fields['invoice_number'] for fields, _ in parsed])
+
+    updates = [(fields, items) for fields, items in parsed
+               if (fields['invoice_number'], fields['invoice_type']) in existing]
+    creates = [(fields, items) for fields, items in parsed
+               if (fields['invoice_number'], fields['invoice_type']) not in existing]
+    stats['invoices_updated'] = len(updates)
+    stats['invoices_created'] = len(creates)
+    stats['line_items_created'] = sum(len(items) for _, items in parsed)
+
+    if not dry_run:
+        try:
+            # Update existing invoices and replace their line items
+            update_ids = []
+            for fields, _ in updates:
+                invoice_id = existing[(fields['invoice_number'], fields['invoice_type'])]
+                db.session.execute(
+                    update(HistoricalInvoice)
+                    .where(HistoricalInvoice.id == invoice_id)
+                    .values(**fields)
+                )
+                update_ids.append(invoice_id)
+            for i in range(0, len(update_ids), CHUNK_SIZE):
+                HistoricalLineItem.query.filter(
+                    HistoricalLineItem.invoice_id.in_(update_ids[i:i + CHUNK_SIZE])
+                ).delete(synchronize_session=False)
+
+            # Insert new invoices, then look up their ids for the line items
+            HistoricalInvoice.bulk_insert([
+                dict(fields, source='csv_import') for fields, _ in creates
+            ])
+            invoice_ids = load_invoice_ids([fields['invoice_number'] for fields, _ in creates])
+            invoice_ids.update(existing)
+
+            HistoricalLineItem.bulk_insert([
+                dict(item, invoice_id=invoice_ids[(fields['invoice_number'], fields['invoice_type'])])
+                for fields, items in parsed
+                for item in items
+            ])
+        except Exception as e:
+            db.session.rollback()
+            stats['errors'].append(f"Error writing invoices: {e}")
+            return stats
+
     if not dry_run:
         db.session.commit()
         print("  Committed to database")
@@ -316,7 +341,7 @@ def main():
         parser.error('At least one of --bills or --invoices is required')
 
     # Create Flask app context
-    app = create_app()
+    app = create_app(engine_options=Config.SCRIPT_ENGINE_OPTIONS)
 
     with app.app_context():
         # Create tables if they don't exist
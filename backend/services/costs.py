@@ -54,8 +54,8 @@ def get_historical_costs(months: int = 3, xero_client=None) -> dict:
 
     try:
         if xero_client is None:
-            from xero import XeroClient
-            xero_client = XeroClient()
+            from xero import get_xero_client
+            xero_client = get_xero_client()
 
         today = date.today()
         monthly_data = []
@@ -159,10 +159,5 @@ def get_detailed_pnl(months: int = 3, xero_client=None) -> dict:
 
 
 def clear_costs_cache():
-    """Clear the costs cache."""
-    global _costs_cache
-    _costs_cache = {
-        'data': None,
-        'timestamp': None,
-        'ttl_hours': 1,
-    }
+    """Clear the costs cache (in place, so modules importing it see the change)."""
+    _costs_cache.update(data=None, timestamp=None, ttl_hours=1)
@@ -5,9 +5,10 @@ This ensures that the historical tables stay up-to-date with new transactions
 and invoices from Xero, supplementing the initial Excel import.
 """
 from datetime import date, datetime, timedelta
-from sqlalchemy import and_
-from backend.database import db
-from backend.database.models import BankTransaction, HistoricalInvoice, MonthlyCashSnapshot
+from sqlalchemy import update
+
+from database import db, upsert
+from database.models import BankTransaction, HistoricalInvoice, MonthlyCashSnapshot
 
 
 # Map Xero transaction types to our source types
@@ -20,6 +21,17 @@ XERO_TYPE_MAP = {
     'SPEND-PREPAYMENT': 'Spend Prepayment',
 }
 
+# Columns a re-synced invoice overwrites; is_credit_note and tax_total keep
+# whatever the CSV import stored
+INVOICE_SYNC_COLUMNS = [
+    'contact_name', 'invoice_date', 'due_date', 'total', 'amount_paid',
+    'amount_due', 'currency', 'gbp_total', 'status', 'source',
+]
+
+# Invoices per INSERT ... ON CONFLICT statement (keeps bind parameters
+# well under SQLite's limit)
+INVOICE_UPSERT_CHUNK = 500
+
 
 def sync_bank_transactions_from_xero(xero_client, days_back=90):
     """
@@ -68,6 +80,30 @@ def sync_bank_transactions_from_xero(xero_client, days_back=90):
             if page > 50:
                 break
 
+        # Load the ids of existing transactions for the fetched date range once,
+        # keyed the same way the per-row lookup matched them
+        # (date + description + account)
+        txn_dates = [txn['date'][:10] for txn in all_transactions if txn.get('date')]
+        window_start = date.fromisoformat(min(txn_dates)) if txn_dates else from_date
+        window_end = date.fromisoformat(max(txn_dates)) if txn_dates else to_date
+        existing_by_key = {}
+        for txn_id, txn_date, description, bank_account in db.session.query(
+            BankTransaction.id,
+            BankTransaction.transaction_date,
+            BankTransaction.description,
+            BankTransaction.bank_account,
+        ).filter(
+            BankTransaction.transaction_date >= window_start,
+            BankTransaction.transaction_date <= window_end,
+        ).order_by(BankTransaction.id):
+            existing_by_key.setdefault((txn_date, description, bank_account), txn_id)
+
+        # Rows are collected here and written with one bulk INSERT and one
+        # bulk UPDATE at the end; a transaction seen twice in the fetch
+        # updates the pending row
+        new_rows = {}
+        update_rows = {}
+
         # Process each transaction
         for txn in all_transactions:
             try:
@@ -84,13 +120,7 @@ def sync_bank_transactions_from_xero(xero_client, days_back=90):
                 description = txn.get('description') or txn.get('contact_name') or ''
                 bank_account = txn.get('bank_account_name', '')
 
-                existing = BankTransaction.query.filter(
-                    and_(
-                        BankTransaction.transaction_date == txn_date,
-                        BankTransaction.description == description,
-                        BankTransaction.bank_account == bank_account,
-                    )
-                ).first()
+                key = (txn_date, description, bank_account)
 
                 # Calculate debit/credit from amount
                 if amount >= 0:
@@ -104,32 +134,40 @@ def sync_bank_transactions_from_xero(xero_client, days_back=90):
                 xero_type = txn.get('type', '')
                 source_type = XERO_TYPE_MAP.get(xero_type, xero_type)
 
-                if existing:
+                changes = {
+                    'debit_gbp': debit_gbp,
+                    'credit_gbp': credit_gbp,
+                    'source_type': source_type,
+                    'reference': txn.get('reference', ''),
+                }
+
+                if key in existing_by_key:
                     # Update existing record
-                    existing.debit_gbp = debit_gbp
-                    existing.credit_gbp = credit_gbp
-                    existing.source_type = source_type
-                    existing.reference = txn.get('reference', '')
+                    txn_id = existing_by_key[key]
+                    update_rows[txn_id] = {'id': txn_id, **changes}
+                    stats['updated'] += 1
+                elif key in new_rows:
+                    # Repeated in this fetch: update the pending record
+                    new_rows[key].update(changes)
                     stats['updated'] += 1
                 else:
                     # Create new record
-                    new_txn = BankTransaction(
-                        transaction_date=txn_date,
-                        bank_account=bank_account,
-                        source_type=source_type,
-                        description=description,
-                        reference=txn.get('reference', ''),
-                        currency='GBP',  # Xero API returns in account currency
-                        debit_gbp=debit_gbp,
-                        credit_gbp=credit_gbp,
-                    )
-                    db.session.add(new_txn)
+                    new_rows[key] = {
+                        'transaction_date': txn_date,
+                        'bank_account': bank_account,
+                        'description': description,
+                        'currency': 'GBP',  # Xero API returns in account currency
+                        **changes,
+                    }
                     stats['created'] += 1
 
             except Exception as e:
                 stats['errors'].append(f"Transaction error: {str(e)}")
                 stats['skipped'] += 1
 
+        BankTransaction.bulk_insert(list(new_rows.values()))
+        if update_rows:
+            db.session.execute(update(BankTransaction), list(update_rows.values()))
         db.session.commit()
 
         # Recalculate monthly snapshots for affected months
@@ -175,25 +213,33 @@ def sync_invoices_from_xero(xero_client, days_back=90):
         pay_invoices = _fetch_all_invoices(xero_client, 'ACCPAY', from_date, to_date)
         stats['payables_fetched'] = len(pay_invoices)
 
-        # Process receivables
-        for inv in recv_invoices:
-            result = _upsert_invoice(inv, 'receivable')
-            if result == 'created':
-                stats['created'] += 1
-            elif result == 'updated':
-                stats['updated'] += 1
-            else:
-                stats['skipped'] += 1
+        # Process receivables, then payables. Each type is written with
+        # INSERT ... ON CONFLICT DO UPDATE on the invoice number/type key;
+        # an invoice repeated in the fetch keeps its last version.
+        for invoice_type, invoices in (('receivable', recv_invoices), ('payable', pay_invoices)):
+            known_numbers = _load_existing_invoice_numbers(invoices, invoice_type)
+            rows = {}
+            for inv in invoices:
+                row = _invoice_row(inv, invoice_type)
+                if row is None:
+                    stats['skipped'] += 1
+                    continue
+                invoice_number = row['invoice_number']
+                if invoice_number in known_numbers:
+                    stats['updated'] += 1
+                else:
+                    known_numbers.add(invoice_number)
+                    stats['created'] += 1
+                rows[invoice_number] = row
 
-        # Process payables
-        for inv in pay_invoices:
-            result = _upsert_invoice(inv, 'payable')
-            if result == 'created':
-                stats['created'] += 1
-            elif result == 'updated':
-                stats['updated'] += 1
-            else:
-                stats['skipped'] += 1
+            rows = list(rows.values())
+            for start in range(0, len(rows), INVOICE_UPSERT_CHUNK):
+                upsert(
+                    HistoricalInvoice,
+                    rows[start:start + INVOICE_UPSERT_CHUNK],
+                    index_elements=['invoice_number', 'invoice_type'],
+                    update_columns=INVOICE_SYNC_COLUMNS,
+                )
 
         db.session.commit()
 
@@ -232,34 +278,52 @@ def _fetch_all_invoices(xero_client, invoice_type, from_date, to_date):
     return all_invoices
 
 
-def _upsert_invoice(inv, invoice_type):
+def _load_existing_invoice_numbers(invoices, invoice_type, chunk_size=500):
     """
-    Insert or update an invoice in the historical table.
+    Load which of the fetched invoice numbers are already stored, in a few IN queries.
 
-    Returns: 'created', 'updated', or 'skipped'
+    Returns:
+        set: Stored invoice numbers of this type
+    """
+    numbers = list({inv.get('invoice_number') for inv in invoices if inv.get('invoice_number')})
+    existing_numbers = set()
+    for i in range(0, len(numbers), chunk_size):
+        existing_numbers.update(number for (number,) in db.session.query(
+            HistoricalInvoice.invoice_number
+        ).filter(
+            HistoricalInvoice.invoice_type == invoice_type,
+            HistoricalInvoice.invoice_number.in_(numbers[i:i + chunk_size]),
+        ))
+    return existing_numbers
+
+
+def _invoice_row(inv, invoice_type):
+    """
+    Build a historical invoice row from a Xero invoice.
+
+    Args:
+        inv: Invoice dict from the Xero client
+        invoice_type: 'receivable' or 'payable'
+
+    Returns:
+        dict of HistoricalInvoice columns, or None if the invoice can't be stored
     """
     invoice_number = inv.get('invoice_number')
     if not invoice_number:
-        return 'skipped'
+        return None
 
     # Parse dates
     issue_date_str = inv.get('issue_date')
     due_date_str = inv.get('due_date')
 
     if not issue_date_str:
-        return 'skipped'
+        return None
 
     try:
         issue_date = datetime.strptime(issue_date_str[:10], '%Y-%m-%d').date()
         due_date = datetime.strptime(due_date_str[:10], '%Y-%m-%d').date() if due_date_str else None
     except ValueError:
-        return 'skipped'
-
-    # Check if invoice already exists
-    existing = HistoricalInvoice.query.filter_by(
-        invoice_number=invoice_number,
-        invoice_type=invoice_type
-    ).first()
+        return None
 
     # Map Xero status to our status
     xero_status = inv.get('status', '')
@@ -276,42 +340,24 @@ def _upsert_invoice(inv, invoice_type):
     currency = inv.get('currency_code', 'GBP')
 
     # Calculate GBP total
-    rates = {'GBP': 1.0, 'EUR': 0.85, 'USD': 0.79}
-    gbp_total = total * rates.get(currency, 1.0)
-
-    if existing:
-        # Update existing record
-        existing.contact_name = inv.get('contact_name', '')
-        existing.invoice_date = issue_date
-        existing.due_date = due_date
-        existing.total = total
-        existing.amount_paid = amount_paid
-        existing.amount_due = amount_due
-        existing.currency = currency
-        existing.gbp_total = gbp_total
-        existing.status = status
-        existing.source = 'xero_api'
-        return 'updated'
-    else:
-        # Create new record
-        new_inv = HistoricalInvoice(
-            invoice_number=invoice_number,
-            invoice_type=invoice_type,
-            is_credit_note=False,  # Credit notes have different invoice numbers in Xero
-            contact_name=inv.get('contact_name', ''),
-            invoice_date=issue_date,
-            due_date=due_date,
-            total=total,
-            tax_total=0,  # Not available in basic API response
-            amount_paid=amount_paid,
-            amount_due=amount_due,
-            currency=currency,
-            gbp_total=gbp_total,
-            status=status,
-            source='xero_api',
-        )
-        db.session.add(new_inv)
-        return 'created'
+    gbp_total = total * HistoricalInvoice.CURRENCY_RATES.get(currency, 1.0)
+
+    return {
+        'invoice_number': invoice_number,
+        'invoice_type': invoice_type,
+        'is_credit_note': False,  # Credit notes have different invoice numbers in Xero
+        'contact_name': inv.get('contact_name', ''),
+        'invoice_date': issue_date,
+        'due_date': due_date,
+        'total': total,
+        'tax_total': 0,  # Not available in basic API response
+        'amount_paid': amount_paid,
+        'amount_due': amount_due,
+        'currency': currency,
+        'gbp_total': gbp_total,
+        'status': status,
+        'source': 'xero_api',
+    }
 
 
 def recalculate_monthly_snapshots(from_date, to_date):
@@ -0,0 +1,110 @@
+"""Tests for context loader helpers."""
+
+import pytest
+from datetime import date
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from context import loader
+
+
+SAMPLE_DEALS = [
+    {"name": "Old Deal", "stage": "Procurement", "expected_close": "2025-01-01"},
+    {"name": "Recent Deal", "stage": "Proposal Being Reviewed", "expected_close": "2025-05-20"},
+    {"name": "Mid Deal", "stage": "Verbal Agreement", "expected_close": "2025-03-01"},
+    {"name": "Won Deal", "stage": "Won", "expected_close": "2024-12-01"},
+    {"name": "Future Deal", "stage": "Warm Lead", "expected_close": "2025-09-01"},
+    {"name": "Bad Date", "stage": "Cold Lead", "expected_close": "not-a-date"},
+]
+
+
+@pytest.fixture
+def sample_pipeline(monkeypatch):
+    monkeypatch.setattr(loader, 'load_pipeline', lambda: {'deals': SAMPLE_DEALS})
+
+
+class TestOverdueDeals:
+    """Test overdue deal detection."""
+
+    def test_sorted_most_overdue_first(self, sample_pipeline):
+        """Won, future and unparseable deals are excluded."""
+        overdue = loader.get_overdue_deals(today=date(2025, 6, 1))
+
+        assert [d['name'] for d in overdue] == ["Old Deal", "Mid Deal", "Recent Deal"]
+        assert overdue[0]['days_overdue'] == 151
+        assert 'days_overdue' not in SAMPLE_DEALS[0]
+
+    def test_limit_matches_full_sort(self, sample_pipeline):
+        """Top-K result matches the head of the full sort."""
+        today = date(2025, 6, 1)
+        full = loader.get_overdue_deals(today=today)
+        top = loader.get_overdue_deals(limit=2, today=today)
+
+        assert top == full[:2]
+
+
+class TestFindMetric:
+    """Test metric lookup by name."""
+
+    def test_find_existing_metric(self):
+        """Revenue Mix is defined in metrics.yaml."""
+        metric = loader.find_metric('financial_metrics', 'Revenue Mix')
+        assert metric.get('metric') == 'Revenue Mix'
+
+    def test_missing_metric_returns_empty(self):
+        """Unknown sections and names return an empty dict."""
+        assert loader.find_metric('financial_metrics', 'Nope') == {}
+        assert loader.find_metric('unknown_section', 'Revenue Mix') == {}
+
+
+class TestWeightedPipeline:
+    """Test the Python weighted pipeline aggregate."""
+
+    def test_breakdown(self):
+        """Won deals count in full, the rest by likelihood."""
+        pipeline = {'deals': [
+            {"stage": "Won", "deal_value": 1000, "likelihood": 10},
+            {"stage": "Verbal Agreement", "deal_value": 500, "likelihood": 9},
+            {"stage": "Procurement", "deal_value": 300, "likelihood": 7},
+            {"stage": "Procurement", "deal_value": 200, "likelihood": 5},
+            {"stage": "Build Proposal", "deal_value": 100, "likelihood": 5},
+        ]}
+
+        result = loader.calculate_weighted_pipeline(pipeline=pipeline)
+
+        assert result == {
+            'committed': 1000,
+            'high_confidence': 800,
+            'medium_confidence': 100,
+            'weighted_total': 1000 + 450 + 210 + 100 + 50,
+            'total_deals': 5,
+        }
+
+
+class TestClassifyDeals:
+    """Test the single-pass deal classifier."""
+
+    def test_matches_helpers(self, sample_pipeline):
+        """Overdue and closing lists match the per-purpose helpers."""
+        today = date(2025, 5, 25)
+        summary = loader.classify_deals(SAMPLE_DEALS, today=today)
+
+        assert summary.overdue == loader.get_overdue_deals(today=today)
+        assert [d['name'] for d in summary.closing_this_month] == ["Recent Deal"]
+        assert summary.deal_count == len(SAMPLE_DEALS)
+
+    def test_totals(self):
+        """Won and high confidence values are split out of the total."""
+        deals = [
+            {"stage": "Won", "deal_value": 100, "likelihood": 10},
+            {"stage": "Procurement", "deal_value": 50, "likelihood": 8},
+            {"stage": "Warm Lead", "deal_value": 20, "likelihood": 3},
+        ]
+
+        summary = loader.classify_deals(deals, today=date(2025, 1, 1))
+
+        assert summary.total_value == 170
+        assert summary.won_value == 100
+        assert summary.high_confidence_value == 50
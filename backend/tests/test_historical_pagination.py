@@ -0,0 +1,137 @@
+"""Tests for keyset pagination of historical invoice drill-downs."""
+
+import pytest
+from datetime import date, timedelta
+
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from flask import Flask
+
+from database import db, HistoricalInvoice
+from json_provider import OrjsonProvider
+from routes.drill_routes import (
+    drill_bp,
+    decode_invoice_cursor,
+    encode_invoice_cursor,
+    get_historical_invoices,
+)
+
+
+SHARED_DATE = date(2024, 3, 15)
+
+
+@pytest.fixture
+def app():
+    """App with the drill blueprint on an in-memory SQLite database."""
+    app = Flask(__name__)
+    app.config['SQLALCHEMY_DATABASE_URI'] = 'sqlite://'
+    app.json = OrjsonProvider(app)
+    db.init_app(app)
+    app.register_blueprint(drill_bp)
+
+    with app.app_context():
+        db.create_all()
+        # 12 receivables on one date, then 5 older ones, plus payables that
+        # must never show up in receivable pages
+        invoices = [
+            HistoricalInvoice(invoice_number=f'INV-{i}', invoice_type='receivable',
+                              invoice_date=SHARED_DATE, status='Paid', total=100)
+            for i in range(12)
+        ] + [
+            HistoricalInvoice(invoice_number=f'OLD-{i}', invoice_type='receivable',
+                              invoice_date=SHARED_DATE - timedelta(days=i + 1),
+                              status='Paid', total=100)
+            for i in range(5)
+        ] + [
+            HistoricalInvoice(invoice_number=f'BILL-{i}', invoice_type='payable',
+                              invoice_date=SHARED_DATE, status='Paid', total=100)
+            for i in range(3)
+        ]
+        db.session.add_all(invoices)
+        db.session.commit()
+        yield app
+        db.drop_all()
+
+
+def expected_receivable_ids():
+    """All receivable ids, newest first with id breaking date ties."""
+    rows = HistoricalInvoice.query.filter_by(invoice_type='receivable').order_by(
+        HistoricalInvoice.invoice_date.desc(), HistoricalInvoice.id.desc()
+    ).all()
+    return [f'hist_{inv.id}' for inv in rows]
+
+
+class TestInvoiceCursor:
+    """Test cursor encoding."""
+
+    def test_round_trip(self, app):
+        """A cursor decodes back to the invoice's (invoice_date, id)."""
+        invoice = HistoricalInvoice.query.first()
+        cursor = encode_invoice_cursor(invoice)
+
+        assert decode_invoice_cursor(cursor) == (invoice.invoice_date, invoice.id)
+
+    @pytest.mark.parametrize('cursor', ['zzz', 'bm9wZQ==', 'MjAyNC0wMy0xNTp4'])
+    def test_malformed_cursor_raises(self, cursor):
+        """Bad base64, a missing separator or a non-integer id are rejected."""
+        with pytest.raises(ValueError):
+            decode_invoice_cursor(cursor)
+
+
+class TestKeysetPagination:
+    """Test paging through historical invoices with cursors."""
+
+    def test_pages_across_date_ties_without_gaps(self, app):
+        """Pages split inside a run of same-date invoices lose and repeat nothing."""
+        seen = []
+        cursor = None
+        while True:
+            data = get_historical_invoices('receivable', page_size=5, cursor=cursor)
+            seen.extend(inv['invoice_id'] for inv in data['invoices'])
+            if not data['has_more']:
+                assert data['next_cursor'] is None
+                break
+            assert len(data['invoices']) == 5
+            cursor = data['next_cursor']
+
+        assert seen == expected_receivable_ids()
+
+    def test_exact_final_page_has_no_more(self, app):
+        """A last page that is exactly full doesn't report another page."""
+        first = get_historical_invoices('receivable', page_size=12)
+        last = get_historical_invoices('receivable', page_size=5,
+                                       cursor=first['next_cursor'])
+
+        assert first['has_more'] is True
+        assert len(last['invoices']) == 5
+        assert last['has_more'] is False
+        assert last['next_cursor'] is None
+
+    def test_page_and_cursor_agree(self, app):
+        """The second OFFSET page matches the page after the first cursor."""
+        first = get_historical_invoices('receivable', page_size=7)
+        by_cursor = get_historical_invoices('receivable', page_size=7,
+                                            cursor=first['next_cursor'])
+        by_page = get_historical_invoices('receivable', page=2, page_size=7)
+
+        assert by_cursor['invoices'] == by_page['invoices']
+
+    def test_route_follows_next_cursor(self, app):
+        """The endpoint returns next_cursor and accepts it back."""
+        client = app.test_client()
+        first = client.get('/api/drill/historical/receivables?page_size=10').get_json()
+        second = client.get('/api/drill/historical/receivables?page_size=10'
+                            f'&cursor={first["next_cursor"]}').get_json()
+
+        ids = [inv['invoice_id'] for inv in first['invoices'] + second['invoices']]
+        assert ids == expected_receivable_ids()
+        assert second['has_more'] is False
+
+    def test_route_rejects_malformed_cursor(self, app):
+        """A malformed cursor is a 400, not a 500."""
+        response = app.test_client().get('/api/drill/historical/receivables?cursor=zzz')
+
+        assert response.status_code == 400
+        assert response.get_json()['success'] is False
@@ -0,0 +1,251 @@
+"""Tests for Notion pipeline transformation helpers."""
+
+import pytest
+
+import threading
+import sys
+import os
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from datetime import datetime, timedelta
+
+import notion.pipeline as pipeline
+from notion.pipeline import (
+    parse_currency,
+    extract_property_value,
+    calculate_pipeline_summary,
+    transform_deal,
+    merge_deals,
+    resolve_aliases,
+)
+
+
+class TestParseCurrency:
+    """Test currency parsing from Notion values."""
+
+    @pytest.mark.parametrize("value,expected", [
+        ("£250,000.00", 250000.0),
+        ("250000", 250000.0),
+        (" $1,000 ", 1000.0),
+        ("€ 500", 500.0),
+        (250000, 250000.0),
+        (1.5, 1.5),
+    ])
+    def test_parse_formats(self, value, expected):
+        """Symbols, separators and whitespace are stripped."""
+        assert parse_currency(value) == expected
+
+    @pytest.mark.parametrize("value", [None, "", "£", "n/a", [1]])
+    def test_unparseable_returns_zero(self, value):
+        """Empty and invalid values parse as zero."""
+        assert parse_currency(value) == 0.0
+
+
+class TestExtractPropertyValue:
+    """Test Notion property value extraction."""
+
+    @pytest.mark.parametrize("prop,expected", [
+        ({"type": "title", "title": [{"plain_text": "Deal "}, {"plain_text": "One"}]}, "Deal One"),
+        ({"type": "rich_text", "rich_text": []}, None),
+        ({"type": "number", "number": 5}, 5),
+        ({"type": "select", "select": {"name": "Won"}}, "Won"),
+        ({"type": "select", "select": None}, None),
+        ({"type": "multi_select", "multi_select": [{"name": "A"}, {"name": "B"}]}, ["A", "B"]),
+        ({"type": "date", "date": {"start": "2025-01-31"}}, "2025-01-31"),
+        ({"type": "people", "people": [{"name": "Sam"}]}, "Sam"),
+        ({"type": "people", "people": [{"name": "Sam"}, {"name": "Alex"}]}, ["Sam", "Alex"]),
+        ({"type": "people", "people": []}, None),
+        ({"type": "checkbox"}, False),
+        ({"type": "formula", "formula": {"type": "number", "number": 3}}, 3),
+        ({"type": "formula", "formula": {"type": "date", "date": {"start": "2025-02-01"}}}, "2025-02-01"),
+        ({"type": "formula", "formula": {"type": "unknown"}}, None),
+        ({"type": "rollup", "rollup": {"type": "array", "array": [{"type": "number", "number": 7}]}}, 7),
+        ({"type": "rollup", "rollup": {"type": "array", "array": []}}, None),
+        ({"type": "unsupported"}, None),
+        (None, None),
+    ])
+    def test_extract(self, prop, expected):
+        """Each property type maps to its Python value."""
+        assert extract_property_value(prop) == expected
+
+
+class TestPipelineSummary:
+    """Test pipeline summary statistics."""
+
+    def test_summary(self):
+        """Totals, weighting, stages and high-confidence deals."""
+        deals = [
+            {"deal_value": 100000, "likelihood": 9, "stage": "Won"},
+            {"deal_value": 50000, "likelihood": 5, "stage": "Proposal"},
+            {"deal_value": 20000, "likelihood": 8, "stage": "Proposal"},
+            {"deal_value": 10000, "stage": None},
+        ]
+
+        summary = calculate_pipeline_summary(deals)
+
+        assert summary['total_pipeline_value'] == 180000
+        assert summary['weighted_pipeline'] == 131000
+        assert summary['deals_count'] == 4
+        assert summary['high_confidence_value'] == 120000
+        assert summary['high_confidence_count'] == 2
+        assert summary['by_stage'] == {
+            "Won": {"count": 1, "value": 100000},
+            "Proposal": {"count": 2, "value": 70000},
+            "Unknown": {"count": 1, "value": 10000},
+        }
+
+    def test_empty(self):
+        """An empty pipeline sums to zero."""
+        summary = calculate_pipeline_summary([])
+        assert summary['total_pipeline_value'] == 0
+        assert summary['weighted_pipeline'] == 0
+        assert summary['by_stage'] == {}
+
+
+def _title(text):
+    return {"type": "title", "title": [{"plain_text": text}]}
+
+
+def _rich_text(text):
+    return {"type": "rich_text", "rich_text": [{"plain_text": text}]}
+
+
+class TestTransformDeal:
+    """Test Notion page to deal transformation."""
+
+    def test_alternate_property_names(self):
+        """Fallback property names are used when the primary one is missing."""
+        page = {
+            "id": "page-1",
+            "properties": {
+                "Name": _title("Deal One"),
+                "Account": _rich_text("Acme"),
+                "Stage": {"type": "select", "select": {"name": "Won"}},
+                "Likelihood": {"type": "number", "number": 9},
+                "Amount": {"type": "rich_text", "rich_text": [{"plain_text": "£1,500"}]},
+                "Close Date": {"type": "date", "date": {"start": "2025-03-01"}},
+            },
+        }
+
+        deal = transform_deal(page)
+
+        assert deal == {
+            "name": "Deal One",
+            "client": "Acme",
+            "stage": "Won",
+            "deal_value": 1500.0,
+            "likelihood": 9,
+            "expected_close": "2025-03-01",
+            "notion_id": "page-1",
+        }
+
+    def test_missing_name_skipped(self):
+        """Pages without a name are not deals."""
+        assert transform_deal({"properties": {"Name": _title("")}}) is None
+        assert transform_deal({"properties": {"Name": {"type": "title", "title": []}}}) is None
+        assert transform_deal({"properties": {}}) is None
+
+    def test_resolved_aliases_shared_across_pages(self):
+        """A schema resolved from one page transforms pages with the same keys."""
+        page = {
+            "id": "page-1",
+            "properties": {
+                "Name": _title("Deal One"),
+                "Client": _rich_text(""),
+                "Account": _rich_text("Acme"),
+                "Value": {"type": "number", "number": 10},
+            },
+        }
+        aliases = resolve_aliases(page["properties"])
+
+        assert aliases["client"] == ("Client", "Account")
+        assert aliases["deal_value"] == ("Value",)
+        assert aliases["notes"] == ()
+        assert transform_deal(page, aliases) == transform_deal(page)
+        assert transform_deal(page, aliases)["client"] == "Acme"
+
+    def test_multi_part_name(self):
+        """Names split across several title fragments are joined."""
+        page = {"properties": {"Name": {"type": "title", "title": [
+            {"plain_text": "Deal "}, {"plain_text": "One"},
+        ]}}}
+        assert transform_deal(page)["name"] == "Deal One"
+
+
+def _page(page_id, name, value):
+    return {
+        "id": page_id,
+        "properties": {
+            "Name": _title(name),
+            "Deal value": {"type": "number", "number": value},
+        },
+    }
+
+
+class TestMergeDeals:
+    """Test merging incrementally synced pages into cached deals."""
+
+    def test_replaces_appends_and_drops(self):
+        """Changed deals replace by notion_id, new ones are added, blanked ones removed."""
+        cached = [
+            {"name": "A", "deal_value": 300, "notion_id": "a"},
+            {"name": "B", "deal_value": 200, "notion_id": "b"},
+            {"name": "C", "deal_value": 100, "notion_id": "c"},
+        ]
+        pages = [_page("b", "B2", 50), _page("c", "", 100), _page("d", "D", 250)]
+
+        merged = merge_deals(cached, pages)
+
+        assert [(d["name"], d["deal_value"]) for d in merged] == [
+            ("A", 300), ("D", 250), ("B2", 50),
+        ]
+
+    def test_no_changes(self):
+        """Merging nothing leaves the cached deals as they were."""
+        cached = [{"name": "A", "deal_value": 1, "notion_id": "a"}]
+        assert merge_deals(cached, []) == cached
+
+
+class TestGetPipeline:
+    """Test serving expired pipeline data while it refreshes."""
+
+    @pytest.fixture
+    def refreshes(self, monkeypatch):
+        calls = []
+        done = threading.Event()
+
+        def fake_fetch():
+            calls.append(True)
+            done.set()
+            return {"deals": []}
+
+        monkeypatch.setattr(pipeline, "get_cached", lambda key: None)
+        monkeypatch.setattr(pipeline, "fetch_pipeline", fake_fetch)
+        return calls, done
+
+    def test_recent_stale_served_and_refreshed(self, monkeypatch, refreshes):
+        """A recently synced expired entry is returned while a refresh runs."""
+        calls, done = refreshes
+        synced_at = datetime.utcnow().isoformat()
+        monkeypatch.setattr(pipeline, "get_stale", lambda key: {
+            "deals": [{"name": "A"}], "synced_at": synced_at, "_cached_at": 0,
+        })
+
+        data = pipeline.get_pipeline()
+
+        assert data["stale"] is True
+        assert data["deals"] == [{"name": "A"}]
+        assert "_cached_at" not in data
+        assert done.wait(5)
+        assert len(calls) == 1
+
+    def test_old_stale_fetched_inline(self, monkeypatch, refreshes):
+        """Entries past the revalidation window are refetched before returning."""
+        calls, _ = refreshes
+        synced_at = (datetime.utcnow() - timedelta(days=2)).isoformat()
+        monkeypatch.setattr(pipeline, "get_stale", lambda key: {
+            "deals": [], "synced_at": synced_at,
+        })
+
+        assert pipeline.get_pipeline() == {"deals": []}
+        assert len(calls) == 1
@@ -1,4 +1,4 @@
-from .auth import XeroAuth
-from .client import XeroClient
+from .auth import XeroAuth, get_xero_auth
+from .client import XeroClient, get_xero_client
 
-__all__ = ['XeroAuth', 'XeroClient']
+__all__ = ['XeroAuth', 'XeroClient', 'get_xero_auth', 'get_xero_client']
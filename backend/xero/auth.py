@@ -1,11 +1,42 @@
 import secrets
+import threading
+from functools import lru_cache
 from datetime import datetime, timedelta
 from urllib.parse import urlencode
 import requests
+from cachetools import TTLCache
+from flask import g, has_app_context
 
 from config import Config
 from database import db, XeroToken
 
+# A successful is_connected() check and the connected tenant are reused for
+# this many seconds by every XeroAuth in the process, so each API request
+# doesn't query the token table. Only positive results are shared: a new
+# connection made in another worker must show up immediately.
+CONNECTED_CACHE_TTL = 30
+_connected_cache = TTLCache(maxsize=2, ttl=CONNECTED_CACHE_TTL)
+_connected_lock = threading.Lock()
+
+
+def clear_connected_cache():
+    """Forget the cached connection check (after tokens are stored or removed)."""
+    with _connected_lock:
+        _connected_cache.clear()
+    if has_app_context():
+        g.pop('_xero_connected', None)
+
+
+@lru_cache(maxsize=1)
+def get_xero_auth():
+    """
+    Get the process-wide XeroAuth.
+
+    XeroAuth only holds configuration, so every blueprint can share one;
+    call get_xero_auth.cache_clear() to rebuild it (e.g. in tests).
+    """
+    return XeroAuth()
+
 
 class XeroAuth:
     """Handle Xero OAuth2 authentication flow."""
@@ -158,6 +189,7 @@ class XeroAuth:
             db.session.add(token)
 
         db.session.commit()
+        clear_connected_cache()
         return token
 
     def get_valid_token(self):
@@ -184,17 +216,62 @@ class XeroAuth:
                 # If refresh fails, token is invalid
                 db.session.delete(token)
                 db.session.commit()
+                clear_connected_cache()
                 raise Exception(f"Token refresh failed: {e}")
 
         return token.get_access_token()
 
+    def get_tenant(self):
+        """
+        Get the connected Xero organisation.
+
+        Cached for CONNECTED_CACHE_TTL seconds once a token exists.
+
+        Returns:
+            tuple: (tenant_id, tenant_name), or (None, None) if not connected
+        """
+        with _connected_lock:
+            tenant = _connected_cache.get('tenant')
+        if tenant is not None:
+            return tenant
+
+        token = XeroToken.query.first()
+        if not token:
+            return None, None
+
+        tenant = (token.tenant_id, token.tenant_name)
+        with _connected_lock:
+            _connected_cache['tenant'] = tenant
+        return tenant
+
     def get_tenant_id(self):
         """Get the stored Xero tenant ID."""
-        token = XeroToken.query.first()
-        return token.tenant_id if token else None
+        return self.get_tenant()[0]
 
     def is_connected(self):
-        """Check if connected to Xero with valid tokens."""
+        """
+        Check if connected to Xero with valid tokens.
+
+        The result is remembered for the rest of the request, and a positive
+        result for CONNECTED_CACHE_TTL seconds across requests.
+        """
+        if has_app_context() and '_xero_connected' in g:
+            return g._xero_connected
+        with _connected_lock:
+            connected = _connected_cache.get('connected', False)
+
+        if not connected:
+            connected = self._check_connected()
+            if connected:
+                with _connected_lock:
+                    _connected_cache['connected'] = True
+
+        if has_app_context():
+            g._xero_connected = connected
+        return connected
+
+    def _check_connected(self):
+        """Check the stored token, refreshing it if it is about to expire."""
         token = XeroToken.query.first()
         if not token:
             return False
@@ -211,5 +288,6 @@ class XeroAuth:
         if token:
             db.session.delete(token)
             db.session.commit()
+            clear_connected_cache()
             return True
         return False
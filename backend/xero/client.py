@@ -1,13 +1,39 @@
+from concurrent.futures import ThreadPoolExecutor
 from datetime import datetime, date, timedelta
+import copy
 import requests
 import re
+import threading
 from functools import lru_cache
+from cachetools import TTLCache
+from requests.adapters import HTTPAdapter
 
-from .auth import XeroAuth
+from .auth import get_xero_auth
 
-# Module-level cache for account codes (refreshed daily)
-_account_codes_cache = None
-_account_codes_cache_time = None
+# Account lists change rarely, so they are cached per tenant: the chart of
+# accounts for a day, the bank account list for ten minutes.
+ACCOUNT_CODES_TTL = 86400
+BANK_ACCOUNTS_TTL = 600
+_account_codes_cache = TTLCache(maxsize=4, ttl=ACCOUNT_CODES_TTL)
+_bank_accounts_cache = TTLCache(maxsize=4, ttl=BANK_ACCOUNTS_TTL)
+_accounts_lock = threading.Lock()
+
+# One keep-alive session for all Xero calls so the TLS handshake with
+# api.xero.com is paid once per connection, not once per request
+_session = requests.Session()
+_session.mount('https://', HTTPAdapter(pool_connections=2, pool_maxsize=10))
+
+
+@lru_cache(maxsize=1)
+def get_xero_client():
+    """
+    Get the process-wide XeroClient.
+
+    The client keeps no per-request state (_gather() works on copies), so
+    every blueprint can share one; call get_xero_client.cache_clear() to
+    rebuild it (e.g. in tests).
+    """
+    return XeroClient()
 
 
 class XeroClient:
@@ -17,10 +43,14 @@ class XeroClient:
     FINANCE_URL = 'https://api.xero.com/finance.xro/1.0'
 
     def __init__(self):
-        self.auth = XeroAuth()
+        self.auth = get_xero_auth()
+        self._headers = None  # Set on the copies used by _gather()
 
     def _get_headers(self):
         """Get headers with valid access token."""
+        if self._headers is not None:
+            return self._headers
+
         access_token = self.auth.get_valid_token()
         if not access_token:
             raise Exception("Not connected to Xero")
@@ -40,7 +70,7 @@ class XeroClient:
         """Make a GET request to Xero API."""
         headers = self._get_headers()
         url = f"{self.BASE_URL}/{endpoint}"
-        response = requests.get(url, headers=headers, params=params)
+        response = _session.get(url, headers=headers, params=params)
 
         if response.status_code != 200:
             raise Exception(f"Xero API error: {response.status_code} - {response.text}")
@@ -51,15 +81,58 @@ class XeroClient:
         """Make a GET request to Xero Finance API."""
         headers = self._get_headers()
         url = f"{self.FINANCE_URL}/{endpoint}"
-        response = requests.get(url, headers=headers, params=params)
+        response = _session.get(url, headers=headers, params=params)
 
         if response.status_code != 200:
             raise Exception(f"Xero Finance API error: {response.status_code} - {response.text}")
 
         return response.json()
 
-    def get_bank_accounts(self):
-        """Get all bank accounts with balances."""
+    def _gather(self, **calls):
+        """
+        Run independent fetches concurrently.
+
+        The token is looked up once here, on the request thread (it needs the
+        database), and the calls run on a copy of the client that reuses it.
+
+        Args:
+            **calls: Result name -> function taking the client
+
+        Returns:
+            dict: Result name -> return value
+        """
+        client = copy.copy(self)
+        client._headers = self._get_headers()
+
+        with ThreadPoolExecutor(max_workers=len(calls)) as executor:
+            futures = {name: executor.submit(call, client) for name, call in calls.items()}
+            return {name: future.result() for name, future in futures.items()}
+
+    def _cached_per_tenant(self, cache, fetch, force_refresh=False):
+        """
+        Return fetch() for the connected tenant, cached in the given TTLCache.
+
+        The cached list is shared between requests, so callers must not
+        modify it.
+        """
+        tenant_id = self.auth.get_tenant_id()
+        if not force_refresh:
+            with _accounts_lock:
+                result = cache.get(tenant_id)
+            if result is not None:
+                return result
+
+        result = fetch()
+        with _accounts_lock:
+            cache[tenant_id] = result
+        return result
+
+    def get_bank_accounts(self, force_refresh=False):
+        """Get all bank accounts. Cached for 10 minutes."""
+        return self._cached_per_tenant(_bank_accounts_cache, self._fetch_bank_accounts,
+                                       force_refresh)
+
+    def _fetch_bank_accounts(self):
         data = self._get('Accounts', params={'where': 'Type=="BANK"'})
 
         accounts = []
@@ -366,33 +439,30 @@ class XeroClient:
 
     def get_dashboard_data(self):
         """Get all data needed for the dashboard in a single call."""
-        bank_summary = self.get_bank_summary()
-        receivables = self.get_receivables_summary()
-        payables = self.get_payables_summary()
-        pnl = self.get_profit_and_loss()
+        data = self._gather(
+            cash_position=XeroClient.get_bank_summary,
+            receivables=XeroClient.get_receivables_summary,
+            payables=XeroClient.get_payables_summary,
+            profit_loss=XeroClient.get_profit_and_loss,
+        )
 
         return {
-            'cash_position': bank_summary,
-            'receivables': receivables,
-            'payables': payables,
-            'profit_loss': pnl,
+            **data,
             'last_synced': datetime.utcnow().isoformat(),
         }
 
     def get_forecast_data(self):
         """Get all data needed for cash flow forecasting, including historical burn rate."""
-        bank_summary = self.get_bank_summary()
-        receivables = self.get_receivables_summary()
-        payables = self.get_payables_summary()
-        pnl = self.get_profit_and_loss()
-        monthly_expenses = self.get_monthly_expenses(num_months=3)
+        data = self._gather(
+            cash_position=XeroClient.get_bank_summary,
+            receivables=XeroClient.get_receivables_summary,
+            payables=XeroClient.get_payables_summary,
+            profit_loss=XeroClient.get_profit_and_loss,
+            monthly_expenses=lambda client: client.get_monthly_expenses(num_months=3),
+        )
 
         return {
-            'cash_position': bank_summary,
-            'receivables': receivables,
-            'payables': payables,
-            'profit_loss': pnl,
-            'monthly_expenses': monthly_expenses,
+            **data,
             'last_synced': datetime.utcnow().isoformat(),
         }
 
@@ -608,13 +678,10 @@ class XeroClient:
         Returns:
             list: Account codes with name, type, and class
         """
-        global _account_codes_cache, _account_codes_cache_time
-
-        # Check cache
-        if not force_refresh and _account_codes_cache is not None:
-            if _account_codes_cache_time and (datetime.utcnow() - _account_codes_cache_time).seconds < 86400:
-                return _account_codes_cache
+        return self._cached_per_tenant(_account_codes_cache, self._fetch_account_codes,
+                                       force_refresh)
 
+    def _fetch_account_codes(self):
         data = self._get('Accounts')
 
         accounts = []
@@ -629,10 +696,6 @@ class XeroClient:
                 'tax_type': acct.get('TaxType'),
             })
 
-        # Update cache
-        _account_codes_cache = accounts
-        _account_codes_cache_time = datetime.utcnow()
-
         return accounts
 
     def get_bank_transactions(self, from_date=None, to_date=None, account_id=None, page=1, page_size=100):
@@ -69,6 +69,7 @@ function CashConcentrationCard() {
     top_1_percent,
     top_3_percent,
     top_5_percent,
+    others_percent,
     concentration_risk,
     clients,
     total_received,
@@ -76,11 +77,10 @@ function CashConcentrationCard() {
     period
   } = data;
 
-  // Get top 5 clients and calculate "Others"
+  // Get top 5 clients; the API sends the "Others" share, since summary
+  // mode only lists the top 5
   const topClients = clients.slice(0, 5);
-  const othersPercent = clients.length > 5
-    ? 100 - (topClients[topClients.length - 1]?.cumulative_percent || 0)
-    : 0;
+  const othersPercent = others_percent || 0;
 
   // Calculate SVG donut chart segments
   const chartSize = 160;